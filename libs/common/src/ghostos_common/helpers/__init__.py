@@ -20,19 +20,23 @@ from ghostos_common.helpers.modules import (
     create_module,
     create_and_bind_module,
 )
-from ghostos_common.helpers.io import BufferPrint
+from ghostos_common.helpers.io import (
+    BufferPrint, BoundedStringIO, StdoutRouter, install_stdout_router, redirect_stdout_local,
+)
 from ghostos_common.helpers.timeutils import Timeleft, timestamp_datetime, timestamp, timestamp_ms
 from ghostos_common.helpers.hashes import md5, sha1, sha256
 from ghostos_common.helpers.trans import gettext, ngettext, GHOSTOS_DOMAIN
 
 from ghostos_common.helpers.coding import reflect_module_code, unwrap
 from ghostos_common.helpers.openai import get_openai_key
-from ghostos_common.helpers.tree_sitter import tree_sitter_parse, code_syntax_check
+from ghostos_common.helpers.tree_sitter import tree_sitter_parse, code_syntax_check, get_module_syntax_checker
 from ghostos_common.helpers.code_analyser import (
     get_code_interface, get_code_interface_str,
     get_attr_source_from_code, get_attr_interface_from_code,
 )
-from ghostos_common.helpers.files import generate_directory_tree, list_dir, is_pathname_ignored
+from ghostos_common.helpers.files import (
+    generate_directory_tree, list_dir, is_pathname_ignored, DirectoryIndex, get_directory_index,
+)
 
 if TYPE_CHECKING:
     from typing import Callable
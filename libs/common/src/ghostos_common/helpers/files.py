@@ -1,9 +1,17 @@
 from abc import abstractmethod
+import os
+import re
+import time
 import pathlib
-from typing import List, Tuple, Iterable, Dict, Union, Protocol, Any
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Tuple, Iterable, Dict, Union, Protocol, Any, Optional, Callable
 import fnmatch
 
-__all__ = ['list_dir', 'is_pathname_ignored', 'generate_directory_tree', 'DescriptionsGetter']
+__all__ = [
+    'list_dir', 'is_pathname_ignored', 'generate_directory_tree', 'DescriptionsGetter',
+    'IgnoreMatcher', 'DirectoryIndex', 'get_directory_index',
+]
 
 
 def list_dir(
@@ -121,23 +129,33 @@ def generate_directory_tree(
     :param indent: The indentation string for each level of the tree.
     :return: A string representing the directory tree.
     """
+    if isinstance(current, str):
+        current = pathlib.Path(current)
+    listed = list_dir(current, recursion, prefix=prefix, ignores=ignores, includes=includes, files=files,
+                      dirs=dirs, depth=depth)
+    return _render_directory_tree(current, ((path, d, path.is_dir()) for path, d in listed), descriptions, indent)
+
+
+def _render_directory_tree(
+        current: pathlib.Path,
+        listed: Iterable[Tuple[pathlib.Path, int, bool]],
+        descriptions: Union[Dict[str, str], DescriptionsGetter, None],
+        indent: str,
+) -> str:
     tree = []
     if descriptions is None:
         descriptions = {}
 
-    for path, current_depth in list_dir(current, recursion, prefix=prefix, ignores=ignores, includes=includes,
-                                        files=files,
-                                        dirs=dirs, depth=depth):
+    for path, current_depth, is_dir in listed:
         # Calculate the indentation based on the current depth
         current_indent = indent * current_depth
 
         desc = ""
         if descriptions is not None:
-            relative = path.relative_to(current)
-            relative_path = str(relative)
             desc = ""
             got = ""
             if isinstance(descriptions, dict):
+                relative_path = str(path.relative_to(current))
                 if relative_path in descriptions:
                     got = descriptions.get(relative_path, "")
             else:
@@ -149,9 +167,257 @@ def generate_directory_tree(
                     got = got[:150] + "..."
                 desc = f" : `{got}`"
 
-        if path.is_dir():
+        if is_dir:
             tree.append(f"{current_indent}📁 {path.name}{desc}")
         else:
             tree.append(f"{current_indent}📄 {path.name}{desc}")
 
     return "\n".join(tree)
+
+
+class IgnoreMatcher:
+    """
+    the ignore patterns compiled once, same rules as `is_pathname_ignored`. the result of each name is cached.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = tuple(patterns)
+        self._rules: List[Tuple[Callable, Callable, bool]] = []
+        for pattern in self.patterns:
+            matched = True
+            if pattern.startswith('!'):
+                matched = False
+                pattern = pattern[1:]
+            dir_pattern = pattern[:-1] if pattern.endswith('/') else pattern
+            self._rules.append((self._compile(pattern), self._compile(dir_pattern), matched))
+        self._cache: Dict[Tuple[str, bool], bool] = {}
+
+    @staticmethod
+    def _compile(pattern: str) -> Callable:
+        return re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+
+    def ignored(self, name: str, is_dir: bool) -> bool:
+        key = (name, is_dir)
+        got = self._cache.get(key, None)
+        if got is None:
+            got = False
+            normalized = os.path.normcase(name)
+            for file_match, dir_match, matched in self._rules:
+                match = dir_match if is_dir else file_match
+                if match(normalized) is not None:
+                    got = matched
+                    break
+            self._cache[key] = got
+        return got
+
+
+class _IndexNode:
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.entries: Optional[List[Tuple[str, pathlib.Path, bool, bool]]] = None
+        """(name, path, is_file, is_dir) of the entries not ignored, in the order of the directory"""
+        self.children: Dict[str, "_IndexNode"] = {}
+        self.mtime = 0
+        self.checked_at = 0.0
+
+
+_Listing = List[Tuple[pathlib.Path, int, bool]]
+
+
+class DirectoryIndex:
+    """
+    cached index of a directory tree for listing it repeatedly.
+    the directories are scanned when they are listed the first time, and only the entries not ignored are kept.
+    a listed directory is checked by its mtime at most once in `check_interval` seconds,
+    and scanned again if its entries are added, removed or renamed.
+    the same listing object is returned until a listed directory is scanned again,
+    and the rendered trees are kept for the same listing.
+    """
+
+    def __init__(self, root: Union[pathlib.Path, str], ignores: Iterable[str] = None, check_interval: float = 1.0):
+        """
+        :param root: the root directory
+        :param ignores: the ignored path patterns, same as list_dir.
+        :param check_interval: seconds to trust the scanned entries of a directory, 0 means check every time.
+        """
+        self.root = pathlib.Path(root)
+        self.matcher = IgnoreMatcher(ignores or [])
+        self.check_interval = check_interval
+        self._root_node = _IndexNode(self.root)
+        self._listings: Dict[Tuple, Tuple[float, int, _Listing]] = {}
+        self._trees: Dict[Tuple, Tuple[_Listing, float, Any, str]] = {}
+        self._lock = Lock()
+        self.scans = 0
+        """count of the directory scans"""
+
+    def _node(self, prefix: str) -> _IndexNode:
+        node = self._root_node
+        for name in pathlib.PurePath(prefix).parts:
+            if name == ".":
+                continue
+            node = self._child(node, name, node.path / name)
+        return node
+
+    @staticmethod
+    def _child(node: _IndexNode, name: str, path: pathlib.Path) -> _IndexNode:
+        child = node.children.get(name, None)
+        if child is None:
+            child = _IndexNode(path)
+            node.children[name] = child
+        return child
+
+    def _entries(self, node: _IndexNode, now: float) -> List[Tuple[str, pathlib.Path, bool, bool]]:
+        if node.entries is not None and now - node.checked_at < self.check_interval:
+            return node.entries
+        try:
+            mtime = os.stat(node.path).st_mtime_ns
+        except FileNotFoundError:
+            raise ValueError(f"{node.path} does not exist")
+        node.checked_at = now
+        if node.entries is not None and mtime == node.mtime:
+            return node.entries
+        entries = []
+        with os.scandir(node.path) as iterator:
+            for entry in iterator:
+                is_dir = entry.is_dir()
+                if self.matcher.ignored(entry.name, is_dir):
+                    continue
+                entries.append((entry.name, node.path / entry.name, entry.is_file(), is_dir))
+        # the children of the removed directories are dropped.
+        kept = {name for name, _, _, is_dir in entries if is_dir}
+        node.children = {name: child for name, child in node.children.items() if name in kept}
+        node.entries = entries
+        node.mtime = mtime
+        self.scans += 1
+        return entries
+
+    def list_dir(
+            self,
+            recursion: int = -1,
+            *,
+            prefix: str = "",
+            files: bool = True,
+            dirs: bool = True,
+            depth: int = 0,
+    ) -> _Listing:
+        """
+        list the indexed entries, same as `list_dir`.
+        :return: [(path, depth, is_dir)], do not modify it.
+        """
+        key = (prefix, recursion, files, dirs, depth)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._listings.get(key, None)
+            if cached is not None and now - cached[0] < self.check_interval:
+                return cached[2]
+            if not self.root.joinpath(prefix).is_dir():
+                raise ValueError(f"Prefix path {prefix} does not exist in {self.root}")
+            scans = self.scans
+            result = []
+            self._list(self._node(prefix), recursion, files, dirs, depth, now, result)
+            if cached is not None and scans == self.scans and cached[1] == scans:
+                # nothing is scanned again since the cached listing.
+                result = cached[2]
+            self._listings[key] = (now, self.scans, result)
+            return result
+
+    def _list(
+            self,
+            node: _IndexNode,
+            recursion: int,
+            files: bool,
+            dirs: bool,
+            depth: int,
+            now: float,
+            result: _Listing,
+    ) -> None:
+        for name, path, is_file, is_dir in self._entries(node, now):
+            if is_file and files:
+                result.append((path, depth, False))
+            if is_dir and dirs:
+                result.append((path, depth, True))
+                if recursion != 0:
+                    child = self._child(node, name, path)
+                    self._list(child, recursion - 1, files, dirs, depth + 1, now, result)
+
+    def tree(
+            self,
+            recursion: int = -1,
+            descriptions: Union[Dict[str, str], DescriptionsGetter, None] = None,
+            *,
+            prefix: str = "",
+            files: bool = True,
+            dirs: bool = True,
+            depth: int = 0,
+            indent: str = " " * 4,
+            cache_token: Optional[Callable[[_Listing], Any]] = None,
+    ) -> str:
+        """
+        the text of the indexed directory tree, same as `generate_directory_tree`.
+        :param cache_token: make a token of the descriptions of the listing, such as the mtimes of their files.
+            the text is rendered again only if the listing or the token changes,
+            and the token is made at most once in `check_interval` seconds.
+            without descriptions the text is kept until the listing changes.
+        """
+        listed = self.list_dir(recursion, prefix=prefix, files=files, dirs=dirs, depth=depth)
+        if descriptions is not None and cache_token is None:
+            return _render_directory_tree(self.root, listed, descriptions, indent)
+        key = (prefix, recursion, files, dirs, depth, indent)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._trees.get(key, None)
+        token = None
+        if cached is not None and cached[0] is listed:
+            if now - cached[1] < self.check_interval:
+                return cached[3]
+            token = cache_token(listed) if cache_token is not None else None
+            if token == cached[2]:
+                with self._lock:
+                    self._trees[key] = (listed, now, token, cached[3])
+                return cached[3]
+        elif cache_token is not None:
+            token = cache_token(listed)
+        text = _render_directory_tree(self.root, listed, descriptions, indent)
+        with self._lock:
+            self._trees[key] = (listed, now, token, text)
+        return text
+
+    def expire(self, prefix: str = "") -> None:
+        """
+        check the directory by its mtime at the next listing, such as after it is changed by this process.
+        """
+        with self._lock:
+            self._node(prefix).checked_at = 0.0
+            self._listings.clear()
+
+    def invalidate(self) -> None:
+        """
+        scan all the directories again at the next listing.
+        """
+        with self._lock:
+            self._root_node = _IndexNode(self.root)
+            self._listings.clear()
+            self._trees.clear()
+
+
+_directory_indexes: "OrderedDict[Tuple[str, Tuple[str, ...]], DirectoryIndex]" = OrderedDict()
+_directory_indexes_lock = Lock()
+_directory_indexes_size = 16
+
+
+def get_directory_index(root: Union[pathlib.Path, str], ignores: Iterable[str] = None) -> DirectoryIndex:
+    """
+    get the shared index of the directory with the ignores, the least recently used ones are dropped.
+    """
+    key = (os.path.abspath(root), tuple(ignores or []))
+    with _directory_indexes_lock:
+        index = _directory_indexes.get(key, None)
+        if index is not None:
+            _directory_indexes.move_to_end(key)
+            return index
+        index = DirectoryIndex(key[0], key[1])
+        _directory_indexes[key] = index
+        while len(_directory_indexes) > _directory_indexes_size:
+            _directory_indexes.popitem(last=False)
+        return index
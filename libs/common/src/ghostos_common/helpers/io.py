@@ -1,5 +1,17 @@
-from contextlib import redirect_stdout
 import io
+import sys
+from contextlib import redirect_stdout, contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional, TextIO, List, Iterator
+
+__all__ = [
+    'BufferPrint',
+    'BoundedStringIO',
+    'StdoutRouter',
+    'install_stdout_router',
+    'redirect_stdout_local',
+]
 
 
 class BufferPrint:
@@ -16,3 +28,140 @@ class BufferPrint:
 
     def buffer(self) -> str:
         return self._buffer.getvalue()
+
+
+class BoundedStringIO(io.TextIOBase):
+    """
+    text buffer that keeps at most `max_size` characters.
+    the head and the tail of the output are kept, the middle is dropped and replaced by a truncation marker.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        """
+        :param max_size: max characters to keep, < 0 means unbounded.
+        """
+        super().__init__()
+        self._max_size = max_size
+        self._head_size = max_size // 2 if max_size >= 0 else -1
+        self._tail_size = max_size - self._head_size if max_size >= 0 else -1
+        self._head: List[str] = []
+        self._head_length = 0
+        self._tail: List[str] = []
+        self._tail_length = 0
+        self._dropped = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed buffer")
+        length = len(s)
+        if self._head_size < 0:
+            self._head.append(s)
+            self._head_length += length
+            return length
+        if self._head_length < self._head_size:
+            cut = self._head_size - self._head_length
+            self._head.append(s[:cut])
+            self._head_length += min(cut, length)
+            s = s[cut:]
+        if s:
+            self._tail.append(s)
+            self._tail_length += len(s)
+            # compact lazily, so each character is copied a constant number of times.
+            if self._tail_length > self._tail_size * 2:
+                self._compact()
+        return length
+
+    def _compact(self) -> None:
+        tail = "".join(self._tail)
+        keep = tail[len(tail) - self._tail_size:] if self._tail_size > 0 else ""
+        self._dropped += len(tail) - len(keep)
+        self._tail = [keep] if keep else []
+        self._tail_length = len(keep)
+
+    def truncated(self) -> int:
+        """
+        :return: count of the dropped characters.
+        """
+        if self._tail_size >= 0 and self._tail_length > self._tail_size:
+            self._compact()
+        return self._dropped
+
+    def getvalue(self) -> str:
+        dropped = self.truncated()
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if dropped == 0:
+            return head + tail
+        return f"{head}\n... [{dropped} characters truncated] ...\n{tail}"
+
+
+_stdout_target: ContextVar[Optional[TextIO]] = ContextVar("ghostos_stdout_target", default=None)
+_install_lock = Lock()
+
+
+class StdoutRouter(io.TextIOBase):
+    """
+    proxy installed as `sys.stdout` that writes to the target of the current context,
+    so concurrent threads or tasks can capture their own output without swapping the global `sys.stdout`.
+    output of a context without target goes to the original stdout.
+    """
+
+    def __init__(self, default: TextIO):
+        super().__init__()
+        self.default = default
+
+    def target(self) -> TextIO:
+        target = _stdout_target.get()
+        return target if target is not None else self.default
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        return self.target().write(s)
+
+    def flush(self) -> None:
+        self.target().flush()
+
+    def isatty(self) -> bool:
+        return self.target().isatty()
+
+    def fileno(self) -> int:
+        return self.default.fileno()
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self.default, "encoding", "utf-8")
+
+    def __getattr__(self, item):
+        return getattr(self.default, item)
+
+
+def install_stdout_router() -> StdoutRouter:
+    """
+    install the StdoutRouter as sys.stdout if it is not installed yet.
+    """
+    with _install_lock:
+        stdout = sys.stdout
+        if isinstance(stdout, StdoutRouter):
+            return stdout
+        router = StdoutRouter(stdout)
+        sys.stdout = router
+        return router
+
+
+@contextmanager
+def redirect_stdout_local(target: TextIO) -> Iterator[TextIO]:
+    """
+    redirect the stdout of the current thread / task only.
+    threads started inside the block do not inherit the context, their output goes to the original stdout.
+    """
+    install_stdout_router()
+    token = _stdout_target.set(target)
+    try:
+        yield target
+    finally:
+        _stdout_target.reset(token)
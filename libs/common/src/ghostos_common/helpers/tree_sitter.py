@@ -1,5 +1,7 @@
 from typing import Optional, Iterable, List, Set, Dict, Type, ClassVar, Generator
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
 from tree_sitter import (
     Tree, Node as TreeSitterNode,
 )
@@ -11,6 +13,7 @@ _PythonParser = None
 
 __all__ = [
     'tree_sitter_parse', 'code_syntax_check', 'traverse_tree', 'get_error_nodes', 'get_node_error',
+    'ModuleSyntaxChecker', 'get_module_syntax_checker',
     'TreeSitterNode', 'TreeNodeType',
     'PyNode', 'PyClassNode', 'PyAttrNode', 'PyImportNode', 'PyModuleNode', 'PyStrNode',
 ]
@@ -42,6 +45,82 @@ def code_syntax_check(code: str) -> Optional[str]:
     return None
 
 
+class ModuleSyntaxChecker:
+    """
+    check the syntax of the code appended to a module source.
+    the module is parsed once. the statements before the last top-level one are complete,
+    so the appended code is parsed from the start of the last statement only,
+    and the cost does not grow with the module size.
+    """
+
+    def __init__(self, source: str, separator: str = "\n\n"):
+        """
+        :param source: the module source code
+        :param separator: inserted between the module source and the appended code
+        """
+        self.source = source
+        self._prefix = source + separator
+        prefix_bytes = self._prefix.encode()
+        tree = tree_sitter_parse(self._prefix)
+        errors = []
+        travel_node_error(self._prefix, tree.root_node, errors)
+        self.errors: List[str] = errors
+        """the syntax errors of the module source itself"""
+
+        # the last top-level statement may be continued by the appended code, like `if` and `else`.
+        start_byte, start_row = 0, 0
+        for child in reversed(tree.root_node.children):
+            if child.type != "comment":
+                # from the start of the line, the statements may be joined by semicolons.
+                start_byte = prefix_bytes.rfind(b"\n", 0, child.start_byte) + 1
+                start_row = child.start_point[0]
+                break
+        self._tail = prefix_bytes[start_byte:].decode()
+        self._tail_row = start_row
+
+    def check(self, code: str) -> Optional[str]:
+        """
+        check the syntax of the module source with the code appended.
+        :return: same as code_syntax_check of the joined code
+        """
+        if self.errors:
+            # the statements of the module are not reliable.
+            return code_syntax_check(self._prefix + code)
+        code = self._tail + code
+        try:
+            tree = tree_sitter_parse(code)
+        except Exception as e:
+            return f"parse code failed: {e}"
+
+        errors = []
+        travel_node_error(code, tree.root_node, errors, self._tail_row)
+        if errors:
+            return "- " + "\n- ".join(errors)
+        return None
+
+
+_module_checkers: "OrderedDict[str, ModuleSyntaxChecker]" = OrderedDict()
+_module_checkers_lock = Lock()
+_module_checkers_size = 32
+
+
+def get_module_syntax_checker(source: str) -> ModuleSyntaxChecker:
+    """
+    get the cached syntax checker of the module source, the least recently used ones are dropped.
+    """
+    with _module_checkers_lock:
+        checker = _module_checkers.get(source, None)
+        if checker is not None:
+            _module_checkers.move_to_end(source)
+            return checker
+    checker = ModuleSyntaxChecker(source)
+    with _module_checkers_lock:
+        _module_checkers[source] = checker
+        while len(_module_checkers) > _module_checkers_size:
+            _module_checkers.popitem(last=False)
+    return checker
+
+
 def traverse_tree(tree: Tree) -> Generator[TreeSitterNode, None, None]:
     """
     simplify traversal of tree.
@@ -62,23 +141,27 @@ def traverse_tree(tree: Tree) -> Generator[TreeSitterNode, None, None]:
             break
 
 
-def travel_node_error(code: str, node: TreeSitterNode, errors: List[str]) -> None:
-    error = get_node_error(code, node)
+def travel_node_error(code: str, node: TreeSitterNode, errors: List[str], line_offset: int = 0) -> None:
+    if not node.has_error:
+        # no error in the subtree.
+        return
+    error = get_node_error(code, node, line_offset)
     if error is not None:
         errors.append(error)
         return
     for child in node.children:
-        travel_node_error(code, child, errors)
+        travel_node_error(code, child, errors, line_offset)
 
 
-def get_node_error(code: str, node: TreeSitterNode) -> Optional[str]:
+def get_node_error(code: str, node: TreeSitterNode, line_offset: int = 0) -> Optional[str]:
     """
     get all the errors when traversing a node
+    :param line_offset: lines before the code, added to the line numbers of the errors
     """
     if node.is_error:
         start_point_row, col = node.start_point
-        line_number = start_point_row + 1
-        line_content = code.splitlines()[line_number - 1]
+        line_content = code.splitlines()[start_point_row]
+        line_number = start_point_row + 1 + line_offset
         # 这里假设错误分析就是节点的类型和文本内容
         return f"Syntax Error at line {line_number}: `{line_content}`"
     return None
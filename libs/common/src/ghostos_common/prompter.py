@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import inspect
+from collections import OrderedDict
+from threading import Lock
 from typing import (
     List, Union, Callable, Any, Protocol, Optional, Dict, TypeVar, Type, Generic, Iterable,
 )
@@ -19,7 +21,8 @@ __all__ = [
     # -- prompt object model -- #
     'PromptObjectModel', 'POM', 'BasePOM',
     'DataPOM', 'DataPOMDriver',
-    'TextPOM',
+    'TextPOM', 'LazyPOM',
+    'clear_prompt_cache',
     'InspectPOM',
 
     # --- get value prompt --- #
@@ -98,6 +101,16 @@ class PromptObjectModel(ABC):
     __named_children__: Optional[Dict[str, PromptObjectModel]] = None
     """ children with unique names"""
 
+    __cache_key__: Optional[str] = None
+    """ if given, the rendered prompt of the node and its children is cached by (key, depth)"""
+
+    def with_cache_key(self, key: str) -> Self:
+        """
+        declare the node and its children are static for the key, they are rendered once.
+        """
+        self.__cache_key__ = key
+        return self
+
     def with_children(self, *children: PromptObjectModel, **slots_children: PromptObjectModel) -> Self:
         children = list(children)
         if len(children) > 0:
@@ -155,7 +168,17 @@ class PromptObjectModel(ABC):
         :param depth:
         :return:
         """
-
+        key = self.__cache_key__
+        if key is not None:
+            cached = _rendered_prompts.get((key, depth))
+            if cached is not None:
+                return cached
+            rendered = self._render_prompt(container, depth)
+            _rendered_prompts.set((key, depth), rendered)
+            return rendered
+        return self._render_prompt(container, depth)
+
+    def _render_prompt(self, container: Container, depth: int) -> str:
         title = self.get_title()
         depth = depth
         if title:
@@ -227,6 +250,45 @@ class BasePOM(BaseModel, PromptObjectModel, ABC):
         return result.with_children(*children)
 
 
+class _RenderedPrompts:
+    """
+    the rendered prompts of the POM nodes with cache keys, the least recently used are dropped.
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._prompts: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            prompt = self._prompts.get(key, None)
+            if prompt is not None:
+                self._prompts.move_to_end(key)
+            return prompt
+
+    def set(self, key: tuple, prompt: str) -> None:
+        with self._lock:
+            self._prompts[key] = prompt
+            self._prompts.move_to_end(key)
+            while len(self._prompts) > self.max_size:
+                self._prompts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._prompts.clear()
+
+
+_rendered_prompts = _RenderedPrompts()
+
+
+def clear_prompt_cache() -> None:
+    """
+    clear the rendered prompts of the POM nodes with cache keys.
+    """
+    _rendered_prompts.clear()
+
+
 POM = PromptObjectModel
 """alias of the PromptObjectModel"""
 
@@ -293,6 +355,23 @@ class TextPOM(BasePOM):
         return self.title
 
 
+class LazyPOM(PromptObjectModel):
+    """
+    POM whose content is generated by a function when it is rendered,
+    with a cache key the function is not called again for the same key.
+    """
+
+    def __init__(self, title: str, content: Callable[[], str]):
+        self.title = title
+        self.content = content
+
+    def self_prompt(self, container: Container) -> str:
+        return self.content()
+
+    def get_title(self) -> str:
+        return self.title
+
+
 class InspectPOM(BasePOM, DataPOM):
     """
     test only object.
@@ -20,3 +20,57 @@ def test_is_pathname_ignored():
             except AssertionError:
                 print(c)
                 raise
+
+
+def test_ignore_matcher_same_as_is_pathname_ignored():
+    from ghostos_common.helpers.files import IgnoreMatcher
+    patterns = ["*.pyc", "!keep.pyc", "build/", "__pycache__", ".git/", "", "#comment"]
+    matcher = IgnoreMatcher(patterns)
+    for name in ["a.pyc", "keep.pyc", "build", "__pycache__", ".git", "foo.py", "", "#comment"]:
+        for is_dir in (True, False):
+            assert matcher.ignored(name, is_dir) is is_pathname_ignored(name, patterns, is_dir)
+
+
+def test_directory_index_tree(tmp_path):
+    from ghostos_common.helpers.files import DirectoryIndex, generate_directory_tree
+    for d in ["a/b/c", "a/d", "build", "e"]:
+        (tmp_path / d).mkdir(parents=True, exist_ok=True)
+    for f in ["a/x.py", "a/b/y.py", "a/b/c/z.py", "a/b/c/z.pyc", "build/out.txt", "top.md"]:
+        (tmp_path / f).write_text("")
+    ignores = ["*.pyc", "build/"]
+    descriptions = {"a/x.py": "the x"}
+    index = DirectoryIndex(tmp_path, ignores, check_interval=0)
+
+    def expect(**kwargs):
+        return generate_directory_tree(tmp_path, ignores=ignores, descriptions=descriptions, **kwargs)
+
+    for kwargs in [
+        dict(recursion=-1),
+        dict(recursion=0),
+        dict(recursion=1, prefix="a"),
+        dict(recursion=-1, files=False),
+        dict(recursion=-1, dirs=False),
+    ]:
+        assert index.tree(descriptions=descriptions, **kwargs) == expect(**kwargs)
+
+    # the unchanged directories are not scanned again.
+    scans = index.scans
+    index.tree()
+    assert index.scans == scans
+
+    (tmp_path / "a/b/new.py").write_text("")
+    (tmp_path / "a/d").rmdir()
+    assert index.tree(descriptions=descriptions) == expect(recursion=-1)
+    assert index.scans == scans + 2
+
+
+def test_directory_index_check_interval(tmp_path):
+    from ghostos_common.helpers.files import DirectoryIndex
+    (tmp_path / "a.txt").write_text("")
+    index = DirectoryIndex(tmp_path, check_interval=60)
+    assert [p.name for p, _, _ in index.list_dir()] == ["a.txt"]
+    (tmp_path / "b.txt").write_text("")
+    # trusted until the interval passes or the directory is expired.
+    assert len(index.list_dir()) == 1
+    index.expire()
+    assert sorted(p.name for p, _, _ in index.list_dir()) == ["a.txt", "b.txt"]
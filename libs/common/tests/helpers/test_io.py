@@ -0,0 +1,38 @@
+import threading
+from io import StringIO
+
+from ghostos_common.helpers import BoundedStringIO, redirect_stdout_local
+
+
+def test_bounded_string_io_truncate():
+    buffer = BoundedStringIO(10)
+    buffer.write("hello")
+    assert buffer.getvalue() == "hello"
+    for i in range(100):
+        buffer.write(str(i % 10))
+    value = buffer.getvalue()
+    assert value.startswith("hello")
+    assert value.endswith("56789")
+    assert buffer.truncated() == 95
+    assert "[95 characters truncated]" in value
+
+
+def test_redirect_stdout_local_in_threads():
+    outputs = {}
+    barrier = threading.Barrier(4)
+
+    def run(name: str):
+        buffer = StringIO()
+        with redirect_stdout_local(buffer):
+            barrier.wait()
+            for _ in range(50):
+                print(name)
+        outputs[name] = buffer.getvalue()
+
+    threads = [threading.Thread(target=run, args=(f"thread{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for name, output in outputs.items():
+        assert output == f"{name}\n" * 50
@@ -37,3 +37,34 @@ print(source)
 """
     error = code_syntax_check(code.strip())
     assert error and "hello world)" in error
+
+
+def test_module_syntax_checker_same_as_full_check():
+    from ghostos_common.helpers.tree_sitter import ModuleSyntaxChecker
+    source = "\n\n".join(f"def foo_{i}(a: int) -> int:\n    return a + {i}" for i in range(50))
+    checker = ModuleSyntaxChecker(source)
+    assert checker.errors == []
+    for tail in ["if foo_1(1):\n    pass", "@decorator", "x = 1; y = 2", "# comment"]:
+        for code in ["else:\n    pass", "def main(moss):\n    pass", "print('hello)", "    x = 1"]:
+            module = source + "\n\n" + tail
+            joined = module + "\n\n" + code
+            assert ModuleSyntaxChecker(module).check(code) == code_syntax_check(joined)
+    cases = [
+        "print(foo_1(2))",
+        "def main(moss):\n    return foo_2(3)",
+        "print('hello)",
+        "def main(moss)\n    return 1",
+        "    return 1",
+        "",
+    ]
+    for code in cases:
+        assert checker.check(code) == code_syntax_check(source + "\n\n" + code)
+
+
+def test_module_syntax_checker_with_module_errors():
+    from ghostos_common.helpers.tree_sitter import ModuleSyntaxChecker
+    source = "def foo():\n    print('hello)"
+    checker = ModuleSyntaxChecker(source)
+    assert len(checker.errors) > 0
+    code = "print(1)"
+    assert checker.check(code) == code_syntax_check(source + "\n\n" + code)
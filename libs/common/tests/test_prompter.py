@@ -59,3 +59,28 @@ def test_pom_with_children():
     c = Container()
     prompt = t.get_prompt(c)
     assert "2" in prompt
+
+
+def test_pom_with_cache_key():
+    from ghostos_common.prompter import LazyPOM, clear_prompt_cache
+    clear_prompt_cache()
+    calls = []
+
+    def content() -> str:
+        calls.append(1)
+        return "static content"
+
+    c = Container()
+    for i in range(3):
+        t = TextPOM(title="root", content=f"turn {i}").with_children(
+            LazyPOM("static", content).with_cache_key("test_pom_with_cache_key"),
+        )
+        prompt = t.get_prompt(c)
+        assert f"turn {i}" in prompt
+        assert "## static\n\nstatic content" in prompt
+    assert len(calls) == 1
+
+    # rendered again at another depth.
+    prompt = LazyPOM("static", content).with_cache_key("test_pom_with_cache_key").get_prompt(c)
+    assert prompt == "# static\n\nstatic content"
+    assert len(calls) == 2
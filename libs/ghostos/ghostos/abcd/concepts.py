@@ -305,6 +305,14 @@ class Action(PromptPipe, ABC):
     def run(self, session: Session, caller: FunctionCaller) -> Union[Operator, None]:
         pass
 
+    def parallel_safe(self) -> bool:
+        """
+        if the callers of the action can run concurrently with the other parallel safe callers of the same turn.
+        a parallel safe action shall not depend on the other callers, and shall be idempotent,
+        since a caller exceeding the timeout of the session is abandoned but may still be running.
+        """
+        return False
+
 
 class GhostOSModes(Protocol):
     """
@@ -594,7 +602,16 @@ class Conversation(Protocol[G]):
     @abstractmethod
     def pop_event(self) -> Optional[Event]:
         """
-        pop event of the current task
+        pop event of the current task.
+        the events responded by respond_event are acknowledged, the others shall be acknowledged by ack_event.
+        """
+        pass
+
+    @abstractmethod
+    def ack_event(self, event: Event) -> None:
+        """
+        acknowledge the popped event that is handled without respond_event,
+        otherwise an at-least-once eventbus delivers it again.
         """
         pass
 
@@ -882,6 +899,7 @@ class Session(Generic[G], ABC):
             name: str = "",
             stage: str = "",
             payloads: Optional[List[Payload]] = None,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
     ) -> "Messenger":
         """
         Task 当前运行状态下, 向上游发送消息的 Messenger.
@@ -890,6 +908,7 @@ class Session(Generic[G], ABC):
         :param stage: set the stage of the messages.
         :param name: if empty, use the ghost name
         :param payloads: add payloads to all the message complete items.
+        :param on_caller: called with each function caller as soon as its message is complete during streaming.
         """
         pass
 
@@ -899,16 +918,33 @@ class Session(Generic[G], ABC):
             messages: Iterable[MessageKind],
             stage: str = "",
             save: bool = True,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
     ) -> Tuple[List[Message], List[FunctionCaller]]:
         """
         sending messages to client side.
         :param messages: the items to send. streaming or complete message.
         :param stage: set the stage of the all the messages.
         :param save: save the messages to session.thread. If false, shall handle the messages manually
+        :param on_caller: called with each function caller as soon as its message is complete during streaming.
         :return: join the chunks, return parsed (complete messages, function callers)
         """
         pass
 
+    def respond_and_handle_callers(
+            self,
+            messages: Iterable[MessageKind],
+            stage: str = "",
+    ) -> Tuple[List[Message], Optional[Operator]]:
+        """
+        respond the messages and handle the function callers of them.
+        the implementation may start the parallel safe callers while the messages are still streaming.
+        :param messages: the items to send. streaming or complete message.
+        :param stage: set the stage of the all the messages.
+        :return: (complete messages, operator returned by the callers)
+        """
+        messages, callers = self.respond(messages, stage)
+        return messages, self.handle_callers(callers)
+
     @abstractmethod
     def respond_buffer(
             self,
@@ -1006,7 +1042,7 @@ class Session(Generic[G], ABC):
                 self.respond([caller.new_output(f"Error: function `{caller.name}` not found")])
                 continue
             action = actions[caller.name]
-            self.logger.error("session handle caller %s with action %s ", caller.name, type(action))
+            self.logger.debug("session handle caller %s with action %s ", caller.name, type(action))
             op = action.run(self, caller)
             if op is not None:
                 return op
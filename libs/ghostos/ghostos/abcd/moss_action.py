@@ -1,9 +1,10 @@
-from typing import Union, Optional, ClassVar, Dict
+from typing import Union, Optional, ClassVar, Dict, Any
 
 from pydantic import BaseModel, Field
 from ghostos.abcd.concepts import Operator, Session, Action, SessionPyContext
-from ghostos_common.prompter import PromptObjectModel, TextPOM
-from ghostos_moss import MossRuntime
+from ghostos_common.prompter import PromptObjectModel, TextPOM, LazyPOM
+from ghostos_common.helpers import md5, generate_import_path
+from ghostos_moss import MossRuntime, MossPrompter, MOSS_TYPE_NAME
 from ghostos.core.messages import FunctionCaller
 from ghostos.core.llms import (
     Prompt, PromptPipe,
@@ -11,6 +12,7 @@ from ghostos.core.llms import (
 )
 
 import json
+import inspect
 
 __all__ = [
     "MossAction", 'MOSS_INTRODUCTION', 'MOSS_FUNCTION_DESC', 'MOSS_CONTEXT_TEMPLATE', 'get_moss_context_pom',
@@ -202,41 +204,63 @@ class MossAction(Action, PromptPipe):
 def get_moss_context_pom(title: str, runtime: MossRuntime) -> PromptObjectModel:
     """
     generate prompt from the runtime injections bound to Moss instance.
+    the code context is rendered once for the module source, the import paths of the imported attrs,
+    the moss type and the injected types; the prompts of the injections are rendered each time.
     :param title:
     :param runtime:
     :return:
     """
     prompter = runtime.prompter()
-    source_code = prompter.get_source_code()
-    imported_attrs_prompt = prompter.get_imported_attrs_prompt([Operator])
-    magic_prompt = prompter.get_magic_prompt()
-    magic_prompt_info = ""
-    if magic_prompt:
-        magic_prompt_info = f"more information about the module:\n```text\n{magic_prompt}\n```\n"
+    modulename = runtime.module().__name__
+
+    def code_context() -> str:
+        source_code = prompter.get_source_code()
+        imported_attrs_prompt = prompter.get_imported_attrs_prompt([Operator])
+        magic_prompt = prompter.get_magic_prompt()
+        magic_prompt_info = ""
+        if magic_prompt:
+            magic_prompt_info = f"more information about the module:\n```text\n{magic_prompt}\n```\n"
+        return MOSS_CONTEXT_TEMPLATE.format(
+            modulename=modulename,
+            source_code=source_code,
+            imported_attrs_prompt=imported_attrs_prompt,
+            magic_prompt_info=magic_prompt_info,
+        )
 
     injections = runtime.moss_injections()
-    children = []
-    container = runtime.container()
+    context_hash = _code_context_hash(prompter, injections)
+    children = [LazyPOM("", code_context).with_cache_key(f"moss_code_context:{modulename}:{context_hash}")]
 
+    container = runtime.container()
     for name, injection in injections.items():
         if isinstance(injection, PromptObjectModel):
-            prompter = TextPOM(
+            children.append(TextPOM(
                 title=f"property `moss.{name}`",
                 content=injection.get_prompt(container),
-            )
-            children.append(prompter)
-
-    content = MOSS_CONTEXT_TEMPLATE.format(
-        modulename=runtime.module().__name__,
-        source_code=source_code,
-        imported_attrs_prompt=imported_attrs_prompt,
-        magic_prompt_info=magic_prompt_info,
-    )
-
-    return TextPOM(
-        title=title,
-        content=content,
-    ).with_children(*children)
+            ))
+    return TextPOM(title=title).with_children(*children)
+
+
+def _code_context_hash(prompter: MossPrompter, injections: Dict[str, Any]) -> str:
+    """
+    hash of everything the code context is rendered from, by cheap identifiers, since it is computed each turn.
+    """
+    parts = [md5(prompter.get_source_code(exclude_hide_code=False))]
+    moss_type = prompter.module().__dict__.get(MOSS_TYPE_NAME, None)
+    if moss_type is not None:
+        parts.append(_import_path(moss_type))
+    for name, value in sorted(prompter.get_imported_attrs().items(), key=lambda item: item[0]):
+        parts.append(f"{name}={_import_path(value)}")
+    for name, value in sorted(injections.items(), key=lambda item: item[0]):
+        parts.append(f"{name}={_import_path(type(value))}")
+    return md5("\n".join(parts))
+
+
+def _import_path(value: Any) -> str:
+    if not (inspect.ismodule(value) or inspect.isclass(value) or inspect.isfunction(value)):
+        # the instances are identified by their types.
+        value = type(value)
+    return generate_import_path(value)
 
 
 def get_moss_injections_poms(runtime: MossRuntime) -> Dict[str, PromptObjectModel]:
@@ -88,17 +88,14 @@ class ActionThought(OpThought):
         streaming = session.allow_streaming()
         session.logger.debug("start llm thinking on prompt %s", prompt.id)
         items = llm_api.deliver_chat_completion(_prompt, streaming)
-        messages, callers = session.respond(items, self.message_stage)
-        session.logger.debug("end llm thinking receive callers: %s", callers)
+        # the parallel safe callers start while the completion is still streaming.
+        messages, op = session.respond_and_handle_callers(items, self.message_stage)
+        session.logger.debug("end llm thinking and callers return operator: %s", op)
 
         # extends result into the origin prompt
         prompt.added.extend(messages)
         session.logger.debug("llm thinking on prompt %s is done", prompt.id)
-
-        if callers:
-            op = session.handle_callers(callers, False)
-            return prompt, op
-        return prompt, None
+        return prompt, op
 
     def get_llm_api(self, session: Session) -> LLMApi:
         llms = session.container.force_fetch(LLMs)
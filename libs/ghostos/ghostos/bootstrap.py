@@ -210,7 +210,7 @@ def default_application_contracts() -> Contracts:
     from ghostos.contracts.variables import Variables
     from ghostos.framework.configs import Configs
     from ghostos.framework.processes import GoProcesses
-    from ghostos.framework.threads import GoThreads
+    from ghostos.framework.threads import GoThreads, ThreadRecall
     from ghostos.framework.tasks import GoTasks
     from ghostos.framework.eventbuses import EventBus
     from ghostos.framework.llms import LLMs, PromptStorage
@@ -219,6 +219,8 @@ def default_application_contracts() -> Contracts:
     from ghostos.framework.ghostos import GhostOS
     from ghostos.framework.assets import ImageAssets, AudioAssets
     from ghostos.framework.realtime import Realtime
+    from ghostos.framework.embeddings import Embeddings
+    from ghostos.framework.cache import Cache
     from ghostos.core.aifunc import AIFuncExecutor, AIFuncRepository
 
     return Contracts([
@@ -234,6 +236,8 @@ def default_application_contracts() -> Contracts:
         Shutdown,  # graceful shutdown register
         LLMs,  # LLMs interface
         PromptStorage,
+        Embeddings,  # text embeddings and vector indexes
+        Cache,  # key-value cache shared by the processes
 
         LoggerItf,  # the logger instance of application
         Modules,  # the import_module proxy
@@ -253,6 +257,7 @@ def default_application_contracts() -> Contracts:
         # session contracts
         GoProcesses,  # application processes repository
         GoThreads,  # application threads repository
+        ThreadRecall,  # semantic recall over the thread history
         GoTasks,  # application tasks repository
         EventBus,  # application session eventbus
 
@@ -278,7 +283,7 @@ def default_application_providers(
     from ghostos.framework.configs import WorkspaceConfigsProvider
     from ghostos.framework.assets import WorkspaceImageAssetsProvider, WorkspaceAudioAssetsProvider
     from ghostos.framework.processes import WorkspaceProcessesProvider
-    from ghostos.framework.threads import MsgThreadsRepoByWorkSpaceProvider
+    from ghostos.framework.threads import MsgThreadsRepoByWorkSpaceProvider, ThreadRecallProvider
     from ghostos.framework.tasks import WorkspaceTasksProvider
     from ghostos.framework.eventbuses import MemEventBusImplProvider
     from ghostos.framework.llms import ConfigBasedLLMsProvider, PromptStorageInWorkspaceProvider
@@ -287,11 +292,15 @@ def default_application_providers(
     from ghostos.framework.ghostos import GhostOSProvider
     from ghostos.framework.documents import ConfiguredDocumentRegistryProvider
     from ghostos.framework.realtime import ConfigBasedRealtimeProvider
+    from ghostos.framework.embeddings import WorkspaceEmbeddingsProvider
+    from ghostos.framework.cache import SQLiteCacheProvider
     from ghostos.core.aifunc import DefaultAIFuncExecutorProvider, AIFuncRepoByConfigsProvider
 
     # session level libraries
     from ghostos.libraries.replier import ReplierImplProvider
     from ghostos.libraries.pyeditor import SimplePyInterfaceGeneratorProvider
+    from ghostos.libraries.terminal import ShellPoolProvider
+    from ghostos.libraries.codex import PyCodexCatalogProvider, PyCodexGeneratorProvider
 
     if config is None:
         config = get_bootstrap_config(local=True)
@@ -320,18 +329,22 @@ def default_application_providers(
 
         # --- session ---#
         MsgThreadsRepoByWorkSpaceProvider(),
+        ThreadRecallProvider(),  # indexes only the threads recalled by the ghosts with recall_turns > 0
         MemEventBusImplProvider(),
 
         # --- moss --- #
         DefaultMOSSProvider(),
+        # MossRuntimePoolProvider(),  opt-in, the pooled modules only restore their builtin containers.
 
         # --- llm --- #
         ConfigBasedLLMsProvider(),
         PromptStorageInWorkspaceProvider(),
+        WorkspaceEmbeddingsProvider(),
 
         # --- basic library --- #
         DefaultModulesProvider(),
         ShutdownProvider(),
+        SQLiteCacheProvider(),
         # WorkspaceTranslationProvider("translations"),
 
         # --- aifunc --- #
@@ -344,6 +357,9 @@ def default_application_providers(
         # --- system default session level libraries --- #
         ReplierImplProvider(),
         SimplePyInterfaceGeneratorProvider(),
+        ShellPoolProvider(),  # the persistent shells of the terminals, kept by task
+        PyCodexCatalogProvider(),
+        PyCodexGeneratorProvider(),  # refreshes the module infos from the catalog
     ]
 
 
@@ -88,8 +88,89 @@ class ImageAssets(FileAssets, ABC):
     pass
 
 
+class AudioSink(ABC):
+    """
+    incremental writer of an audio asset.
+    pcm frames are appended as they arrive, so the whole audio never needs to be held in memory.
+    """
+
+    fileinfo: FileInfo
+    """the file info to save when the sink is closed. the fileid and the filename may be changed before closing."""
+
+    @abstractmethod
+    def write(self, data: bytes) -> None:
+        """
+        append pcm frames to the audio file.
+        :param data: raw pcm bytes
+        """
+        pass
+
+    @abstractmethod
+    def size(self) -> int:
+        """
+        :return: pcm bytes written so far
+        """
+        pass
+
+    @abstractmethod
+    def truncate(self, size: int) -> int:
+        """
+        drop the pcm bytes written after the size.
+        the sinks of the compressed formats only keep the latest frames unencoded, older frames are not dropped.
+        :param size: the pcm bytes to keep
+        :return: the pcm bytes kept
+        """
+        pass
+
+    @abstractmethod
+    def closed(self) -> bool:
+        pass
+
+    @abstractmethod
+    def close(self) -> Optional[FileInfo]:
+        """
+        finish the audio file (patch the header, flush the encoder) and save the file info.
+        :return: the saved file info, None if nothing was written and nothing saved.
+        """
+        pass
+
+    @abstractmethod
+    def abort(self) -> None:
+        """
+        discard the audio file without saving it.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_val is not None:
+            self.abort()
+        else:
+            self.close()
+
+
 class AudioAssets(FileAssets, ABC):
-    pass
+
+    @abstractmethod
+    def new_sink(
+            self,
+            file: FileInfo,
+            *,
+            rate: int = 24000,
+            channels: int = 1,
+            sample_width: int = 2,
+    ) -> AudioSink:
+        """
+        open a streaming sink that writes pcm frames into the audio file.
+        the audio format is decided by the file's type, such as wav / flac / ogg.
+        :param file: the file info, saved when the sink is closed.
+        :param rate: sample rate of the pcm frames
+        :param channels: channels of the pcm frames
+        :param sample_width: bytes per sample of the pcm frames
+        """
+        pass
 
 
 class StorageFileAssets(FileAssets):
@@ -104,13 +185,16 @@ class StorageFileAssets(FileAssets):
     def save(self, file: FileInfo, binary: Optional[bytes]) -> str:
         if binary is None and file.url is None:
             raise AttributeError("failed to save image: binary is None and image info is not from url.")
+        self._save_fileinfo(file)
+        if binary:
+            self._storage.put(file.filename, binary)
+        return file.filename
+
+    def _save_fileinfo(self, file: FileInfo) -> None:
         fileinfo_filename = self._get_fileinfo_filename(file.fileid)
         data = file.model_dump(exclude_none=True)
         content = yaml_pretty_dump(data)
         self._storage.put(fileinfo_filename, content.encode())
-        if binary:
-            self._storage.put(file.filename, binary)
-        return file.filename
 
     def get_binary(self, filename: str) -> Optional[bytes]:
         if self._storage.exists(filename):
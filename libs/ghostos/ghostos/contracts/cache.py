@@ -2,6 +2,23 @@ from __future__ import annotations
 
 from typing import Optional
 from abc import ABCMeta, abstractmethod
+from pydantic import BaseModel, Field
+
+__all__ = ['Cache', 'CacheMetrics']
+
+
+class CacheMetrics(BaseModel):
+    """
+    counters of a cache instance since it is created.
+    """
+    hits: int = Field(default=0, description="reads that found the value")
+    misses: int = Field(default=0, description="reads that found nothing or an expired value")
+    evictions: int = Field(default=0, description="values removed to keep the size limit")
+    expirations: int = Field(default=0, description="values removed because they are expired")
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
 
 
 class Cache(metaclass=ABCMeta):
@@ -11,6 +28,12 @@ class Cache(metaclass=ABCMeta):
 
     @abstractmethod
     def lock(self, key: str, overdue: int = 0) -> bool:
+        """
+        acquire the lock of the key, the lock is a lease released after overdue seconds.
+        :param key: the lock key, independent of the value keys
+        :param overdue: seconds of the lease, <= 0 means until unlock
+        :return: False if the lock is held by others
+        """
         pass
 
     @abstractmethod
@@ -19,6 +42,9 @@ class Cache(metaclass=ABCMeta):
 
     @abstractmethod
     def set(self, key: str, val: str, exp: int = 0) -> bool:
+        """
+        :param exp: seconds to expire, <= 0 means never.
+        """
         pass
 
     @abstractmethod
@@ -43,3 +69,9 @@ class Cache(metaclass=ABCMeta):
     @abstractmethod
     def remove(self, *keys: str) -> int:
         pass
+
+    def metrics(self) -> CacheMetrics:
+        """
+        the hit / miss / eviction counters of the cache.
+        """
+        return CacheMetrics()
@@ -1,6 +1,6 @@
 import yaml
 from abc import ABC, abstractmethod
-from typing import ClassVar, TypeVar, Type, Optional
+from typing import ClassVar, TypeVar, Type, Optional, Callable
 from typing_extensions import Self
 from pydantic import BaseModel
 from ghostos_common.helpers import generate_import_path
@@ -55,7 +55,7 @@ class Configs(ABC):
         get a Config instance or throw exception
         :param conf_type: the Config class that shall unmarshal the config data
         :param relative_path: the relative path of the config data, if pass, override the conf_type default path.
-        :return: instance of the Config.
+        :return: instance of the Config, owned by the caller.
         :exception: FileNotFoundError
         """
         pass
@@ -74,6 +74,14 @@ class Configs(ABC):
         """
         pass
 
+    def on_change(self, relative_path: str, callback: Callable[[str], None]) -> None:
+        """
+        register a callback that is called with the relative path when the config data is changed,
+        so the holders of the config can reload it without restarting the process.
+        the Configs that can not detect changes never call it.
+        """
+        pass
+
 
 TIP = """
 With object class Config and repository class Configs, 
@@ -1,4 +1,4 @@
-from typing import Optional, Iterable, Protocol
+from typing import Optional, Iterable, Protocol, Dict
 from abc import abstractmethod
 
 __all__ = ['Storage', 'FileStorage']
@@ -51,10 +51,29 @@ class Storage(Protocol):
         :param prefix_dir: 目录的相对路径位置.
         :param recursive: 是否递归查找.
         :param patten: 文件的正则规范.
-        :return: 多个文件路径名.
+        :return: 多个文件路径名, 相对于 prefix_dir.
         """
         pass
 
+    def get_many(self, file_paths: Iterable[str]) -> Dict[str, bytes]:
+        """
+        get the contents of multiple files.
+        :return: file path => content, the files not found are absent.
+        """
+        result = {}
+        for file_path in file_paths:
+            if self.exists(file_path):
+                result[file_path] = self.get(file_path)
+        return result
+
+    def put_many(self, contents: Dict[str, bytes]) -> None:
+        """
+        save multiple files.
+        :param contents: file path => content
+        """
+        for file_path, content in contents.items():
+            self.put(file_path, content)
+
 
 class FileStorage(Storage, Protocol):
     """
@@ -9,7 +9,7 @@ from ghostos.core.aifunc.func import (
     AIFunc,
     get_aifunc_instruction, get_aifunc_result_type, get_aifunc_pycontext, get_aifunc_llmapi,
 )
-from ghostos.core.llms import LLMs, Prompt
+from ghostos.core.llms import LLMs, LLMApi, Prompt
 from ghostos_moss.abcd import MossRuntime
 from ghostos.core.runtime import GoThreadInfo, EventTypes, GoThreads, thread_to_prompt
 from ghostos.core.messages import Role, Message, Stream
@@ -144,9 +144,70 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
             payload.set_payload(message)
             upstream.deliver(message)
 
+    def on_chunk(self, chunk: Message, step: ExecStep, upstream: Optional[Stream]) -> None:
+        if upstream and not upstream.completes_only():
+            # chunks are not shared with others, a shallow copy is enough.
+            chunk = chunk.model_copy()
+            chunk.name = self.aifunc.func_name()
+            upstream.send([chunk])
+
     def on_system_messages(self, messages: List[Message]) -> None:
         pass
 
+    def generate(self, llm_api: LLMApi, chat: Prompt, step: ExecStep, upstream: Optional[Stream]) -> List[Message]:
+        """
+        generate by the llm in stream, forward the chunks to the upstream,
+        and stop the generation once the moss code mark is closed, so the code is executed without waiting the rest.
+        :return: the complete generated messages
+        """
+        generated: List[Message] = []
+        buffer: Optional[Message] = None
+        # position of the code in the buffer content, -1 if the code is not started.
+        code_start = -1
+        items = llm_api.deliver_chat_completion(chat, stream=True)
+        try:
+            for item in items:
+                if item.is_complete():
+                    buffer = None
+                    code_start = -1
+                    generated.append(item)
+                    continue
+                if buffer is None:
+                    buffer = item.as_head(copy=True)
+                elif buffer.patch(item) is None:
+                    # a new message starts without the tail of the previous one.
+                    generated.append(buffer.as_tail(copy=False))
+                    buffer = item.as_head(copy=True)
+                    code_start = -1
+                self.on_chunk(item, step, upstream)
+
+                if buffer.stage:
+                    continue
+                content = buffer.content or ""
+                # only search the tail of the content that may contain a new mark.
+                search_from = max(0, len(content) - len(item.content or "") - len(CODE_MARK_RIGHT))
+                if code_start < 0:
+                    found = content.find(CODE_MARK_LEFT, max(0, search_from - len(CODE_MARK_LEFT)))
+                    if found < 0:
+                        continue
+                    code_start = found + len(CODE_MARK_LEFT)
+                    search_from = code_start
+                code_end = content.find(CODE_MARK_RIGHT, max(code_start, search_from))
+                if code_end >= 0:
+                    tail = buffer.as_tail(copy=False)
+                    tail.content = content[:code_end + len(CODE_MARK_RIGHT)]
+                    generated.append(tail)
+                    buffer = None
+                    break
+        finally:
+            # stop the generation of the llm.
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+        if buffer is not None:
+            generated.append(buffer.as_tail(copy=False))
+        return generated
+
     def think(
             self,
             manager: AIFuncExecutor,
@@ -169,7 +230,8 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
         # build chat
         self.on_system_messages(systems)
         chat = thread_to_prompt(thread.id, systems, thread)
-        step.chat = chat.model_copy(deep=True)
+        # the messages of the chat are copied from the thread already, keep the reference as the trace.
+        step.chat = chat
         # on_chat hook
         self.on_chat(chat)
 
@@ -179,14 +241,19 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
         if llm_api is None:
             llm_api = manager.default_llm_api()
 
-        # call llm api
-        ai_generation = llm_api.chat_completion(chat)
-
-        # append ai_generation
-        thread.append(ai_generation)
+        # call llm api in stream, and stop as soon as the code is closed.
+        generated = self.generate(llm_api, chat, step, upstream)
+        ai_generation = None
+        for message in generated:
+            # append ai_generation
+            thread.append(message)
+            # on_message hook
+            self.on_message(message, step, upstream)
+            if not message.stage:
+                ai_generation = message
+        if ai_generation is None:
+            ai_generation = Role.ASSISTANT.new(content="")
         step.generate = ai_generation
-        # on_message hook
-        self.on_message(ai_generation, step, upstream)
 
         # parse the ai_generation.
         code = self.parse_moss_code_in_message(ai_generation)
@@ -284,7 +351,7 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
         return thread, result, finish
 
     def parse_moss_code_in_message(self, message: Message) -> str:
-        content = message.content
+        content = message.content or ""
 
         code_start_index = content.find(CODE_MARK_LEFT)
         if code_start_index == -1:
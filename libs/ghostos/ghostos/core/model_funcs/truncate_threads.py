@@ -19,8 +19,8 @@ class TruncateThreadByLLM(LLMModelFunc[GoThreadInfo]):
         "Your Summary:",
         description="the llm instruction to use",
     )
-    truncate_at_turns: int = Field(40),
-    reduce_to_turns: int = Field(20),
+    truncate_at_turns: int = Field(40)
+    reduce_to_turns: int = Field(20)
 
     def run(self) -> R:
         thread = self.thread
@@ -42,5 +42,7 @@ class TruncateThreadByLLM(LLMModelFunc[GoThreadInfo]):
             prompt = Prompt(history=messages)
             summary = self._generate_from_prompt(prompt)
             if summary:
-                target.summary = summary
+                # the turn may be shared with the forks of the thread, write to its own copy.
+                index = next(i for i, turn in enumerate(thread.history) if turn is target)
+                thread.own_turn(index).summary = summary
         return thread
@@ -1,18 +1,153 @@
-from typing import Tuple, List
+from typing import Tuple, List, Iterable, Optional
 from numpy import ndarray
 from abc import ABC, abstractmethod
 
+__all__ = ['Embeddings', 'EmbeddingDriver', 'VectorIndex']
+
+
+class EmbeddingDriver(ABC):
+    """
+    the pluggable backend that turns texts into vectors.
+    """
+
+    @abstractmethod
+    def name(self) -> str:
+        """
+        the name of the driver, used as the model name of the Embeddings.
+        """
+        pass
+
+    @abstractmethod
+    def dimensions(self) -> int:
+        pass
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> ndarray:
+        """
+        embed texts in batch.
+        :return: float32 matrix in shape of (len(texts), dimensions)
+        """
+        pass
+
+
+class VectorIndex(ABC):
+    """
+    index of (key, vector) pairs that searches the nearest vectors by cosine similarity.
+    """
+
+    @abstractmethod
+    def dimensions(self) -> int:
+        pass
+
+    @abstractmethod
+    def add(self, keys: List[str], vectors: ndarray) -> None:
+        """
+        add or replace vectors of the keys.
+        :param keys: unique keys of the vectors
+        :param vectors: matrix in shape of (len(keys), dimensions)
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, keys: List[str]) -> int:
+        """
+        :return: count of the removed keys
+        """
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[ndarray]:
+        pass
+
+    @abstractmethod
+    def keys(self) -> Iterable[str]:
+        pass
+
+    @abstractmethod
+    def search(self, query: ndarray, top_k: int, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        search the nearest vectors of the query vector.
+        :return: the (key, similarity) pairs in descending order of similarity
+        """
+        pass
+
+    @abstractmethod
+    def search_batch(self, queries: ndarray, top_k: int, threshold: float = 0.0) -> List[List[Tuple[str, float]]]:
+        """
+        search the nearest vectors of multiple queries with one matrix product.
+        """
+        pass
+
+    @abstractmethod
+    def save(self) -> None:
+        """
+        persist the index if it is persistent.
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
 
 class Embeddings(ABC):
 
     @abstractmethod
     def get_embedding(self, lang: str, model: str = "") -> ndarray[float]:
+        """
+        :param lang: the text to embed
+        :param model: the embedding driver name, default driver if empty
+        :return: float32 vector
+        """
+        pass
+
+    @abstractmethod
+    def get_embeddings(self, texts: List[str], model: str = "") -> ndarray:
+        """
+        embed texts in batch.
+        :return: float32 matrix in shape of (len(texts), dimensions)
+        """
         pass
 
     @abstractmethod
     def similarity(self, lang: str, compare: str, model: str = "") -> float:
+        """
+        cosine similarity of two texts.
+        """
+        pass
+
+    @abstractmethod
+    def search(
+            self,
+            query: str,
+            selections: List[str],
+            top_k: int,
+            threshold: float,
+            model: str = "",
+    ) -> List[Tuple[str, float]]:
+        """
+        search the most similar selections of the query.
+        :return: the (selection, similarity) pairs in descending order of similarity
+        """
+        pass
+
+    @abstractmethod
+    def register_driver(self, driver: EmbeddingDriver, default: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def get_index(self, name: str, model: str = "", *, quantize: bool = False) -> VectorIndex:
+        """
+        get a named vector index, persisted by the implementation.
+        :param name: the name of the index, such as `memo` or `threads`
+        :param model: the embedding driver name of the vectors in the index
+        :param quantize: store the vectors as int8 to save memory
+        """
         pass
 
     @abstractmethod
-    def search(self, query: str, selections: List[str], top_k: int, threshold: float, model: str = "") -> float:
+    def release_index(self, name: str, model: str = "", *, quantize: bool = False) -> None:
+        """
+        save the named vector index and drop it from memory, the next get_index loads it again.
+        """
         pass
@@ -270,6 +270,37 @@ class EventBus(ABC):
         """
         pass
 
+    def pop_task_events(self, task_id: str, limit: int) -> List[Event]:
+        """
+        pop at most `limit` events of the task in the same order of pop_task_event.
+        """
+        events = []
+        while len(events) < limit:
+            e = self.pop_task_event(task_id)
+            if e is None:
+                break
+            events.append(e)
+        return events
+
+    def pop_task_notifications(self, limit: int) -> List[str]:
+        """
+        pop at most `limit` task notifications from the main queue.
+        """
+        task_ids = []
+        while len(task_ids) < limit:
+            task_id = self.pop_task_notification()
+            if task_id is None:
+                break
+            task_ids.append(task_id)
+        return task_ids
+
+    def ack_event(self, e: Event) -> None:
+        """
+        acknowledge that the popped event is handled.
+        an at-least-once eventbus redelivers the popped events that are not acknowledged in time.
+        """
+        pass
+
     @abstractmethod
     def clear_task(self, task_id: str) -> None:
         pass
@@ -1,7 +1,8 @@
-from typing import Optional, List, Iterable, Dict, Any
+from typing import Optional, List, Iterable, Dict, Any, Set
 from typing_extensions import Self
 from abc import ABC, abstractmethod
-from pydantic import BaseModel, Field
+from copy import deepcopy
+from pydantic import BaseModel, Field, PrivateAttr
 from ghostos.core.messages import Message, copy_messages, Role, MessageType, MessageStage, FunctionCaller
 from ghostos_moss.pycontext import PyContext
 from ghostos.core.llms import Prompt
@@ -103,6 +104,9 @@ class Turn(BaseModel):
     def is_callback(self) -> bool:
         return self.event is not None and self.event.callback
 
+    def has_message(self, msg_id: str) -> bool:
+        return any(exists.msg_id == msg_id for exists in self.added)
+
     def update_message(self, message: Message) -> bool:
         messages = []
         found = False
@@ -120,6 +124,10 @@ class GoThreadInfo(BaseModel):
     """
     对话历史.
     存储时应该使用别的数据结构.
+
+    the forks and copies share the history turns instead of copying them (copy-on-write).
+    a shared turn is copied only when it is modified through the methods of the thread,
+    so modify the history turns by `own_turn` / `last_turn` instead of `history[i]`.
     """
     id: str = Field(
         default_factory=uuid,
@@ -156,6 +164,9 @@ class GoThreadInfo(BaseModel):
         description="the current turn",
     )
 
+    # ids of the turns shared with the forks or the copies of this thread.
+    _shared: Set[int] = PrivateAttr(default_factory=set)
+
     @classmethod
     def new(
             cls,
@@ -190,13 +201,39 @@ class GoThreadInfo(BaseModel):
     def last_turn(self) -> Turn:
         """
         返回历史最后一个回合的数据.
+        the returned turn is owned by this thread and safe to modify.
         """
+        if self.current is not None:
+            return self.current
+        if len(self.history) > 0:
+            return self.own_turn(-1)
+        if id(self.on_created) in self._shared:
+            self.on_created = self._copy_turn(self.on_created)
+        return self.on_created
+
+    def _last_turn(self) -> Turn:
+        # read only version of last_turn, never copies.
         if self.current is not None:
             return self.current
         if len(self.history) > 0:
             return self.history[-1]
         return self.on_created
 
+    def own_turn(self, index: int) -> Turn:
+        """
+        get the history turn at the index to modify it.
+        the turn shared with the forks or copies is replaced by its own copy first.
+        """
+        turn = self.history[index]
+        if id(turn) in self._shared:
+            turn = self._copy_turn(turn)
+            self.history[index] = turn
+        return turn
+
+    def _copy_turn(self, turn: Turn) -> Turn:
+        self._shared.discard(id(turn))
+        return turn.model_copy(deep=True)
+
     def get_history_turns(self, *, truncate: bool = True) -> List[Turn]:
         turns = []
         if self.history:
@@ -228,16 +265,22 @@ class GoThreadInfo(BaseModel):
     def update_message(self, message: Message) -> bool:
         if not message.is_complete():
             return False
-        for turn in self.turns(truncate=False):
-            if turn.update_message(message):
-                return True
+        if self.on_created.has_message(message.msg_id):
+            if id(self.on_created) in self._shared:
+                self.on_created = self._copy_turn(self.on_created)
+            return self.on_created.update_message(message)
+        for i, turn in enumerate(self.history):
+            if turn.has_message(message.msg_id):
+                return self.own_turn(i).update_message(message)
+        if self.current is not None:
+            return self.current.update_message(message)
         return False
 
     def get_pycontext(self) -> PyContext:
         """
         返回最后一轮的 pycontext.
         """
-        return self.last_turn().pycontext
+        return self._last_turn().pycontext
 
     def update_pycontext(self, pycontext: PyContext) -> None:
         if self.current is None:
@@ -251,10 +294,28 @@ class GoThreadInfo(BaseModel):
         """
         if self.current is None:
             return self
-        copied = self.model_copy(deep=True)
-        if copied.current is not None:
-            copied.history.append(copied.current)
-            copied.current = None
+        copied = self._shared_copy()
+        copied.history.append(copied.current)
+        copied.current = None
+        return copied
+
+    def _shared_copy(self, update: Optional[dict] = None) -> "GoThreadInfo":
+        """
+        copy the thread, sharing the turns of the history and on_created, copying the current turn only.
+        :param update: the fields of the copy, the given history, extra and current are kept as they are.
+        """
+        update = update or {}
+        shared = {id(self.on_created)}
+        shared.update(id(turn) for turn in self.history)
+        self._shared.update(shared)
+        copied = self.model_copy(update=update)
+        copied._shared = set(self._shared)
+        if "history" not in update:
+            copied.history = list(self.history)
+        if "extra" not in update:
+            copied.extra = deepcopy(self.extra)
+        if "current" not in update and self.current is not None:
+            copied.current = self.current.model_copy(deep=True)
         return copied
 
     def turns(self, *, truncate: bool = False) -> Iterable[Turn]:
@@ -288,7 +349,7 @@ class GoThreadInfo(BaseModel):
         :param pycontext:
         """
         if pycontext is None:
-            last_turn = self.last_turn()
+            last_turn = self._last_turn()
             pycontext = last_turn.pycontext
         self.store()
         if turn_id is None and event is not None:
@@ -327,7 +388,7 @@ class GoThreadInfo(BaseModel):
         tid = tid if tid else uuid()
         root_id = self.root_id if self.root_id else self.id
         parent_id = self.id
-        thread = self.model_copy(update=dict(id=tid, root_id=root_id, parent_id=parent_id), deep=True)
+        thread = self._shared_copy(update=dict(id=tid, root_id=root_id, parent_id=parent_id))
         return thread
 
     def reset_history(self, messages: Iterable[Message]) -> Self:
@@ -340,7 +401,7 @@ class GoThreadInfo(BaseModel):
         return forked
 
     def thread_copy(self, update: Optional[dict] = None) -> "GoThreadInfo":
-        return self.model_copy(update=update, deep=True)
+        return self._shared_copy(update=update)
 
     def to_prompt(
             self,
@@ -354,7 +415,7 @@ class GoThreadInfo(BaseModel):
         :param truncate: if pass truncated history to the prompt. use thread default truncate logic.
         :return:
         """
-        turn_id = self.last_turn().turn_id
+        turn_id = self._last_turn().turn_id
         history = list(self.get_history_messages(truncated=truncate))
         inputs = []
         appending = []
@@ -1,3 +1,4 @@
-from ghostos.contracts.assets import ImageAssets, AudioAssets
+from ghostos.contracts.assets import ImageAssets, AudioAssets, AudioSink
+from ghostos.framework.assets.storage_audio_assets import StorageAudioAssets
 from ghostos.framework.assets.workspace_image_provider import WorkspaceImageAssetsProvider
 from ghostos.framework.assets.workspace_audio_provider import WorkspaceAudioAssetsProvider
@@ -0,0 +1,324 @@
+import os
+import struct
+from abc import abstractmethod
+from io import BytesIO
+from typing import Optional, Callable
+
+from ghostos.contracts.assets import (
+    StorageFileAssets, AudioAssets, AudioSink, FileInfo,
+)
+from ghostos.contracts.storage import Storage
+
+__all__ = [
+    'StorageAudioAssets',
+    'WavFileSink', 'SoundFileSink', 'BufferedWavSink',
+    'COMPRESSED_AUDIO_FORMATS',
+]
+
+COMPRESSED_AUDIO_FORMATS = {"flac": "FLAC", "ogg": "OGG"}
+"""compressed formats supported by soundfile, format name => soundfile format"""
+
+_WAV_HEADER_SIZE = 44
+
+
+def _wav_header(data_size: int, rate: int, channels: int, sample_width: int) -> bytes:
+    """
+    the canonical 44 bytes header of a pcm wav file.
+    """
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, rate, rate * block_align, block_align, sample_width * 8,
+        b'data', data_size,
+    )
+
+
+class _BaseAudioSink(AudioSink):
+
+    def __init__(self, file: FileInfo, on_close: Callable[[FileInfo], None]):
+        self.fileinfo = file
+        self._on_close = on_close
+        self._size: int = 0
+        self._closed: bool = False
+
+    def size(self) -> int:
+        return self._size
+
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        if self._closed:
+            raise RuntimeError(f"audio sink of {self.fileinfo.filename} is closed")
+        if not data:
+            return
+        self._write(data)
+        self._size += len(data)
+
+    def truncate(self, size: int) -> int:
+        if self._closed:
+            raise RuntimeError(f"audio sink of {self.fileinfo.filename} is closed")
+        if 0 <= size < self._size:
+            self._size = self._truncate(size)
+        return self._size
+
+    def close(self) -> Optional[FileInfo]:
+        if self._closed:
+            return None
+        self._closed = True
+        if self._size == 0:
+            self._discard()
+            return None
+        self._finish()
+        self._on_close(self.fileinfo)
+        return self.fileinfo
+
+    def abort(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._discard()
+
+    @abstractmethod
+    def _write(self, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def _truncate(self, size: int) -> int:
+        """
+        :return: the size after truncated
+        """
+        pass
+
+    @abstractmethod
+    def _finish(self) -> None:
+        pass
+
+    @abstractmethod
+    def _discard(self) -> None:
+        pass
+
+
+class WavFileSink(_BaseAudioSink):
+    """
+    append pcm frames to a wav file on disk.
+    the frames are written into a `.part` file, the wav header is patched and the file is moved in place on close,
+    so readers never observe a half-written audio file.
+    """
+
+    def __init__(
+            self,
+            file: FileInfo,
+            file_dir: str,
+            on_close: Callable[[FileInfo], None],
+            *,
+            rate: int,
+            channels: int,
+            sample_width: int,
+    ):
+        super().__init__(file, on_close)
+        self._file_dir = file_dir
+        self._partial = os.path.join(file_dir, file.filename + ".part")
+        partial_dir = os.path.dirname(self._partial)
+        if not os.path.exists(partial_dir):
+            os.makedirs(partial_dir, exist_ok=True)
+        self._rate = rate
+        self._channels = channels
+        self._sample_width = sample_width
+        self._file = open(self._partial, 'wb')
+        # the header is patched with the data size on close.
+        self._file.write(_wav_header(0, rate, channels, sample_width))
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def _truncate(self, size: int) -> int:
+        size -= size % (self._channels * self._sample_width)
+        self._file.seek(_WAV_HEADER_SIZE + size)
+        self._file.truncate()
+        return size
+
+    def _finish(self) -> None:
+        self._file.seek(0)
+        self._file.write(_wav_header(self._size, self._rate, self._channels, self._sample_width))
+        self._file.close()
+        # the filename may be changed after the sink is opened.
+        filepath = os.path.join(self._file_dir, self.fileinfo.filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        os.replace(self._partial, filepath)
+
+    def _discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+class SoundFileSink(_BaseAudioSink):
+    """
+    encode pcm frames into a compressed audio file on disk (flac / ogg) incrementally.
+    the latest frames are kept unencoded for truncating, the encoded frames can not be dropped.
+    requires the `soundfile` package.
+    """
+
+    def __init__(
+            self,
+            file: FileInfo,
+            file_dir: str,
+            on_close: Callable[[FileInfo], None],
+            *,
+            audio_format: str,
+            rate: int,
+            channels: int,
+            sample_width: int,
+            pending_seconds: float = 2.0,
+    ):
+        """
+        :param pending_seconds: seconds of the latest frames kept unencoded.
+        """
+        try:
+            import soundfile
+            import numpy as np
+        except ImportError:
+            raise ImportError(f"soundfile package is required to save {audio_format} audio. run `pip install soundfile`")
+        if sample_width != 2:
+            raise AttributeError(f"only pcm16 audio can be saved as {audio_format}, got sample width {sample_width}")
+        super().__init__(file, on_close)
+        self._np = np
+        self._channels = channels
+        self._frame_size = 2 * channels
+        self._file_dir = file_dir
+        self._partial = os.path.join(file_dir, file.filename + ".part")
+        partial_dir = os.path.dirname(self._partial)
+        if not os.path.exists(partial_dir):
+            os.makedirs(partial_dir, exist_ok=True)
+        self._sf = soundfile.SoundFile(
+            self._partial,
+            mode='w',
+            samplerate=rate,
+            channels=channels,
+            format=COMPRESSED_AUDIO_FORMATS[audio_format],
+            subtype='PCM_16' if audio_format == "flac" else 'VORBIS',
+        )
+        self._max_pending = int(rate * pending_seconds) * self._frame_size
+        self._pending = bytearray()
+
+    def _write(self, data: bytes) -> None:
+        self._pending.extend(data)
+        if len(self._pending) > self._max_pending:
+            self._encode(len(self._pending) - self._max_pending)
+
+    def _encode(self, size: int) -> None:
+        # deltas may split a frame, the remainder waits for the next write.
+        cut = size - size % self._frame_size
+        if cut <= 0:
+            return
+        frames = self._np.frombuffer(bytes(self._pending[:cut]), dtype=self._np.int16).reshape(-1, self._channels)
+        self._sf.write(frames)
+        del self._pending[:cut]
+
+    def _truncate(self, size: int) -> int:
+        encoded = self._size - len(self._pending)
+        keep = max(size, encoded) - encoded
+        del self._pending[keep:]
+        return encoded + keep
+
+    def _finish(self) -> None:
+        self._encode(len(self._pending))
+        self._sf.close()
+        filepath = os.path.join(self._file_dir, self.fileinfo.filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        os.replace(self._partial, filepath)
+
+    def _discard(self) -> None:
+        self._sf.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+class BufferedWavSink(_BaseAudioSink):
+    """
+    fallback sink for storages that are not on the filesystem.
+    the wav file is built in memory and put into the storage on close.
+    """
+
+    def __init__(
+            self,
+            file: FileInfo,
+            storage: Storage,
+            on_close: Callable[[FileInfo], None],
+            *,
+            rate: int,
+            channels: int,
+            sample_width: int,
+    ):
+        super().__init__(file, on_close)
+        self._storage = storage
+        self._rate = rate
+        self._channels = channels
+        self._sample_width = sample_width
+        self._buffer = BytesIO()
+        self._buffer.write(_wav_header(0, rate, channels, sample_width))
+
+    def _write(self, data: bytes) -> None:
+        self._buffer.write(data)
+
+    def _truncate(self, size: int) -> int:
+        size -= size % (self._channels * self._sample_width)
+        self._buffer.seek(_WAV_HEADER_SIZE + size)
+        self._buffer.truncate()
+        return size
+
+    def _finish(self) -> None:
+        self._buffer.seek(0)
+        self._buffer.write(_wav_header(self._size, self._rate, self._channels, self._sample_width))
+        self._storage.put(self.fileinfo.filename, self._buffer.getvalue())
+        self._buffer = None
+
+    def _discard(self) -> None:
+        self._buffer = None
+
+
+class StorageAudioAssets(StorageFileAssets, AudioAssets):
+    """
+    audio assets that stream pcm frames to the storage.
+    if the storage directory on the filesystem is given, frames are appended to the file on disk as they arrive.
+    """
+
+    def __init__(self, storage: Storage, file_dir: Optional[str] = None):
+        """
+        :param storage: the storage of the file infos and binaries.
+        :param file_dir: the absolute directory of the storage, if the storage is on the filesystem.
+        """
+        super().__init__(storage)
+        self._file_dir = file_dir
+
+    def new_sink(
+            self,
+            file: FileInfo,
+            *,
+            rate: int = 24000,
+            channels: int = 1,
+            sample_width: int = 2,
+    ) -> AudioSink:
+        audio_format = file.filename.rsplit(".", 1)[-1].lower()
+        if audio_format != "wav" and audio_format not in COMPRESSED_AUDIO_FORMATS:
+            raise AttributeError(f"audio format {audio_format} of {file.filename} is not supported")
+
+        if self._file_dir is None:
+            if audio_format != "wav":
+                raise AttributeError(f"audio format {audio_format} is only supported by file storage")
+            return BufferedWavSink(
+                file, self._storage, self._save_fileinfo,
+                rate=rate, channels=channels, sample_width=sample_width,
+            )
+
+        if audio_format == "wav":
+            return WavFileSink(
+                file, self._file_dir, self._save_fileinfo,
+                rate=rate, channels=channels, sample_width=sample_width,
+            )
+        return SoundFileSink(
+            file, self._file_dir, self._save_fileinfo,
+            audio_format=audio_format, rate=rate, channels=channels, sample_width=sample_width,
+        )
@@ -1,9 +1,12 @@
-from .workspace_provider import WorkspaceFileAssetsProvider
-from typing import Type
+from typing import Type, Optional
 
 from ghostos.contracts.assets import (
     AudioAssets,
 )
+from ghostos.contracts.workspace import Workspace
+from ghostos.framework.assets.storage_audio_assets import StorageAudioAssets
+from ghostos_container import Container, INSTANCE
+from .workspace_provider import WorkspaceFileAssetsProvider
 
 
 class WorkspaceAudioAssetsProvider(WorkspaceFileAssetsProvider):
@@ -13,3 +16,8 @@ class WorkspaceAudioAssetsProvider(WorkspaceFileAssetsProvider):
 
     def contract(self) -> Type[AudioAssets]:
         return AudioAssets
+
+    def factory(self, con: Container) -> Optional[INSTANCE]:
+        ws = con.force_fetch(Workspace)
+        storage = ws.runtime().sub_storage(self._dirname)
+        return StorageAudioAssets(storage, storage.abspath())
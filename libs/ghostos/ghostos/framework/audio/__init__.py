@@ -1,3 +1,4 @@
+from ghostos.framework.audio.resampler import PCM16Resampler, resample_pcm16
 from ghostos.framework.audio.pyaudio_io import (
     get_pyaudio_pcm16_speaker, get_pyaudio_pcm16_listener,
 )
@@ -1,12 +1,11 @@
 try:
     from pyaudio import PyAudio, paInt16
-    from scipy.signal import resample
 except ImportError:
     raise ImportError(f"Pyaudio is required, please install pyaudio or ghostos[audio] first")
 
-import numpy as np
 from typing import Callable, Optional
 from ghostos.abcd.realtime import Listener, Listening
+from ghostos.framework.audio.resampler import PCM16Resampler
 from threading import Thread, Event
 from io import BytesIO
 
@@ -64,6 +63,10 @@ class PyAudioPCM16Listening(Listening):
         self.sample_rate = sample_rate
         self.output_rate = output_rate
         self.chunk = chunk
+        self.resampler: Optional[PCM16Resampler] = None
+        if sample_rate != output_rate:
+            # keep the filter state across chunks.
+            self.resampler = PCM16Resampler(sample_rate, output_rate)
         self.stopped = Event()
         self.thread = Thread(target=self._listening)
 
@@ -79,16 +82,9 @@ class PyAudioPCM16Listening(Listening):
         self.stream.stop_stream()
 
     def _parse_output_data(self, data: bytes) -> bytes:
-        if self.sample_rate == self.output_rate:
+        if self.resampler is None:
             return data
-        audio_data = np.frombuffer(data, dtype=np.int16)
-        num_samples = int(len(audio_data) * self.output_rate / self.sample_rate)
-
-        # 使用 resample 进行重新采样
-        resampled_audio = resample(audio_data, num_samples)
-
-        # 导出为二进制数据
-        return resampled_audio.astype(np.int16)
+        return self.resampler.process(data)
 
     def __enter__(self):
         self.thread.start()
@@ -1,9 +1,8 @@
 from pyaudio import PyAudio, paInt16
-from scipy.signal import resample
 
-import numpy as np
-from typing import Callable, Union
+from typing import Callable, Union, Optional
 from ghostos.abcd.realtime import Speaker, Speaking
+from ghostos.framework.audio.resampler import PCM16Resampler
 from threading import Thread, Event
 
 
@@ -50,6 +49,10 @@ class PyAudioPCM16Speaking(Speaking):
         self.output_rate = output_rate
         self.buffer_size = buffer_size
         self.queue = queue
+        self.resampler: Optional[PCM16Resampler] = None
+        if input_rate != output_rate:
+            # keep the filter state across chunks.
+            self.resampler = PCM16Resampler(input_rate, output_rate)
         self.stop = Event()
         self.thread = Thread(target=self._speaking)
         self._done = False
@@ -60,22 +63,18 @@ class PyAudioPCM16Speaking(Speaking):
         while not self.stop.is_set():
             data = self.queue()
             if not data:
+                if self.resampler is not None:
+                    # speak the samples delayed by the filter.
+                    self.stream.write(self.resampler.flush())
                 break
             parsed = self._parse_output_data(data)
             self.stream.write(parsed)
         self._done = True
 
     def _parse_output_data(self, data: bytes) -> bytes:
-        if self.input_rate == self.output_rate:
+        if self.resampler is None:
             return data
-        audio_data = np.frombuffer(data, dtype=np.int16)
-        num_samples = int(len(audio_data) * self.output_rate / self.input_rate)
-
-        # 使用 resample 进行重新采样
-        resampled_audio = resample(audio_data, num_samples)
-
-        # 导出为二进制数据
-        return resampled_audio.astype(np.int16)
+        return self.resampler.process(data)
 
     def __enter__(self):
         self.thread.start()
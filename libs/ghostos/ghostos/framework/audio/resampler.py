@@ -0,0 +1,164 @@
+from math import gcd, ceil
+from typing import Optional
+
+import numpy as np
+
+__all__ = ['PCM16Resampler', 'resample_pcm16']
+
+
+class PCM16Resampler:
+    """
+    streaming polyphase resampler for mono pcm16 audio.
+
+    the rate ratio is reduced to up / down, and a windowed-sinc low-pass prototype filter is split into `up` phases.
+    each output sample is the dot product of one phase with the latest input samples,
+    so consecutive chunks are filtered continuously without the edge artifacts of per-chunk fft resampling.
+    the filter history and the output phase are kept between chunks.
+    """
+
+    def __init__(
+            self,
+            input_rate: int,
+            output_rate: int,
+            *,
+            zero_crossings: int = 8,
+            rolloff: float = 0.9,
+            kaiser_beta: float = 8.0,
+    ):
+        """
+        :param input_rate: sample rate of the input pcm16 data
+        :param output_rate: sample rate of the output pcm16 data
+        :param zero_crossings: zero crossings of the sinc on each side, more is sharper but slower.
+        :param rolloff: cutoff frequency relative to the lower nyquist frequency.
+        :param kaiser_beta: the beta of the kaiser window of the filter.
+        """
+        if input_rate <= 0 or output_rate <= 0:
+            raise ValueError(f"invalid sample rates {input_rate} => {output_rate}")
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+
+        # taps of each phase, cover more input samples when downsampling.
+        self.taps = 2 * zero_crossings * max(1, ceil(self.down / self.up))
+        self._phases = self._design_phases(self.up, self.down, self.taps, rolloff, kaiser_beta)
+
+        # the latest taps - 1 input samples.
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        # position of the next output sample in the upsampled timeline, relative to the next input chunk.
+        self._position: int = 0
+        # odd byte of a split sample.
+        self._remainder: bytes = b''
+
+        # preallocated working buffers, grow on demand.
+        self._input_buffer = np.zeros(0, dtype=np.float32)
+        self._windows_buffer = np.zeros((0, self.taps), dtype=np.float32)
+        self._coefficients_buffer = np.zeros((0, self.taps), dtype=np.float32)
+        self._acc_buffer = np.zeros(0, dtype=np.float32)
+        self._output_buffer = np.zeros(0, dtype=np.int16)
+
+    @staticmethod
+    def _design_phases(up: int, down: int, taps: int, rolloff: float, beta: float) -> np.ndarray:
+        length = up * taps
+        # cutoff in cycles per upsampled sample.
+        cutoff = rolloff * 0.5 / max(up, down)
+        t = np.arange(length, dtype=np.float64) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(length, beta)
+        # each phase sums up to 1, so the dc gain is kept.
+        prototype *= up / prototype.sum()
+        # phases[p, j] multiplies the j-th sample of an input window, which ends at the newest sample.
+        phases = prototype.reshape(taps, up).T[:, ::-1]
+        return np.ascontiguousarray(phases, dtype=np.float32)
+
+    def _ensure_buffers(self, input_size: int, output_size: int) -> None:
+        if len(self._input_buffer) < input_size:
+            self._input_buffer = np.zeros(input_size * 2, dtype=np.float32)
+        if len(self._acc_buffer) < output_size:
+            size = output_size * 2
+            self._windows_buffer = np.zeros((size, self.taps), dtype=np.float32)
+            self._coefficients_buffer = np.zeros((size, self.taps), dtype=np.float32)
+            self._acc_buffer = np.zeros(size, dtype=np.float32)
+            self._output_buffer = np.zeros(size, dtype=np.int16)
+
+    def process(self, data: bytes) -> bytes:
+        """
+        resample a chunk of pcm16 data.
+        :param data: little-endian pcm16 bytes, an odd byte is kept to the next chunk.
+        :return: contiguous pcm16 bytes at the output rate.
+        """
+        if self.up == self.down:
+            return data
+        data = self._remainder + data
+        cut = len(data) - len(data) % 2
+        self._remainder = data[cut:]
+        samples = np.frombuffer(data, dtype=np.int16, count=cut // 2)
+        return self._process_samples(samples)
+
+    def flush(self) -> bytes:
+        """
+        push the samples delayed by the filter out, and reset the state.
+        """
+        if self.up == self.down:
+            return b''
+        tail = np.zeros(self.taps // 2, dtype=np.int16)
+        output = self._process_samples(tail)
+        self.reset()
+        return output
+
+    def reset(self) -> None:
+        self._history[:] = 0
+        self._position = 0
+        self._remainder = b''
+
+    def _process_samples(self, samples: np.ndarray) -> bytes:
+        size = len(samples)
+        if size == 0:
+            return b''
+        up, down, taps = self.up, self.down, self.taps
+        history_size = taps - 1
+        total = history_size + size
+
+        # outputs whose newest input sample is inside this chunk.
+        end = size * up
+        count = max(0, -(-(end - self._position) // down))
+        self._ensure_buffers(total, count)
+
+        buffer = self._input_buffer[:total]
+        buffer[:history_size] = self._history
+        buffer[history_size:] = samples
+
+        if count > 0:
+            positions = self._position + np.arange(count, dtype=np.int64) * down
+            # the window of row r ends at buffer[r + taps - 1], the r-th sample of the chunk.
+            rows = positions // up
+            phases = positions % up
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, taps)
+            gathered = self._windows_buffer[:count]
+            coefficients = self._coefficients_buffer[:count]
+            np.take(windows, rows, axis=0, out=gathered)
+            np.take(self._phases, phases, axis=0, out=coefficients)
+            acc = self._acc_buffer[:count]
+            np.einsum('nj,nj->n', gathered, coefficients, out=acc)
+            np.rint(acc, out=acc)
+            np.clip(acc, -32768, 32767, out=acc)
+            output = self._output_buffer[:count]
+            output[:] = acc
+            result = output.tobytes()
+        else:
+            result = b''
+
+        self._position += count * down - end
+        self._history[:] = buffer[total - history_size:]
+        return result
+
+
+def resample_pcm16(data: bytes, input_rate: int, output_rate: int, resampler: Optional[PCM16Resampler] = None) -> bytes:
+    """
+    resample a whole pcm16 buffer at once.
+    """
+    if input_rate == output_rate:
+        return data
+    if resampler is None:
+        resampler = PCM16Resampler(input_rate, output_rate)
+    return resampler.process(data) + resampler.flush()
@@ -0,0 +1,3 @@
+from ghostos.contracts.cache import Cache, CacheMetrics
+from ghostos.framework.cache.memory_impl import MemoryCacheImpl, MemoryCacheProvider
+from ghostos.framework.cache.sqlite_impl import SQLiteCacheImpl, SQLiteCacheProvider
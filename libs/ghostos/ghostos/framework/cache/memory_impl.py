@@ -0,0 +1,178 @@
+import time
+import zlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Dict, List, Tuple, Union, Type
+
+from ghostos.contracts.cache import Cache, CacheMetrics
+from ghostos_container import Provider, Container
+
+__all__ = ['MemoryCacheImpl', 'MemoryCacheProvider']
+
+_Value = Union[str, Dict[str, str]]
+
+
+def _expire_at(exp: int) -> float:
+    return time.time() + exp if exp > 0 else 0.0
+
+
+class _Shard:
+    """
+    one LRU segment of the cache, guarded by its own lock.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.lock = Lock()
+        # key => (value, expire_at), the least recently used first.
+        self.entries: "OrderedDict[str, Tuple[_Value, float]]" = OrderedDict()
+        self.locks: Dict[str, float] = {}
+        self.metrics = CacheMetrics()
+
+    def lookup(self, key: str, now: float, count: bool = True) -> Optional[_Value]:
+        item = self.entries.get(key, None)
+        if item is None:
+            if count:
+                self.metrics.misses += 1
+            return None
+        value, expire_at = item
+        if 0 < expire_at <= now:
+            del self.entries[key]
+            self.metrics.expirations += 1
+            if count:
+                self.metrics.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        if count:
+            self.metrics.hits += 1
+        return value
+
+    def store(self, key: str, value: _Value, expire_at: float) -> None:
+        self.entries[key] = (value, expire_at)
+        self.entries.move_to_end(key)
+        if 0 < self.max_size < len(self.entries):
+            self.entries.popitem(last=False)
+            self.metrics.evictions += 1
+
+
+class MemoryCacheImpl(Cache):
+    """
+    in-process cache, LRU with TTL expiry.
+    the keys are sharded by hash into segments with their own locks, so the threads rarely wait for each other.
+    """
+
+    def __init__(self, max_size: int = 10000, shards: int = 16):
+        """
+        :param max_size: max count of the keys, the least recently used are evicted. <= 0 means unlimited.
+        :param shards: count of the lock segments.
+        """
+        shards = max(1, shards)
+        shard_size = -(-max_size // shards) if max_size > 0 else 0
+        self._shards: List[_Shard] = [_Shard(shard_size) for _ in range(shards)]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode("utf-8")) % len(self._shards)]
+
+    def lock(self, key: str, overdue: int = 0) -> bool:
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            expire_at = shard.locks.get(key, None)
+            if expire_at is not None and (expire_at <= 0 or expire_at > now):
+                return False
+            shard.locks[key] = _expire_at(overdue)
+            return True
+
+    def unlock(self, key: str) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.locks.pop(key, None) is not None
+
+    def set(self, key: str, val: str, exp: int = 0) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.store(key, val, _expire_at(exp))
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        shard = self._shard(key)
+        with shard.lock:
+            value = shard.lookup(key, time.time())
+        return value if isinstance(value, str) else None
+
+    def expire(self, key: str, exp: int) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            value = shard.lookup(key, time.time(), count=False)
+            if value is None:
+                return False
+            shard.entries[key] = (value, _expire_at(exp))
+            return True
+
+    def set_member(self, key: str, member: str, value: str) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            now = time.time()
+            members = shard.lookup(key, now, count=False)
+            if not isinstance(members, dict):
+                shard.store(key, {member: value}, 0.0)
+            else:
+                members[member] = value
+        return True
+
+    def get_member(self, key: str, member: str) -> Optional[str]:
+        shard = self._shard(key)
+        with shard.lock:
+            members = shard.lookup(key, time.time())
+            if isinstance(members, dict):
+                return members.get(member, None)
+        return None
+
+    def remove_member(self, key: str, *member: str) -> int:
+        shard = self._shard(key)
+        count = 0
+        with shard.lock:
+            members = shard.lookup(key, time.time(), count=False)
+            if isinstance(members, dict):
+                for name in member:
+                    if members.pop(name, None) is not None:
+                        count += 1
+        return count
+
+    def remove(self, *keys: str) -> int:
+        count = 0
+        for key in keys:
+            shard = self._shard(key)
+            with shard.lock:
+                if shard.entries.pop(key, None) is not None:
+                    count += 1
+        return count
+
+    def metrics(self) -> CacheMetrics:
+        result = CacheMetrics()
+        for shard in self._shards:
+            with shard.lock:
+                result.hits += shard.metrics.hits
+                result.misses += shard.metrics.misses
+                result.evictions += shard.metrics.evictions
+                result.expirations += shard.metrics.expirations
+        return result
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+class MemoryCacheProvider(Provider[Cache]):
+
+    def __init__(self, max_size: int = 10000, shards: int = 16):
+        self._max_size = max_size
+        self._shards = shards
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[Cache]:
+        return Cache
+
+    def factory(self, con: Container) -> Optional[Cache]:
+        return MemoryCacheImpl(self._max_size, self._shards)
@@ -0,0 +1,281 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional, List, Type
+
+from ghostos.contracts.cache import Cache, CacheMetrics
+from ghostos.contracts.workspace import Workspace
+from ghostos.contracts.shutdown import Shutdown
+from ghostos_container import Container, BootstrapProvider
+
+__all__ = ['SQLiteCacheImpl', 'SQLiteCacheProvider']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    expire_at REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_updated_idx ON entries (updated_at);
+CREATE TABLE IF NOT EXISTS members (
+    key TEXT NOT NULL,
+    member TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (key, member)
+);
+CREATE TABLE IF NOT EXISTS locks (
+    key TEXT PRIMARY KEY,
+    expire_at REAL NOT NULL
+);
+"""
+
+# the entry is alive if it never expires or expires later.
+_ALIVE = "(expire_at = 0 OR expire_at > ?)"
+
+
+def _expire_at(exp: int) -> float:
+    return time.time() + exp if exp > 0 else 0.0
+
+
+class SQLiteCacheImpl(Cache):
+    """
+    cache persisted in a sqlite database file, shared by the processes on the same machine.
+    every operation is one atomic statement or transaction, so the locks are safe across the processes.
+    hash values are stored as the members of an entry without value.
+    the metrics count the operations of this instance only.
+    """
+
+    def __init__(self, filepath: str, max_size: int = 0, evict_interval: int = 100):
+        """
+        :param filepath: the sqlite database file, created at the first operation.
+        :param max_size: max count of the keys, the oldest written are evicted. <= 0 means unlimited.
+        :param evict_interval: check the size limit once per the number of writes.
+        """
+        self.filepath = filepath
+        self._max_size = max_size
+        self._evict_interval = max(1, evict_interval)
+        self._writes = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._initialized = False
+        self._metrics = CacheMetrics()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise RuntimeError(f"sqlite cache {self.filepath} is closed")
+            with self._lock:
+                if not self._initialized:
+                    file_dir = os.path.dirname(self.filepath)
+                    if file_dir:
+                        os.makedirs(file_dir, exist_ok=True)
+            conn = sqlite3.connect(self.filepath, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._metrics.hits += 1
+            else:
+                self._metrics.misses += 1
+
+    def lock(self, key: str, overdue: int = 0) -> bool:
+        now = time.time()
+        # insert the lease, or take over an overdue one. rowcount is 0 if the lock is held.
+        cursor = self._conn().execute(
+            "INSERT INTO locks (key, expire_at) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET expire_at = excluded.expire_at "
+            "WHERE locks.expire_at > 0 AND locks.expire_at <= ?",
+            (key, _expire_at(overdue), now),
+        )
+        return cursor.rowcount > 0
+
+    def unlock(self, key: str) -> bool:
+        cursor = self._conn().execute("DELETE FROM locks WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def set(self, key: str, val: str, exp: int = 0) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM members WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expire_at, updated_at) VALUES (?, ?, ?, ?)",
+                (key, val, _expire_at(exp), time.time()),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._written()
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            f"SELECT value FROM entries WHERE key = ? AND {_ALIVE}",
+            (key, time.time()),
+        ).fetchone()
+        value = row[0] if row is not None else None
+        self._count(value is not None)
+        return value
+
+    def expire(self, key: str, exp: int) -> bool:
+        now = time.time()
+        cursor = self._conn().execute(
+            f"UPDATE entries SET expire_at = ? WHERE key = ? AND {_ALIVE}",
+            (_expire_at(exp), key, now),
+        )
+        return cursor.rowcount > 0
+
+    def set_member(self, key: str, member: str, value: str) -> bool:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT value IS NULL AND {_ALIVE} FROM entries WHERE key = ?",
+                (now, key),
+            ).fetchone()
+            if row is None or not row[0]:
+                # a new hash replaces the string value or the expired hash.
+                conn.execute("DELETE FROM members WHERE key = ?", (key,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expire_at, updated_at) VALUES (?, NULL, 0, ?)",
+                    (key, now),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO members (key, member, value) VALUES (?, ?, ?)",
+                (key, member, value),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._written()
+        return True
+
+    def get_member(self, key: str, member: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT members.value FROM members JOIN entries ON entries.key = members.key "
+            f"WHERE members.key = ? AND members.member = ? AND entries.value IS NULL AND {_ALIVE}",
+            (key, member, time.time()),
+        ).fetchone()
+        value = row[0] if row is not None else None
+        self._count(value is not None)
+        return value
+
+    def remove_member(self, key: str, *member: str) -> int:
+        if not member:
+            return 0
+        placeholders = ", ".join("?" * len(member))
+        cursor = self._conn().execute(
+            f"DELETE FROM members WHERE key = ? AND member IN ({placeholders})",
+            (key, *member),
+        )
+        return cursor.rowcount
+
+    def remove(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        placeholders = ", ".join("?" * len(keys))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DELETE FROM members WHERE key IN ({placeholders})", keys)
+            cursor = conn.execute(f"DELETE FROM entries WHERE key IN ({placeholders})", keys)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return cursor.rowcount
+
+    def _written(self) -> None:
+        with self._lock:
+            self._writes += 1
+            if self._writes % self._evict_interval != 0:
+                return
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        remove the expired entries, then the oldest written ones over the size limit.
+        :return: count of the removed entries
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute(
+                "DELETE FROM entries WHERE expire_at > 0 AND expire_at <= ?", (now,),
+            ).rowcount
+            evicted = 0
+            if self._max_size > 0:
+                evicted = conn.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM entries ORDER BY updated_at LIMIT max(0, (SELECT count(*) FROM entries) - ?)"
+                    ")",
+                    (self._max_size,),
+                ).rowcount
+            if expired or evicted:
+                conn.execute("DELETE FROM members WHERE key NOT IN (SELECT key FROM entries)")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        with self._lock:
+            self._metrics.expirations += expired
+            self._metrics.evictions += evicted
+        return expired + evicted
+
+    def metrics(self) -> CacheMetrics:
+        with self._lock:
+            return self._metrics.model_copy()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            connections = self._connections
+            self._connections = []
+        for conn in connections:
+            conn.close()
+
+
+class SQLiteCacheProvider(BootstrapProvider[Cache]):
+    """
+    sqlite cache in the workspace runtime directory, shared by the processes of the workspace.
+    """
+
+    def __init__(self, relative_path: str = "cache.db", max_size: int = 0):
+        self._relative_path = relative_path
+        self._max_size = max_size
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[Cache]:
+        return Cache
+
+    def factory(self, con: Container) -> Optional[Cache]:
+        ws = con.force_fetch(Workspace)
+        filepath = os.path.join(ws.runtime().abspath(), self._relative_path)
+        return SQLiteCacheImpl(filepath, self._max_size)
+
+    def bootstrap(self, container: Container) -> None:
+        shutdown = container.get(Shutdown)
+        if shutdown is not None:
+            cache = container.force_fetch(Cache)
+            if isinstance(cache, SQLiteCacheImpl):
+                shutdown.register(cache.shutdown)
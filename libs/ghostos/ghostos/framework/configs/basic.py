@@ -1,18 +1,49 @@
-from typing import Type, Optional
+from copy import deepcopy
+from typing import Type, Optional, Dict, List, Tuple, Callable, Hashable, Any
+from threading import Lock, Thread, Event
 from ghostos.contracts.configs import Configs, Config, C
+from ghostos.contracts.logger import get_ghostos_logger
 from abc import ABC, abstractmethod
 
 
 class BasicConfigs(Configs, ABC):
     """
     A Configs(repository) based on Storage, no matter what the Storage is.
+
+    the unmarshalled configs are cached with the stamp of their data,
+    a read only unmarshal the data again when the stamp is changed, otherwise it gets a copy of the cached one.
+    the stamps of the watched paths are checked by a thread every watch interval to notify the changes.
     """
 
+    def __init__(self, watch_interval: float = 0.0):
+        """
+        :param watch_interval: seconds between the checks of the watched paths, <= 0 means no watcher thread.
+        """
+        self._watch_interval = watch_interval
+        self._cached: Dict[Tuple[type, str], Tuple[Hashable, Config]] = {}
+        self._callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self._watched: Dict[str, Optional[Hashable]] = {}
+        self._watch_lock = Lock()
+        self._watcher: Optional[Thread] = None
+        self._stopped = Event()
+
     def get(self, conf_type: Type[C], relative_path: Optional[str] = None) -> C:
         path = conf_type.conf_path()
         relative_path = relative_path if relative_path else path
+        # stamp before read, a change during the read only costs another unmarshal.
+        stamp = self._stamp(relative_path)
+        key = (conf_type, relative_path)
+        if stamp is not None:
+            cached = self._cached.get(key, None)
+            if cached is not None and cached[0] == stamp:
+                # the callers may modify the config without saving, the cached one is never shared.
+                return deepcopy(cached[1])
         content = self._get(relative_path)
-        return conf_type.unmarshal(content)
+        conf = conf_type.unmarshal(content)
+        if stamp is not None:
+            self._cached[key] = (stamp, conf)
+            return deepcopy(conf)
+        return conf
 
     def get_or_create(self, conf: C) -> C:
         path = conf.conf_path()
@@ -33,7 +64,69 @@ class BasicConfigs(Configs, ABC):
     def _exists(self, relative_path: str) -> bool:
         pass
 
+    def _stamp(self, relative_path: str) -> Optional[Hashable]:
+        """
+        a cheap stamp of the config data that changes when the data changes, such as the mtime of the file.
+        :return: None if the stamp is unknown, then the data is never cached.
+        """
+        return None
+
     def save(self, conf: Config, relative_path: Optional[str] = None) -> None:
         marshaled = conf.marshal()
         relative_path = relative_path if relative_path else conf.conf_path()
         self._put(relative_path, marshaled)
+        with self._watch_lock:
+            watched = relative_path in self._watched
+            if watched:
+                self._watched[relative_path] = self._stamp(relative_path)
+        if watched:
+            self._notify(relative_path)
+
+    def on_change(self, relative_path: str, callback: Callable[[str], None]) -> None:
+        with self._watch_lock:
+            if relative_path not in self._watched:
+                self._watched[relative_path] = self._stamp(relative_path)
+            self._callbacks.setdefault(relative_path, []).append(callback)
+            if self._watch_interval > 0 and self._watcher is None:
+                self._watcher = Thread(target=self._watch, daemon=True)
+                self._watcher.start()
+
+    def check_changes(self, *relative_paths: str) -> List[str]:
+        """
+        check the stamps of the watched paths, and call the callbacks of the changed ones.
+        :param relative_paths: the paths to check, default all the watched paths.
+        :return: the changed paths
+        """
+        changed = []
+        with self._watch_lock:
+            paths = relative_paths if relative_paths else list(self._watched.keys())
+            for path in paths:
+                if path not in self._watched:
+                    continue
+                stamp = self._stamp(path)
+                if stamp != self._watched[path]:
+                    self._watched[path] = stamp
+                    changed.append(path)
+        for path in changed:
+            self._notify(path)
+        return changed
+
+    def _notify(self, relative_path: str) -> None:
+        for callback in list(self._callbacks.get(relative_path, [])):
+            try:
+                callback(relative_path)
+            except Exception as e:
+                get_ghostos_logger().exception("config %s change callback failed: %s", relative_path, e)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._watch_interval):
+            self.check_changes()
+
+    def close(self) -> None:
+        """
+        stop the watcher thread.
+        """
+        self._stopped.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
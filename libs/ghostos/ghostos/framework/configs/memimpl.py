@@ -1,12 +1,14 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Hashable
 from .basic import BasicConfigs
 
 
 class MemoryConfigs(BasicConfigs):
 
     def __init__(self, defaults: Optional[Dict] = None):
+        super().__init__()
         defaults = defaults or {}
         self._cache: Dict[str, bytes] = defaults
+        self._versions: Dict[str, int] = {}
 
     def _get(self, relative_path: str) -> bytes:
         if relative_path not in self._cache:
@@ -15,6 +17,12 @@ class MemoryConfigs(BasicConfigs):
 
     def _put(self, relative_path: str, content: bytes) -> None:
         self._cache[relative_path] = content
+        self._versions[relative_path] = self._versions.get(relative_path, 0) + 1
 
     def _exists(self, relative_path: str) -> bool:
         return relative_path in self._cache
+
+    def _stamp(self, relative_path: str) -> Optional[Hashable]:
+        if relative_path not in self._cache:
+            return None
+        return self._versions.get(relative_path, 0)
@@ -1,15 +1,23 @@
-from typing import Optional, Dict
+import os
+from typing import Optional, Hashable, Type
 from ghostos.contracts.configs import Configs
 from ghostos.contracts.storage import Storage
-from ghostos_container import Provider, Container
+from ghostos.contracts.shutdown import Shutdown
+from ghostos_container import Provider, Container, BootstrapProvider
 from ghostos.contracts.workspace import Workspace
 from .basic import BasicConfigs
 
 
 class StorageConfigs(BasicConfigs):
+    """
+    configs in the storage. if the storage is a FileStorage, the configs are cached and validated by the file stat.
+    """
 
-    def __init__(self, storage: Storage, conf_dir: str):
+    def __init__(self, storage: Storage, conf_dir: str, watch_interval: float = 0.0):
+        super().__init__(watch_interval)
         self._storage = storage.sub_storage(conf_dir)
+        abspath = getattr(self._storage, "abspath", None)
+        self._abspath: Optional[str] = abspath() if callable(abspath) else None
 
     def _get(self, relative_path: str) -> bytes:
         return self._storage.get(relative_path)
@@ -20,6 +28,15 @@ class StorageConfigs(BasicConfigs):
     def _exists(self, relative_path: str) -> bool:
         return self._storage.exists(relative_path)
 
+    def _stamp(self, relative_path: str) -> Optional[Hashable]:
+        if self._abspath is None:
+            return None
+        try:
+            stat = os.stat(os.path.join(self._abspath, relative_path))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
 
 class ConfigsByStorageProvider(Provider[Configs]):
 
@@ -34,14 +51,28 @@ class ConfigsByStorageProvider(Provider[Configs]):
         return StorageConfigs(storage, self._conf_dir)
 
 
-class WorkspaceConfigsProvider(Provider[Configs]):
+class WorkspaceConfigsProvider(BootstrapProvider[Configs]):
     """
     the Configs repository located at storage - workspace.configs()
+    the config files changed by other processes are detected every watch interval.
     """
 
+    def __init__(self, watch_interval: float = 1.0):
+        self._watch_interval = watch_interval
+
     def singleton(self) -> bool:
         return True
 
+    def contract(self) -> Type[Configs]:
+        return Configs
+
     def factory(self, con: Container) -> Optional[Configs]:
         workspace = con.force_fetch(Workspace)
-        return StorageConfigs(workspace.configs(), "")
+        return StorageConfigs(workspace.configs(), "", self._watch_interval)
+
+    def bootstrap(self, container: Container) -> None:
+        shutdown = container.get(Shutdown)
+        if shutdown is not None:
+            configs = container.force_fetch(Configs)
+            if isinstance(configs, StorageConfigs):
+                shutdown.register(configs.close)
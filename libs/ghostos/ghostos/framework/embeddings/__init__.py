@@ -0,0 +1,5 @@
+from ghostos.core.models.embedding import Embeddings, EmbeddingDriver, VectorIndex
+from ghostos.framework.embeddings.vector_index import NumpyVectorIndex
+from ghostos.framework.embeddings.hashing_driver import HashingEmbeddingDriver
+from ghostos.framework.embeddings.llms_driver import LLMsEmbeddingDriver
+from ghostos.framework.embeddings.embeddings_impl import EmbeddingsImpl, WorkspaceEmbeddingsProvider
@@ -0,0 +1,144 @@
+import os
+import re
+from threading import Lock
+from typing import List, Tuple, Dict, Optional, Type
+
+import numpy as np
+
+from ghostos.core.models.embedding import Embeddings, EmbeddingDriver, VectorIndex
+from ghostos.contracts.workspace import Workspace
+from ghostos.contracts.shutdown import Shutdown
+from ghostos.framework.embeddings.vector_index import NumpyVectorIndex
+from ghostos.framework.embeddings.hashing_driver import HashingEmbeddingDriver
+from ghostos_container import BootstrapProvider, Container
+
+__all__ = ['EmbeddingsImpl', 'WorkspaceEmbeddingsProvider']
+
+_INDEX_NAME_PATTERN = re.compile(r"^[\w\-.]+$")
+
+
+class EmbeddingsImpl(Embeddings):
+
+    def __init__(self, default_driver: EmbeddingDriver, index_dir: Optional[str] = None):
+        """
+        :param default_driver: the driver used when the model is not specified
+        :param index_dir: the directory to persist the vector indexes, None for memory only indexes.
+        """
+        self._drivers: Dict[str, EmbeddingDriver] = {}
+        self._default: str = default_driver.name()
+        self._index_dir = index_dir
+        self._indexes: Dict[Tuple[str, str, bool], NumpyVectorIndex] = {}
+        self._lock = Lock()
+        self.register_driver(default_driver, default=True)
+
+    def register_driver(self, driver: EmbeddingDriver, default: bool = False) -> None:
+        self._drivers[driver.name()] = driver
+        if default:
+            self._default = driver.name()
+
+    def get_driver(self, model: str = "") -> EmbeddingDriver:
+        name = model or self._default
+        driver = self._drivers.get(name, None)
+        if driver is None:
+            raise KeyError(f"embedding driver {name} is not registered")
+        return driver
+
+    def get_embeddings(self, texts: List[str], model: str = "") -> np.ndarray:
+        driver = self.get_driver(model)
+        return np.asarray(driver.embed(texts), dtype=np.float32)
+
+    def get_embedding(self, lang: str, model: str = "") -> np.ndarray:
+        return self.get_embeddings([lang], model)[0]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def similarity(self, lang: str, compare: str, model: str = "") -> float:
+        vectors = self._normalize(self.get_embeddings([lang, compare], model))
+        return float(vectors[0] @ vectors[1])
+
+    def search(
+            self,
+            query: str,
+            selections: List[str],
+            top_k: int,
+            threshold: float,
+            model: str = "",
+    ) -> List[Tuple[str, float]]:
+        if not selections or top_k <= 0:
+            return []
+        vectors = self._normalize(self.get_embeddings([query, *selections], model))
+        scores = vectors[1:] @ vectors[0]
+        k = min(top_k, len(selections))
+        candidates = np.argpartition(-scores, k - 1)[:k] if k < len(selections) else np.arange(len(selections))
+        result = []
+        for i in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            score = float(scores[i])
+            if score < threshold:
+                break
+            result.append((selections[int(i)], score))
+        return result
+
+    def get_index(self, name: str, model: str = "", *, quantize: bool = False) -> VectorIndex:
+        if not _INDEX_NAME_PATTERN.match(name):
+            raise ValueError(f"invalid vector index name {name!r}")
+        driver = self.get_driver(model)
+        key = (name, driver.name(), quantize)
+        with self._lock:
+            index = self._indexes.get(key, None)
+            if index is None:
+                directory = None
+                if self._index_dir is not None:
+                    dirname = name + (".int8" if quantize else "")
+                    directory = os.path.join(self._index_dir, driver.name(), dirname)
+                index = NumpyVectorIndex(driver.dimensions(), quantize=quantize, directory=directory)
+                self._indexes[key] = index
+            return index
+
+    def release_index(self, name: str, model: str = "", *, quantize: bool = False) -> None:
+        key = (name, self.get_driver(model).name(), quantize)
+        with self._lock:
+            index = self._indexes.pop(key, None)
+        if index is not None:
+            index.save()
+
+    def save(self) -> None:
+        """
+        save all the opened vector indexes.
+        """
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.save()
+
+
+class WorkspaceEmbeddingsProvider(BootstrapProvider[Embeddings]):
+    """
+    embeddings with the local hashing driver by default, vector indexes are persisted in the workspace runtime cache.
+    register other drivers (such as LLMsEmbeddingDriver) to the Embeddings instance to use real models.
+    """
+
+    def __init__(self, relative_path: str = "embeddings", dimensions: int = 256):
+        self._relative_path = relative_path
+        self._dimensions = dimensions
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[Embeddings]:
+        return Embeddings
+
+    def factory(self, con: Container) -> Optional[Embeddings]:
+        ws = con.force_fetch(Workspace)
+        storage = ws.runtime_cache().sub_storage(self._relative_path)
+        return EmbeddingsImpl(HashingEmbeddingDriver(self._dimensions), storage.abspath())
+
+    def bootstrap(self, container: Container) -> None:
+        shutdown = container.get(Shutdown)
+        if shutdown is not None:
+            embeddings = container.force_fetch(Embeddings)
+            if isinstance(embeddings, EmbeddingsImpl):
+                shutdown.register(embeddings.save)
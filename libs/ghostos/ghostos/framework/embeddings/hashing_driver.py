@@ -0,0 +1,53 @@
+import re
+from typing import List
+from zlib import crc32
+
+import numpy as np
+
+from ghostos.core.models.embedding import EmbeddingDriver
+
+__all__ = ['HashingEmbeddingDriver']
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddingDriver(EmbeddingDriver):
+    """
+    local deterministic embedding by feature hashing.
+    words and character n-grams are hashed into a fixed number of signed buckets.
+    it does not understand semantics, but is stable across processes and needs no model or network,
+    which makes it the default for offline usage and tests.
+    """
+
+    def __init__(self, dimensions: int = 256, ngram: int = 3, name: str = "hashing"):
+        self._dimensions = dimensions
+        self._ngram = ngram
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def _features(self, text: str) -> List[str]:
+        text = text.lower()
+        words = _TOKEN_PATTERN.findall(text)
+        features = words
+        n = self._ngram
+        for word in words:
+            # the words without spaces (like chinese) are matched by n-grams.
+            padded = f"<{word}>"
+            if len(padded) > n:
+                features = features + [padded[i:i + n] for i in range(len(padded) - n + 1)]
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self._dimensions), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for feature in self._features(text):
+                hashed = crc32(feature.encode("utf-8"))
+                # the highest bit decides the sign, so the collisions cancel out in expectation.
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                matrix[i, hashed % self._dimensions] += sign
+        return matrix
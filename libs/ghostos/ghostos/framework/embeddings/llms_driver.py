@@ -0,0 +1,57 @@
+from typing import List
+
+import numpy as np
+
+from ghostos.core.llms import LLMs
+from ghostos.core.models.embedding import EmbeddingDriver
+
+__all__ = ['LLMsEmbeddingDriver']
+
+
+class LLMsEmbeddingDriver(EmbeddingDriver):
+    """
+    embedding driver that calls the openai compatible embeddings api of a configured llm service.
+    """
+
+    batch_size: int = 1024
+
+    def __init__(
+            self,
+            llms: LLMs,
+            model: str = "text-embedding-3-small",
+            dimensions: int = 1536,
+            api_name: str = "",
+            name: str = "",
+    ):
+        """
+        :param llms: the llms that provides the openai client of the service
+        :param model: the embedding model name of the service
+        :param dimensions: the dimensions of the embedding model
+        :param api_name: the llm api name whose service is used, default api if empty
+        :param name: the driver name, the embedding model name if empty
+        """
+        self._llms = llms
+        self._model = model
+        self._dimensions = dimensions
+        self._api_name = api_name
+        self._name = name or model
+
+    def name(self) -> str:
+        return self._name
+
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        client = self._llms.force_get_api(self._api_name).openai_client()
+        matrix = np.zeros((len(texts), self._dimensions), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            resp = client.embeddings.create(
+                model=self._model,
+                input=batch,
+                dimensions=self._dimensions,
+            )
+            for item in resp.data:
+                matrix[start + item.index] = item.embedding
+        return matrix
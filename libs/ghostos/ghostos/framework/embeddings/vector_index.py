@@ -0,0 +1,249 @@
+import json
+import os
+from threading import RLock
+from typing import List, Tuple, Dict, Optional, Iterable
+
+import numpy as np
+
+from ghostos.core.models.embedding import VectorIndex
+
+__all__ = ['NumpyVectorIndex']
+
+
+class NumpyVectorIndex(VectorIndex):
+    """
+    in-process vector index based on numpy.
+
+    vectors are l2 normalized and stored in a float32 matrix (or int8 codes with per-row scales if quantized),
+    so the cosine similarities of all the rows are one matrix product, and top-k is selected by argpartition.
+    if a directory is given, the index is saved as `.npy` files and loaded by memory mapping,
+    so a large index is paged in lazily instead of read and parsed at startup.
+    """
+
+    _META_FILE = "meta.json"
+    _KEYS_FILE = "keys.json"
+    _VECTORS_FILE = "vectors.npy"
+    _SCALES_FILE = "scales.npy"
+
+    block_size: int = 4096
+    """rows of the quantized codes that are converted to float32 at once while searching."""
+
+    def __init__(self, dimensions: int, *, quantize: bool = False, directory: Optional[str] = None):
+        """
+        :param dimensions: the dimensions of the vectors
+        :param quantize: store the vectors as int8 codes
+        :param directory: the directory to persist the index, None for a memory only index.
+        """
+        self._dimensions = dimensions
+        self._quantize = quantize
+        self._directory = directory
+        self._lock = RLock()
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._size: int = 0
+        dtype = np.int8 if quantize else np.float32
+        self._vectors: np.ndarray = np.zeros((0, dimensions), dtype=dtype)
+        self._scales: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._dirty: bool = False
+        if directory is not None:
+            self._load()
+
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def __len__(self) -> int:
+        return self._size
+
+    def keys(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._keys)
+
+    def _load(self) -> None:
+        meta_file = os.path.join(self._directory, self._META_FILE)
+        if not os.path.exists(meta_file):
+            return
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if meta["dimensions"] != self._dimensions or meta["quantize"] != self._quantize:
+            raise ValueError(
+                f"vector index at {self._directory} is saved with dimensions {meta['dimensions']} "
+                f"and quantize {meta['quantize']}, mismatch with the expected ones",
+            )
+        with open(os.path.join(self._directory, self._KEYS_FILE)) as f:
+            self._keys = json.load(f)
+        self._rows = {key: i for i, key in enumerate(self._keys)}
+        self._size = len(self._keys)
+        # copy-on-write memory map: pages are read on demand, and changes stay in memory until saved.
+        self._vectors = np.load(os.path.join(self._directory, self._VECTORS_FILE), mmap_mode='c')
+        if self._quantize:
+            self._scales = np.load(os.path.join(self._directory, self._SCALES_FILE), mmap_mode='c')
+
+    def save(self) -> None:
+        if self._directory is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self._directory, exist_ok=True)
+            self._save_array(self._VECTORS_FILE, self._vectors[:self._size])
+            if self._quantize:
+                self._save_array(self._SCALES_FILE, self._scales[:self._size])
+            self._save_json(self._KEYS_FILE, self._keys)
+            # meta is written at last, the index is readable only if all the files are saved.
+            self._save_json(self._META_FILE, {
+                "dimensions": self._dimensions,
+                "quantize": self._quantize,
+                "size": self._size,
+            })
+            self._dirty = False
+
+    def _save_array(self, filename: str, array: np.ndarray) -> None:
+        filepath = os.path.join(self._directory, filename)
+        temp = filepath + ".tmp"
+        with open(temp, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(temp, filepath)
+
+    def _save_json(self, filename: str, data) -> None:
+        filepath = os.path.join(self._directory, filename)
+        temp = filepath + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(data, f)
+        os.replace(temp, filepath)
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        vectors = np.zeros((capacity, self._dimensions), dtype=self._vectors.dtype)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+        if self._quantize:
+            scales = np.zeros(capacity, dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[1] != self._dimensions:
+            raise ValueError(f"expect vectors of {self._dimensions} dimensions, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _encode(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if not self._quantize:
+            self._vectors[rows] = vectors
+            return
+        # symmetric per-row quantization, the row is restored by codes * scale.
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        self._vectors[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+        self._scales[rows] = scales
+
+    def add(self, keys: List[str], vectors: np.ndarray) -> None:
+        if len(keys) == 0:
+            return
+        vectors = self._normalize(vectors)
+        if len(keys) != len(vectors):
+            raise ValueError(f"got {len(keys)} keys but {len(vectors)} vectors")
+        with self._lock:
+            rows = []
+            for key in keys:
+                row = self._rows.get(key, None)
+                if row is None:
+                    row = self._size
+                    self._reserve(row + 1)
+                    self._keys.append(key)
+                    self._rows[key] = row
+                    self._size += 1
+                rows.append(row)
+            self._encode(np.array(rows, dtype=np.int64), vectors)
+            self._dirty = True
+
+    def remove(self, keys: List[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                row = self._rows.pop(key, None)
+                if row is None:
+                    continue
+                removed += 1
+                last = self._size - 1
+                if row != last:
+                    # move the last row into the hole.
+                    last_key = self._keys[last]
+                    self._keys[row] = last_key
+                    self._rows[last_key] = row
+                    self._vectors[row] = self._vectors[last]
+                    if self._quantize:
+                        self._scales[row] = self._scales[last]
+                self._keys.pop()
+                self._size -= 1
+            if removed:
+                self._dirty = True
+        return removed
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key, None)
+            if row is None:
+                return None
+            vector = np.asarray(self._vectors[row], dtype=np.float32)
+            if self._quantize:
+                vector = vector * self._scales[row]
+            return vector
+
+    def search(self, query: np.ndarray, top_k: int, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        return self.search_batch(np.asarray(query).reshape(1, -1), top_k, threshold)[0]
+
+    def search_batch(self, queries: np.ndarray, top_k: int, threshold: float = 0.0) -> List[List[Tuple[str, float]]]:
+        queries = self._normalize(queries)
+        with self._lock:
+            size = self._size
+            if size == 0 or top_k <= 0:
+                return [[] for _ in range(len(queries))]
+            scores = self._scores(queries, size)
+            # remove swaps the rows of the keys in place, the candidates are mapped by a snapshot.
+            keys = self._keys[:size]
+        k = min(top_k, size)
+        if k < size:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(size), (len(queries), 1))
+        results = []
+        for i in range(len(queries)):
+            row_candidates = candidates[i]
+            row_scores = scores[i, row_candidates]
+            order = np.argsort(-row_scores, kind="stable")
+            result = []
+            for j in order:
+                score = float(row_scores[j])
+                if score < threshold:
+                    break
+                result.append((keys[int(row_candidates[j])], score))
+            results.append(result)
+        return results
+
+    def _scores(self, queries: np.ndarray, size: int) -> np.ndarray:
+        """
+        :return: similarities in shape of (len(queries), size)
+        """
+        # (size, d) @ (d, m) -> (size, m)
+        queries_t = np.ascontiguousarray(queries.T)
+        scores = np.empty((size, len(queries)), dtype=np.float32)
+        if not self._quantize:
+            np.matmul(self._vectors[:size], queries_t, out=scores)
+            return scores.T
+        # convert the codes block by block into a reused buffer that stays in the cpu cache.
+        buffer = np.empty((min(self.block_size, size), self._dimensions), dtype=np.float32)
+        for start in range(0, size, self.block_size):
+            end = min(start + self.block_size, size)
+            block = buffer[:end - start]
+            block[:] = self._vectors[start:end]
+            np.matmul(block, queries_t, out=scores[start:end])
+            scores[start:end] *= self._scales[start:end, None]
+        return scores.T
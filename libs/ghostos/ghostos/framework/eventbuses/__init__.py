@@ -1,2 +1,3 @@
 from ghostos.core.runtime import EventBus
 from ghostos.framework.eventbuses.memimpl import MemEventBusImplProvider, MemEventBusImpl
+from ghostos.framework.eventbuses.sqliteimpl import SQLiteEventBusImpl, SQLiteEventBusProvider
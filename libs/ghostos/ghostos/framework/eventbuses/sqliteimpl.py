@@ -0,0 +1,363 @@
+import os
+import time
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Optional, List, Type, Tuple
+from typing_extensions import Self
+
+from ghostos.core.runtime import Event, EventTypes
+from ghostos.core.runtime.events import EventBus
+from ghostos.contracts.workspace import Workspace
+from ghostos.contracts.shutdown import Shutdown
+from ghostos_container import Container, BootstrapProvider
+
+__all__ = ['SQLiteEventBusImpl', 'SQLiteEventBusProvider', 'task_shard_key']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    visible_at REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_task_idx ON events (task_id, priority DESC, seq);
+CREATE INDEX IF NOT EXISTS events_id_idx ON events (event_id);
+CREATE INDEX IF NOT EXISTS events_redelivery_idx ON events (attempts, visible_at);
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    shard_key INTEGER NOT NULL
+);
+"""
+
+
+def task_shard_key(task_id: str) -> int:
+    """
+    stable hash of the task id, the same in every process.
+    """
+    return zlib.crc32(task_id.encode("utf-8"))
+
+
+class SQLiteEventBusImpl(EventBus):
+    """
+    event bus persisted in a sqlite database file, shared by the processes on the same machine.
+    the notifications can be sharded by the task id, so each background process only handles its own tasks.
+
+    with a visibility timeout the delivery is at-least-once:
+    a popped event is hidden until the timeout instead of deleted, and deleted when it is acknowledged.
+    the events of a crashed consumer become visible again and their tasks are notified again.
+    """
+
+    def __init__(
+            self,
+            filepath: str,
+            *,
+            shard_index: int = 0,
+            shard_count: int = 1,
+            visibility_timeout: Optional[float] = 600.0,
+            max_deliveries: int = 3,
+            redelivery_interval: float = 5.0,
+    ):
+        """
+        :param filepath: the sqlite database file
+        :param shard_index: the shard of the notifications that this instance pops
+        :param shard_count: total count of the shards, 1 means no sharding.
+        :param visibility_timeout: seconds a popped event is hidden before redelivery, None means delete on pop.
+        :param max_deliveries: the event delivered so many times without ack is dropped.
+        :param redelivery_interval: min seconds between the checks of the expired events.
+        """
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"invalid shard {shard_index} of {shard_count}")
+        self.filepath = filepath
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self.redelivery_interval = redelivery_interval
+        self._next_redelivery = 0.0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+        """RETURNING is supported since sqlite 3.35"""
+        file_dir = os.path.dirname(filepath)
+        if file_dir and not os.path.exists(file_dir):
+            os.makedirs(file_dir, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise RuntimeError(f"sqlite eventbus {self.filepath} is closed")
+            # autocommit mode, every statement out of the transaction() is atomic by itself.
+            conn = sqlite3.connect(self.filepath, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        run the operations of the current thread in one write transaction.
+        batching the sends in one transaction saves a disk sync for each of them.
+        """
+        conn = self._conn()
+        if self._local.depth > 0:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def with_process_id(self, process_id: str) -> Self:
+        return self
+
+    def with_shard(self, shard_index: int, shard_count: int) -> "SQLiteEventBusImpl":
+        """
+        :return: a new instance on the same database that pops the notifications of the shard only.
+        """
+        return SQLiteEventBusImpl(
+            self.filepath,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            visibility_timeout=self.visibility_timeout,
+            max_deliveries=self.max_deliveries,
+            redelivery_interval=self.redelivery_interval,
+        )
+
+    def send_event(self, e: Event, notify: bool) -> None:
+        self.send_events([e], notify)
+
+    def send_events(self, events: List[Event], notify: bool) -> None:
+        """
+        send the events in one transaction, and notify each task once if notify is True.
+        """
+        rows = []
+        task_ids = []
+        for e in events:
+            priority = 1 if e.type == EventTypes.CANCEL.value else 0
+            rows.append((e.event_id, e.task_id, priority, e.model_dump_json()))
+            if notify and e.task_id not in task_ids:
+                task_ids.append(e.task_id)
+        with self.transaction():
+            conn = self._conn()
+            conn.executemany(
+                "INSERT INTO events (event_id, task_id, priority, data) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            if task_ids:
+                conn.executemany(
+                    "INSERT INTO notifications (task_id, shard_key) VALUES (?, ?)",
+                    [(task_id, task_shard_key(task_id)) for task_id in task_ids],
+                )
+
+    def pop_task_event(self, task_id: str) -> Optional[Event]:
+        events = self.pop_task_events(task_id, 1)
+        return events[0] if events else None
+
+    def pop_task_events(self, task_id: str, limit: int) -> List[Event]:
+        if limit <= 0:
+            return []
+        if self.visibility_timeout is None:
+            rows = self._take_rows(
+                "DELETE FROM events", (),
+                "events", "WHERE task_id = ? ORDER BY priority DESC, seq LIMIT ?", (task_id, limit),
+                "priority, seq, data",
+            )
+        else:
+            now = time.time()
+            rows = self._take_rows(
+                "UPDATE events SET visible_at = ?, attempts = attempts + 1", (now + self.visibility_timeout,),
+                "events",
+                "WHERE task_id = ? AND visible_at <= ? AND attempts < ? ORDER BY priority DESC, seq LIMIT ?",
+                (task_id, now, self.max_deliveries, limit),
+                "priority, seq, data",
+            )
+        # the order of RETURNING is not defined.
+        rows.sort(key=lambda row: (-row[0], row[1]))
+        return [Event.model_validate_json(row[2]) for row in rows]
+
+    def _take_rows(
+            self,
+            change: str,
+            change_params: tuple,
+            table: str,
+            where: str,
+            params: tuple,
+            columns: str,
+    ) -> List[tuple]:
+        """
+        delete or update the selected rows and return their columns, in one atomic step.
+        :param change: the statement applied to the rows, `DELETE FROM <table>` or `UPDATE <table> SET ...`
+        :param table: the table of the rows
+        :param where: the condition, order and limit of the selected rows
+        :param columns: the returned columns, in no defined order of the rows
+        """
+        conn = self._conn()
+        if self._returning:
+            return conn.execute(
+                f"{change} WHERE seq IN (SELECT seq FROM {table} {where}) RETURNING {columns}",
+                (*change_params, *params),
+            ).fetchall()
+        # without RETURNING, the rows are selected and changed in one write transaction.
+        with self.transaction():
+            rows = conn.execute(f"SELECT seq, {columns} FROM {table} {where}", params).fetchall()
+            if rows:
+                conn.executemany(f"{change} WHERE seq = ?", [(*change_params, row[0]) for row in rows])
+        return [row[1:] for row in rows]
+
+    def ack_event(self, e: Event) -> None:
+        if self.visibility_timeout is None:
+            return
+        self._conn().execute("DELETE FROM events WHERE event_id = ?", (e.event_id,))
+
+    def ack_events(self, events: List[Event]) -> None:
+        if self.visibility_timeout is None or not events:
+            return
+        with self.transaction():
+            self._conn().executemany(
+                "DELETE FROM events WHERE event_id = ?",
+                [(e.event_id,) for e in events],
+            )
+
+    def _shard_condition(self) -> Tuple[str, tuple]:
+        if self.shard_count == 1:
+            return "", ()
+        return "WHERE shard_key % ? = ? ", (self.shard_count, self.shard_index)
+
+    def pop_task_notification(self) -> Optional[str]:
+        task_ids = self.pop_task_notifications(1)
+        return task_ids[0] if task_ids else None
+
+    def pop_task_notifications(self, limit: int) -> List[str]:
+        if limit <= 0:
+            return []
+        self._redeliver()
+        condition, params = self._shard_condition()
+        rows = self._take_rows(
+            "DELETE FROM notifications", (),
+            "notifications", f"{condition}ORDER BY seq LIMIT ?", (*params, limit),
+            "seq, task_id",
+        )
+        rows.sort()
+        return [row[1] for row in rows]
+
+    def _redeliver(self) -> None:
+        """
+        notify the tasks of the expired unacknowledged events again, and drop the events delivered too many times.
+        checked at most once per redelivery interval, the most pops hit the notifications table only.
+        """
+        if self.visibility_timeout is None:
+            return
+        now = time.time()
+        if now < self._next_redelivery:
+            return
+        self._next_redelivery = now + self.redelivery_interval
+        with self.transaction():
+            conn = self._conn()
+            conn.execute(
+                "DELETE FROM events WHERE attempts >= ? AND visible_at <= ?",
+                (self.max_deliveries, now),
+            )
+            expired = conn.execute(
+                "SELECT DISTINCT task_id FROM events WHERE attempts > 0 AND visible_at <= ?",
+                (now,),
+            ).fetchall()
+            if not expired:
+                return
+            task_ids = [row[0] for row in expired]
+            if self.shard_count > 1:
+                task_ids = [
+                    task_id for task_id in task_ids
+                    if task_shard_key(task_id) % self.shard_count == self.shard_index
+                ]
+            conn.executemany(
+                "INSERT INTO notifications (task_id, shard_key) "
+                "SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM notifications WHERE task_id = ?)",
+                [(task_id, task_shard_key(task_id), task_id) for task_id in task_ids],
+            )
+
+    def notify_task(self, task_id: str) -> None:
+        self._conn().execute(
+            "INSERT INTO notifications (task_id, shard_key) VALUES (?, ?)",
+            (task_id, task_shard_key(task_id)),
+        )
+
+    def clear_task(self, task_id: str) -> None:
+        self._conn().execute("DELETE FROM events WHERE task_id = ?", (task_id,))
+
+    def clear_all(self):
+        with self.transaction():
+            conn = self._conn()
+            conn.execute("DELETE FROM events")
+            conn.execute("DELETE FROM notifications")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            connections = self._connections
+            self._connections = []
+        for conn in connections:
+            conn.close()
+
+
+class SQLiteEventBusProvider(BootstrapProvider[EventBus]):
+    """
+    sqlite event bus in the workspace runtime directory.
+    required by the multi-process background run, since all the processes share the same database file.
+    """
+
+    def __init__(
+            self,
+            relative_path: str = "eventbus.db",
+            visibility_timeout: Optional[float] = 600.0,
+            max_deliveries: int = 3,
+    ):
+        self._relative_path = relative_path
+        self._visibility_timeout = visibility_timeout
+        self._max_deliveries = max_deliveries
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[EventBus]:
+        return EventBus
+
+    def factory(self, con: Container) -> Optional[EventBus]:
+        ws = con.force_fetch(Workspace)
+        filepath = os.path.join(ws.runtime().abspath(), self._relative_path)
+        return SQLiteEventBusImpl(
+            filepath,
+            visibility_timeout=self._visibility_timeout,
+            max_deliveries=self._max_deliveries,
+        )
+
+    def bootstrap(self, container: Container) -> None:
+        shutdown = container.get(Shutdown)
+        if shutdown is not None:
+            eventbus = container.force_fetch(EventBus)
+            if isinstance(eventbus, SQLiteEventBusImpl):
+                shutdown.register(eventbus.shutdown)
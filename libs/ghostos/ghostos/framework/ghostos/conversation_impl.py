@@ -282,6 +282,7 @@ class ConversationImpl(Conversation[G]):
                 if not self.fail(error=e):
                     raise
             finally:
+                self._eventbus.ack_event(event)
                 if task and task.shall_notify():
                     self._eventbus.notify_task(event.task_id)
                 self._handling_event = False
@@ -325,6 +326,9 @@ class ConversationImpl(Conversation[G]):
             return self._eventbus.pop_task_event(self.scope.task_id)
         return None
 
+    def ack_event(self, event: Event) -> None:
+        self._eventbus.ack_event(event)
+
     def send_event(self, event: Event) -> None:
         self._validate_closed()
         task = self._tasks.get_task(event.task_id)
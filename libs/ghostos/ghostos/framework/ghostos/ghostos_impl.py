@@ -91,6 +91,7 @@ class GhostOSImpl(GhostOS):
             container=self._container,
             process=process,
             providers=providers,
+            name=name,
         )
 
 
@@ -10,7 +10,6 @@ from ghostos.core.runtime import TaskState, EventTypes, TaskBrief
 from ghostos_moss import Injection, MossRuntime
 from ghostos.core.messages import MessageKind, MessageKindParser, Message, Role
 from pprint import pprint
-from contextlib import redirect_stdout
 from io import StringIO
 from ghostos_common.prompter import PromptObjectModel
 from ghostos_common.helpers import yaml_pretty_dump
@@ -73,8 +72,7 @@ use Mindflow to operate the task state if you need.
                 content = value.get_prompt(self.container, depth=3)
             else:
                 buffer = StringIO()
-                with redirect_stdout(buffer):
-                    pprint(value)
+                pprint(value, stream=buffer)
                 content = str(buffer.getvalue())
             observation += f"\n```\n{content}\n```"
         message = Role.SYSTEM.new(content="", memory=observation)
@@ -2,7 +2,7 @@ from typing import Optional, List, Iterable, Tuple, TypeVar, Dict, Union, Any, C
 from ghostos.errors import StreamingError
 from ghostos.abcd import (
     Session, Ghost, GhostDriver, Matrix, Scope, Mindflow, Operator, Subtasks,
-    Messenger,
+    Messenger, Action,
 )
 from ghostos.abcd import get_ghost_driver
 from ghostos.core.messages import (
@@ -28,7 +28,10 @@ from ghostos_common.identifier import get_identifier
 from ghostos.framework.messengers import DefaultMessenger
 from ghostos.framework.ghostos.mindflow_impl import MindflowImpl
 from ghostos.framework.ghostos.subtasks_impl import SubtasksImpl
+from ghostos.contracts.pool import Pool
 from threading import Lock
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import time
 
 from ghostos.errors import SessionError
 
@@ -62,7 +65,11 @@ class SessionImpl(Session[Ghost]):
             alive_check: Callable[[], bool],
             max_errors: int,
             safe_mode: bool = False,
+            caller_timeout: float = 0.0,
     ):
+        """
+        :param caller_timeout: seconds to wait for a parallel caller, <= 0 means no limit.
+        """
         # session level container
         self.container = Container(parent=container, name="session")
 
@@ -100,6 +107,7 @@ class SessionImpl(Session[Ghost]):
         self._respond_lock = Lock()
         self._respond_buffer: List = []
         self._safe_mode = safe_mode
+        self._caller_timeout = caller_timeout
 
         Session.instance_count += 1
 
@@ -299,6 +307,7 @@ class SessionImpl(Session[Ghost]):
             name: str = "",
             stage: str = "",
             payloads: Optional[List[Payload]] = None,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
     ) -> Messenger:
         self._validate_alive()
 
@@ -316,7 +325,8 @@ class SessionImpl(Session[Ghost]):
             role=Role.ASSISTANT.value,
             payloads=payloads,
             stage=str(stage),
-            output_pipes=self.ghost_driver.output_pipes()
+            output_pipes=self.ghost_driver.output_pipes(),
+            on_caller=on_caller,
         )
 
     def respond(
@@ -324,11 +334,12 @@ class SessionImpl(Session[Ghost]):
             messages: Iterable[MessageKind],
             stage: str = "",
             save: bool = True,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
     ) -> Tuple[List[Message], List[FunctionCaller]]:
         self._validate_alive()
         messages = self._message_parser.parse(messages)
         with self._respond_lock:
-            messenger = self.messenger(stage=stage)
+            messenger = self.messenger(stage=stage, on_caller=on_caller)
             try:
                 messenger.send(messages)
             except StreamingError as e:
@@ -350,6 +361,35 @@ class SessionImpl(Session[Ghost]):
                 items.append(message)
         self._respond_buffer.extend(items)
 
+    def respond_and_handle_callers(
+            self,
+            messages: Iterable[MessageKind],
+            stage: str = "",
+    ) -> Tuple[List[Message], Optional[Operator]]:
+        if self.is_safe_mode():
+            return super().respond_and_handle_callers(messages, stage)
+        # the parallel safe callers are started while the rest of the messages are still streaming.
+        runner = self._callers_runner()
+        try:
+            messages, callers = self.respond(messages, stage, on_caller=runner.dispatch)
+        except BaseException:
+            runner.discard()
+            raise
+        return messages, runner.run(callers)
+
+    def handle_callers(self, callers: Iterable[FunctionCaller], force: bool = False) -> Optional[Operator]:
+        callers = list(callers)
+        if not callers:
+            return None
+        if self.is_safe_mode() and not force:
+            self.thread.set_approval(False, callers)
+            return None
+        return self._callers_runner().run(callers)
+
+    def _callers_runner(self) -> "CallersRunner":
+        actions = {a.name(): a for a in self.ghost_driver.actions(self)}
+        return CallersRunner(self, actions, self.container.get(Pool), self._caller_timeout)
+
     def cancel_subtask(self, ghost: G, reason: str = "") -> None:
         self._validate_alive()
         driver = get_ghost_driver(ghost)
@@ -553,3 +593,278 @@ class SessionImpl(Session[Ghost]):
         del self.ghost
         del self.ghost_driver
         del self.scope
+
+
+class CallersRunner:
+    """
+    run the function callers of a turn for the session.
+    the parallel safe callers run in the pool, the messages they respond are buffered,
+    and added to the session in the order of the callers; the others run in order in the current thread.
+    the first operator returned in the order of the callers wins, the others are destroyed.
+    """
+
+    def __init__(self, session: Session, actions: Dict[str, Action], pool: Optional[Pool], timeout: float = 0.0):
+        """
+        :param session: the session the callers respond to
+        :param actions: name => the action of the callers
+        :param pool: the parallel safe callers run sequentially without the pool
+        :param timeout: seconds to wait for a parallel caller, <= 0 means no limit
+        """
+        self.session = session
+        self.actions = actions
+        self.pool = pool
+        self.timeout = timeout
+        self._started: List[Tuple[FunctionCaller, _ParallelCaller]] = []
+
+    def _parallel_safe(self, caller: FunctionCaller) -> bool:
+        action = self.actions.get(caller.name, None)
+        return action is not None and action.parallel_safe()
+
+    def dispatch(self, caller: FunctionCaller) -> None:
+        """
+        start a parallel safe caller as soon as the messenger completes its message.
+        """
+        if self.pool is None or not self._parallel_safe(caller):
+            return
+        self.session.logger.debug("session dispatch caller %s during streaming", caller.name)
+        self._started.append((caller, self._start(caller)))
+
+    def discard(self) -> None:
+        """
+        discard the dispatched callers, the callers of an interrupted response are not handled.
+        """
+        started = self._started
+        self._started = []
+        for caller, running in started:
+            self.session.logger.info("session discard caller %s dispatched during streaming", caller.name)
+            running.discard()
+
+    def run(self, callers: List[FunctionCaller]) -> Optional[Operator]:
+        parallel = self._join(callers)
+        self.discard()
+        if self.pool is not None:
+            indexes = [i for i, caller in enumerate(callers) if i not in parallel and self._parallel_safe(caller)]
+            # a single caller is not worth the pool.
+            if parallel or len(indexes) > 1:
+                for i in indexes:
+                    parallel[i] = self._start(callers[i])
+
+        result = None
+        for i, caller in enumerate(callers):
+            if i in parallel:
+                op = parallel[i].wait(self.session)
+            elif result is not None:
+                # the sequential callers after the first operator are not run.
+                continue
+            elif caller.name not in self.actions:
+                self.session.logger.error("session receive caller %s, miss action", caller.name)
+                self.session.respond([caller.new_output(f"Error: function `{caller.name}` not found")])
+                continue
+            else:
+                action = self.actions[caller.name]
+                self.session.logger.debug("session handle caller %s with action %s ", caller.name, type(action))
+                op = action.run(self.session, caller)
+            if op is None:
+                continue
+            if result is None:
+                result = op
+            else:
+                op.destroy()
+        return result
+
+    def _start(self, caller: FunctionCaller) -> "_ParallelCaller":
+        return _ParallelCaller(self.session, self.pool, self.actions[caller.name], caller, self.timeout)
+
+    def _join(self, callers: List[FunctionCaller]) -> Dict[int, "_ParallelCaller"]:
+        """
+        match the dispatched callers to the callers of the complete response.
+        :return: index of the caller => the running caller
+        """
+        parallel = {}
+        for i, caller in enumerate(callers):
+            for j, (dispatched, running) in enumerate(self._started):
+                if (
+                        dispatched.call_id == caller.call_id
+                        and dispatched.name == caller.name
+                        and dispatched.arguments == caller.arguments
+                ):
+                    parallel[i] = running
+                    del self._started[j]
+                    break
+        return parallel
+
+
+class _ParallelCaller:
+    """
+    a caller running in the pool with a _ParallelSession.
+    """
+
+    def __init__(self, session: Session, pool: Pool, action: Action, caller: FunctionCaller, timeout: float):
+        self.caller = caller
+        self.timeout = timeout
+        self.deadline = time.time() + timeout if timeout > 0 else None
+        self.responds: List[Tuple[List[MessageKind], str, bool]] = []
+        self.future = pool.submit(action.run, _ParallelSession(session, self.responds), caller)
+
+    def wait(self, session: Session) -> Optional[Operator]:
+        timeout = max(0.0, self.deadline - time.time()) if self.deadline is not None else None
+        try:
+            op = self.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            session.logger.error("session caller %s timeout", self.caller.name)
+            session.respond([self.caller.new_output(
+                f"Error: function `{self.caller.name}` timeout after {self.timeout} seconds"
+            )])
+            self.discard()
+            return None
+        for messages, stage, save in self.responds:
+            session.respond(messages, stage, save)
+        return op
+
+    def discard(self) -> None:
+        """
+        the caller is not waited any more, the operator it returns later is destroyed.
+        """
+        if not self.future.cancel():
+            self.future.add_done_callback(_destroy_discarded_operator)
+
+
+def _destroy_discarded_operator(future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    op = future.result()
+    if op is not None:
+        op.destroy()
+
+
+class _ParallelSession(Session):
+    """
+    the session that a parallel caller runs the action with.
+    the messages it responds are buffered, the rest is delegated to the session.
+    """
+
+    def __init__(self, session: Session, responds: List[Tuple[List[MessageKind], str, bool]]):
+        self._session = session
+        self._responds = responds
+
+    @property
+    def ghost(self) -> G:
+        return self._session.ghost
+
+    @property
+    def ghost_driver(self) -> GhostDriver[G]:
+        return self._session.ghost_driver
+
+    @property
+    def task(self) -> GoTaskStruct:
+        return self._session.task
+
+    @property
+    def scope(self) -> Scope:
+        return self._session.scope
+
+    @property
+    def state(self) -> Dict[str, EntityType]:
+        return self._session.state
+
+    @property
+    def container(self) -> Container:
+        return self._session.container
+
+    @property
+    def thread(self) -> GoThreadInfo:
+        return self._session.thread
+
+    @thread.setter
+    def thread(self, thread: GoThreadInfo) -> None:
+        self._session.thread = thread
+
+    @property
+    def logger(self) -> LoggerItf:
+        return self._session.logger
+
+    def respond(
+            self,
+            messages: Iterable[MessageKind],
+            stage: str = "",
+            save: bool = True,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
+    ) -> Tuple[List[Message], List[FunctionCaller]]:
+        self._responds.append((list(messages), stage, save))
+        return [], []
+
+    def alive(self) -> bool:
+        return self._session.alive()
+
+    def allow_streaming(self) -> bool:
+        return self._session.allow_streaming()
+
+    def get_truncated_thread(self) -> GoThreadInfo:
+        return self._session.get_truncated_thread()
+
+    def to_messages(self, values: Iterable[Union[MessageKind, Any]]) -> List[Message]:
+        return self._session.to_messages(values)
+
+    def parse_event(self, event: Event) -> Tuple[Optional[Event], Optional[Operator]]:
+        return self._session.parse_event(event)
+
+    def is_safe_mode(self) -> bool:
+        return self._session.is_safe_mode()
+
+    def system_log(self, log: str) -> None:
+        self._session.system_log(log)
+
+    def get_context(self) -> Optional[PromptObjectModel]:
+        return self._session.get_context()
+
+    def get_artifact(self) -> Ghost.ArtifactType:
+        return self._session.get_artifact()
+
+    def get_system_instructions(self) -> str:
+        return self._session.get_system_instructions()
+
+    def refresh(self, throw: bool = False) -> bool:
+        return self._session.refresh(throw)
+
+    def save(self):
+        return self._session.save()
+
+    def mindflow(self) -> Mindflow:
+        return self._session.mindflow()
+
+    def subtasks(self) -> Subtasks:
+        return self._session.subtasks()
+
+    def messenger(
+            self, *,
+            name: str = "",
+            stage: str = "",
+            payloads: Optional[List[Payload]] = None,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
+    ) -> Messenger:
+        return self._session.messenger(name=name, stage=stage, payloads=payloads, on_caller=on_caller)
+
+    def respond_buffer(self, messages: Iterable[MessageKind], stage: str = "") -> None:
+        self._session.respond_buffer(messages, stage)
+
+    def save_threads(self, *threads: GoThreadInfo) -> None:
+        self._session.save_threads(*threads)
+
+    def create_tasks(self, *tasks: GoTaskStruct) -> None:
+        self._session.create_tasks(*tasks)
+
+    def call(self, ghost: Ghost, ctx: Ghost.ContextType) -> Ghost.ArtifactType:
+        return self._session.call(ghost, ctx)
+
+    def fire_events(self, *events: "Event") -> None:
+        self._session.fire_events(*events)
+
+    def get_task_briefs(self, *task_ids: str) -> Dict[str, TaskBrief]:
+        return self._session.get_task_briefs(*task_ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # the parallel caller never exits the session.
+        pass
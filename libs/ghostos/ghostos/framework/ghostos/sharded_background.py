@@ -0,0 +1,181 @@
+import multiprocessing
+import threading
+from typing import Optional, List, Dict
+
+from ghostos.abcd import Background
+from ghostos.core.messages import Message
+from ghostos.core.runtime import Event, EventBus
+from ghostos.contracts.logger import get_ghostos_logger
+
+__all__ = ['ShardedBackground', 'ShardWorkerBackground']
+
+
+class ShardWorkerBackground(Background):
+    """
+    the background of a shard worker process. errors are logged and the worker keeps running until stopped.
+    """
+
+    def __init__(self, stop: threading.Event, shard_index: int):
+        self._stop = stop
+        self._shard_index = shard_index
+
+    def on_error(self, error: Exception) -> bool:
+        get_ghostos_logger().exception("background shard %d got error: %s", self._shard_index, error)
+        return True
+
+    def on_event(self, event: Event, messages: List[Message]) -> None:
+        return None
+
+    def alive(self) -> bool:
+        return not self._stop.is_set()
+
+    def halt(self) -> int:
+        return 0
+
+
+def _run_shard(
+        name: str,
+        matrix_id: str,
+        process_id: str,
+        eventbus_path: str,
+        shard_index: int,
+        shard_count: int,
+        workers: int,
+        container_maker: Optional[str],
+        stop,
+) -> None:
+    """
+    main function of a shard worker process.
+    build the container of the process, and run the background of the matrix on the shard of the tasks.
+    """
+    from ghostos.abcd import GhostOS
+    from ghostos.framework.eventbuses.sqliteimpl import SQLiteEventBusImpl
+
+    if container_maker:
+        from ghostos_common.helpers import import_from_path
+        container = import_from_path(container_maker)()
+        container.bootstrap()
+    else:
+        from ghostos.bootstrap import bootstrap
+        container = bootstrap()
+
+    # all the shards pop notifications from the same database, each one only its own tasks.
+    eventbus = SQLiteEventBusImpl(eventbus_path, shard_index=shard_index, shard_count=shard_count)
+    container.set(EventBus, eventbus)
+
+    ghostos = container.force_fetch(GhostOS)
+    matrix = ghostos.create_matrix(name, matrix_id=matrix_id, process_id=process_id)
+    local_stop = threading.Event()
+    matrix.background_run(workers, ShardWorkerBackground(local_stop, shard_index))
+    try:
+        while not stop.wait(1.0):
+            if matrix.closed():
+                break
+    finally:
+        local_stop.set()
+        matrix.close()
+        eventbus.shutdown()
+
+
+class ShardedBackground:
+    """
+    supervisor of the background worker processes of a matrix.
+
+    the tasks are sharded by the hash of the task id, each worker process has its own container and
+    pops the notifications of its shard from the shared sqlite event bus.
+    a crashed worker is restarted, and only the tasks of its shard are delayed.
+    """
+
+    def __init__(
+            self,
+            *,
+            name: str,
+            matrix_id: str,
+            process_id: str,
+            eventbus_path: str,
+            processes: int,
+            workers: int = 1,
+            container_maker: Optional[str] = None,
+            restart: bool = True,
+            start_method: str = "spawn",
+    ):
+        """
+        :param name: the matrix name in the ghostos config
+        :param matrix_id: the matrix id
+        :param process_id: the process id of the matrix
+        :param eventbus_path: the sqlite event bus database file shared by the processes
+        :param processes: count of the worker processes, also the count of the shards
+        :param workers: count of the background threads in each worker process
+        :param container_maker: import path of `Callable[[], Container]` for the workers, default ghostos bootstrap.
+        :param restart: restart the crashed worker processes
+        :param start_method: the multiprocessing start method
+        """
+        if processes < 1:
+            raise ValueError(f"processes must be positive, got {processes}")
+        self._ctx = multiprocessing.get_context(start_method)
+        self._args = (name, matrix_id, process_id, eventbus_path)
+        self._processes_count = processes
+        self._workers = workers
+        self._container_maker = container_maker
+        self._restart = restart
+        self._stop = self._ctx.Event()
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._monitor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _spawn(self, shard_index: int) -> None:
+        process = self._ctx.Process(
+            target=_run_shard,
+            args=(
+                *self._args,
+                shard_index,
+                self._processes_count,
+                self._workers,
+                self._container_maker,
+                self._stop,
+            ),
+            name=f"ghostos-background-{shard_index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[shard_index] = process
+
+    def start(self) -> None:
+        if self._monitor is not None:
+            raise RuntimeError("sharded background already started")
+        for i in range(self._processes_count):
+            self._spawn(i)
+        self._monitor = threading.Thread(target=self._monitor_processes, daemon=True)
+        self._monitor.start()
+
+    def _monitor_processes(self) -> None:
+        logger = get_ghostos_logger()
+        while not self._stopping.wait(1.0):
+            for shard_index, process in list(self._processes.items()):
+                if process.is_alive():
+                    continue
+                if self._stopping.is_set():
+                    return
+                logger.error("background shard %d exited with code %s", shard_index, process.exitcode)
+                if self._restart:
+                    self._spawn(shard_index)
+
+    def alive(self) -> List[int]:
+        """
+        :return: the shard indexes of the alive worker processes
+        """
+        return [i for i, p in self._processes.items() if p.is_alive()]
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        stop the worker processes gracefully, kill them after timeout.
+        """
+        self._stopping.set()
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join()
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
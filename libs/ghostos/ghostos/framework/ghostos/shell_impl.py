@@ -16,7 +16,9 @@ from ghostos_common.identifier import get_identifier
 from ghostos_common.entity import to_entity_meta
 from threading import Lock
 from pydantic import BaseModel, Field
+from ghostos.framework.eventbuses.sqliteimpl import SQLiteEventBusImpl
 from .conversation_impl import ConversationImpl, ConversationConf
+from .sharded_background import ShardedBackground
 
 __all__ = ['MatrixConf', 'MatrixImpl', 'Matrix']
 
@@ -64,9 +66,11 @@ class MatrixImpl(Matrix):
             container: Container,
             process: GoProcess,
             providers: List[Provider],
+            name: str = "",
     ):
         self._conversation_mutex = Lock()
         self._conf = config
+        self._name = name or process.matrix_id
         # matrix is the same container as ghostos.
         self._container = container
         # prepare container
@@ -92,6 +96,7 @@ class MatrixImpl(Matrix):
         self._tasks = self._container.force_fetch(GoTasks)
         self._closed = False
         self._background_started = False
+        self._sharded_background: Optional[ShardedBackground] = None
         # bootstrap the container.
         # bind self
         self._container.set(Matrix, self)
@@ -354,9 +359,46 @@ class MatrixImpl(Matrix):
         if self._background_started:
             raise RuntimeError(f'background run already started')
 
+        self._background_started = True
         for i in range(worker):
             self._pool.submit(self._run_background_worker, background)
 
+    def background_run_processes(
+            self,
+            processes: int,
+            worker: int = 1,
+            *,
+            container_maker: Optional[str] = None,
+    ) -> ShardedBackground:
+        """
+        run the background in worker processes instead of the threads of this process.
+        the tasks are sharded to the processes by task id, each process has its own container.
+        the event bus must be the SQLiteEventBusImpl, so the events sent by this matrix reach the workers.
+        :param processes: count of the worker processes
+        :param worker: count of the background threads in each process
+        :param container_maker: import path of `Callable[[], Container]` for the workers, default ghostos bootstrap.
+        :return: the supervisor of the worker processes, stopped when the matrix is closed.
+        """
+        self._validate_closed()
+        if self._background_started:
+            raise RuntimeError(f'background run already started')
+        if not isinstance(self._eventbus, SQLiteEventBusImpl):
+            raise NotImplementedError(
+                f"background run in processes requires SQLiteEventBusImpl, got {type(self._eventbus)}"
+            )
+        self._background_started = True
+        self._sharded_background = ShardedBackground(
+            name=self._name,
+            matrix_id=self._matrix_id,
+            process_id=self._process_id,
+            eventbus_path=self._eventbus.filepath,
+            processes=processes,
+            workers=worker,
+            container_maker=container_maker,
+        )
+        self._sharded_background.start()
+        return self._sharded_background
+
     def _run_background_worker(self, background: Optional[Background] = None):
         def is_stopped() -> bool:
             if self._closed:
@@ -410,6 +452,9 @@ class MatrixImpl(Matrix):
             self.logger.info("closing shell conversation %s", conversation.task_id)
             conversation.close()
         self.logger.info("shell conversations are closed")
+        if self._sharded_background is not None:
+            self._sharded_background.stop()
+            self.logger.info("shell background processes are stopped")
         self._container.shutdown()
         self.logger.info("shell container destroyed")
         self.logger.info("shutting down shell pool")
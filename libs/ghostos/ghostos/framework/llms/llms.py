@@ -1,5 +1,6 @@
 from typing import Optional, Dict, Iterator, Tuple, List
 from os import environ
+from threading import Lock
 
 from ghostos.core.llms import LLMs, LLMApi, ServiceConf, ModelConf, LLMDriver, LLMsConfig
 
@@ -24,6 +25,7 @@ class LLMsImpl(LLMs):
         self._llm_models: Dict[str, ModelConf] = {}
         self._default_driver = default_driver
         self._apis: Dict[str, LLMApi] = {}
+        self._lock = Lock()
         self._default_llm_model: ModelConf = conf.models.get(conf.default, None)
         if self._default_llm_model is None:
             raise AttributeError("llms conf must contains default model conf")
@@ -38,25 +40,32 @@ class LLMsImpl(LLMs):
                 self.register_model(name, model)
 
     def update(self, config: LLMsConfig) -> None:
-        self.config = config
-        self._llm_services: Dict[str, ServiceConf] = {}
-        self._llm_models: Dict[str, ModelConf] = {}
-        self._apis: Dict[str, LLMApi] = {}
-        self._default_llm_model: ModelConf = config.models.get(config.default, None)
-        if self._default_llm_model is None:
+        """
+        replace the config while the other threads are getting apis.
+        the new config is validated first, a bad one raises and the old config is kept.
+        """
+        default_llm_model = config.models.get(config.default, None)
+        if default_llm_model is None:
             raise AttributeError("llms conf must contains default model conf")
-        if config:
-            for service in config.services:
-                self.register_service(service)
-            for name, model in config.models.items():
-                self.register_model(name, model)
+        services: Dict[str, ServiceConf] = {}
+        for service in config.services:
+            service.load()
+            services[service.name] = service
+        models = dict(config.models)
+        with self._lock:
+            self.config = config
+            self._llm_services = services
+            self._llm_models = models
+            self._default_llm_model = default_llm_model
+            self._apis = {}
 
     def register_driver(self, driver: LLMDriver) -> None:
         self._llm_drivers[driver.driver_name()] = driver
 
     def register_service(self, service: ServiceConf) -> None:
         service.load()
-        self._llm_services[service.name] = service
+        with self._lock:
+            self._llm_services[service.name] = service
 
     @staticmethod
     def _get_token(token_key: str) -> str:
@@ -66,7 +75,8 @@ class LLMsImpl(LLMs):
         return environ.get(token_key)
 
     def register_model(self, name: str, model_conf: ModelConf) -> None:
-        self._llm_models[name] = model_conf
+        with self._lock:
+            self._llm_models[name] = model_conf
 
     def services(self) -> List[ServiceConf]:
         return list(self._llm_services.values())
@@ -87,27 +97,35 @@ class LLMsImpl(LLMs):
         return driver.new(service_conf, api_conf, api_name=api_name)
 
     def get_api(self, api_name: str = "") -> Optional[LLMApi]:
+        # the state of one config, the update may replace it meanwhile.
+        with self._lock:
+            config = self.config
+            apis = self._apis
+            models = self._llm_models
+            services = self._llm_services
+            default_llm_model = self._default_llm_model
+
         if not api_name:
-            api_name = self.config.default
+            api_name = config.default
 
         # from cache. maybe not necessary
-        api = self._apis.get(api_name, None)
+        api = apis.get(api_name, None)
         if api is not None:
             return api
 
         if api_name:
-            model_conf = self._llm_models.get(api_name, None)
+            model_conf = models.get(api_name, None)
         else:
-            model_conf = self._default_llm_model
+            model_conf = default_llm_model
         if model_conf is None:
             raise AttributeError(f"model conf {api_name} not found in llms conf")
 
-        service_conf = self._llm_services.get(model_conf.service, None)
+        service_conf = services.get(model_conf.service, None)
         if service_conf is None:
             return None
         api = self.new_api(service_conf, model_conf, api_name=api_name)
         # 解决缓存问题. 工业场景中, 或许不该缓存, 因为配置随时可能变化.
         if api is not None:
-            self._apis[api_name] = api
+            apis[api_name] = api
             return api
         return None
@@ -49,6 +49,15 @@ class ConfigBasedLLMsProvider(Provider[LLMs]):
         llms.register_driver(lite_llm_driver)
         llms.register_driver(deepseek_driver)
 
+        def reload(relative_path: str) -> None:
+            logger.info("reload llms config from %s", relative_path)
+            try:
+                llms.update(configs.get(LLMsYamlConfig))
+            except Exception as e:
+                # a bad config saved by the user shall not break the running llms.
+                logger.error("reload llms config from %s failed, keep the old one: %s", relative_path, e)
+
+        configs.on_change(LLMsYamlConfig.conf_path(), reload)
         return llms
 
 
@@ -1,4 +1,4 @@
-from typing import Optional, Iterable, List, Tuple
+from typing import Optional, Iterable, List, Tuple, Callable
 from ghostos.abcd.concepts import Messenger
 from ghostos.core.messages import (
     Message, Payload, Role, MessageType,
@@ -22,7 +22,11 @@ class DefaultMessenger(Messenger):
             payloads: Optional[Iterable[Payload]] = None,
             stage: str = "",
             output_pipes: Optional[List[Pipe]] = None,
+            on_caller: Optional[Callable[[FunctionCaller], None]] = None,
     ):
+        """
+        :param on_caller: called with each function caller as soon as its message is complete during streaming.
+        """
         self._upstream = upstream
         self._assistant_name = name
         self._role = role if role else Role.ASSISTANT.value
@@ -34,6 +38,7 @@ class DefaultMessenger(Messenger):
         self._destroyed = False
         self._output_pipes = output_pipes
         self._buffering: Optional[Message] = None
+        self._on_caller = on_caller
         self.finish_reason = None
 
     def flush(self) -> Tuple[List[Message], List[FunctionCaller]]:
@@ -48,15 +53,7 @@ class DefaultMessenger(Messenger):
 
             message = self._sent_messages[msg_id]
             messages.append(message)
-            if message.type == MessageType.FUNCTION_CALL:
-                callers.append(FunctionCaller(
-                    call_id=message.call_id,
-                    name=message.name,
-                    arguments=message.content,
-                ))
-            # 非 function call 类型但也可以有 caller.
-            elif message.callers:
-                callers.extend(message.callers)
+            callers.extend(self._message_callers(message))
         # if buffering is not None, means interrupted.
         if self._buffering is not None:
             self.finish_reason = "interrupt"
@@ -66,6 +63,17 @@ class DefaultMessenger(Messenger):
         self.destroy()
         return messages, callers
 
+    @staticmethod
+    def _message_callers(message: Message) -> List[FunctionCaller]:
+        if message.type == MessageType.FUNCTION_CALL:
+            return [FunctionCaller(
+                call_id=message.call_id,
+                name=message.name,
+                arguments=message.content,
+            )]
+        # 非 function call 类型但也可以有 caller.
+        return list(message.callers) if message.callers else []
+
     def __del__(self):
         self.destroy()
 
@@ -77,6 +85,7 @@ class DefaultMessenger(Messenger):
         self._sent_messages = {}
         self._sent_message_ids = []
         self._sent_callers = []
+        self._on_caller = None
 
     def send(self, messages: Iterable[Message]) -> bool:
         messages = self.buffer(messages)
@@ -96,6 +105,10 @@ class DefaultMessenger(Messenger):
 
             item = self.wrap(item)
             if item.is_complete():
+                # dispatch the callers of the complete message before the stream ends.
+                if self._on_caller is not None and item.msg_id not in self._sent_messages:
+                    for caller in self._message_callers(item):
+                        self._on_caller(caller)
                 # buffer outputs
                 self._sent_message_ids.append(item.msg_id)
                 self._sent_messages[item.msg_id] = item
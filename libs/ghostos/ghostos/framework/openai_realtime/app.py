@@ -13,9 +13,7 @@ from ghostos.abcd import Conversation
 from ghostos.core.messages import ReceiverBuffer, Message
 from ghostos.abcd.realtime import RealtimeApp, Listener, Speaker, Operator
 from ghostos_common.helpers import Timeleft
-from threading import Thread
-from queue import Empty
-import time
+from threading import Thread, Condition
 
 __all__ = ['RealtimeAppImpl']
 
@@ -44,14 +42,40 @@ class RealtimeAppImpl(RealtimeApp):
         self._threads: List[Thread] = []
         self._client = AppClient(self._config, vad_mode, self._output, self.conversation)
         self._stopped = threading.Event()
-        self._close_check = Thread(target=self._close_check)
+
+        # the threads wait on the change condition instead of polling.
+        self._changed = Condition()
+        self._changed_version: int = 0
+        self._receiving = Thread(target=self._receiving_thread)
+        self._close_check = Thread(target=self._close_check_thread)
 
     def _create_output_buffer(self) -> OutputBuffer:
         return DefaultOutputBuffer(self.is_closed, logger=self.conversation.logger)
 
-    def _close_check(self):
-        while not self._stopped.is_set():
-            time.sleep(0.5)
+    def _notify_changed(self) -> None:
+        """
+        wake up the threads waiting for the app state changes.
+        """
+        with self._changed:
+            self._changed_version += 1
+            self._changed.notify_all()
+
+    def _wait_changed(self, seen: int, timeout: Optional[float] = None) -> None:
+        """
+        block until the app state changed after the seen version, the app is closed or timeout.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._changed_version != seen or self.is_closed(),
+                timeout,
+            )
+
+    def _stop(self) -> None:
+        self._stopped.set()
+        self._notify_changed()
+
+    def _close_check_thread(self):
+        self._stopped.wait()
         self.close()
 
     @property
@@ -76,20 +100,42 @@ class RealtimeAppImpl(RealtimeApp):
         self._threads.append(Thread(target=self._listening_thread))
         for t in self._threads:
             t.start()
+        self._receiving.start()
+        self._close_check.start()
 
     def add_message(self, message: Message, previous_message_id: Optional[str] = None):
         self._client.server_ctx.add_message_to_server(message, previous_message_id)
 
+    def _receiving_thread(self):
+        """
+        block on the websocket connection, and wake up the main state thread when a server event arrives.
+        """
+        try:
+            connection = None
+            while not self.is_closed():
+                if connection is None or connection.closed():
+                    # wait for the connection (re)created by the main state thread.
+                    connection = self._client.wait_connection(connection)
+                    continue
+                data = connection.recv(timeout=None)
+                if data:
+                    self._client.server_events.put(data)
+                    self._notify_changed()
+        except Exception as e:
+            self._client.logger.exception(e)
+            self._stop()
+
     def _main_state_thread(self):
         try:
-            interval = 0.1
-            timeleft = Timeleft(5)
-            while not self.is_closed() and not self._stopped.is_set():
+            refresh_interval = 5
+            timeleft = Timeleft(refresh_interval)
+            while not self.is_closed():
+                seen = self._changed_version
                 # check conversation, refresh it.
                 if not timeleft.alive():
                     if not self.conversation.refresh():
                         break
-                    timeleft = Timeleft(5)
+                    timeleft = Timeleft(refresh_interval)
                     self._client.logger.debug("realtime main thread refresh conversation")
 
                 state = self._state
@@ -116,36 +162,47 @@ class RealtimeAppImpl(RealtimeApp):
                     next_state.on_init()
                     self._state = next_state
                     state.destroy()
+                    self._notify_changed()
                     continue
 
                 if state.recv_server_event():
                     self._client.logger.debug("handled server event")
+                    # the listening state may be changed by the server event.
+                    self._notify_changed()
                     continue
                 elif event := self._client.conversation.pop_event():
                     # handle ghostos event if server event is missing.
                     self._client.logger.debug("handle ghostos event")
                     self._client.handle_ghostos_event(event)
+                    # the event is not submitted to a session, so it is acknowledged here.
+                    self._client.conversation.ack_event(event)
                     continue
 
-                time.sleep(interval)
+                # sleep until server events, operators or output changes arrive.
+                # ghostos events and the conversation refresh are not notified, so wait with timeout.
+                timeout = min(timeleft.left(), self._config.ghostos_event_interval)
+                self._wait_changed(seen, timeout)
         except Exception as e:
             self._client.logger.exception(e)
-            self._stopped.set()
+        finally:
+            self._stop()
 
     def _speaking_thread(self):
         try:
-            while not self.is_closed() and not self._stopped.is_set():
-                response_id = self._output.get_response_id()
+            while not self.is_closed():
+                # wake up as soon as a response is started.
+                response_id = self._output.wait_response()
                 if response_id is None:
-                    time.sleep(0.1)
                     continue
                 self._client.logger.debug("start speaking. respond id is %s", response_id)
                 self._run_speaking_loop(response_id)
                 self._output.stop_output(response_id)
                 self._client.logger.debug("stop speaking. responding is %r", self._client.is_responding())
+                # the responding state may be finished.
+                self._notify_changed()
         except Exception as e:
             self._client.logger.exception(e)
-            self._stopped.set()
+            self._stop()
 
     def _run_speaking_loop(self, response_id: str):
         output_buffer = self._output
@@ -157,53 +214,57 @@ class RealtimeAppImpl(RealtimeApp):
         client.logger.debug("start speaking loop")
 
         def receive():
-            try:
-                item = q.get(block=True)
-                return item
-            except Empty:
-                time.sleep(0.2)
+            # the first audio delta is spoken as soon as it arrives.
+            # stopping, restarting or closing the output puts None to the queue, which ends the speaking.
+            return q.get(block=True)
 
         with self._speaker.speak(receive) as speaking:
-            while not speaking.done():
-                if self.is_closed() or not self._output.is_speaking():
-                    break
-                if self._output.get_response_id() != response_id:
-                    break
-                time.sleep(0.1)
+            speaking.wait()
         client.logger.debug("end speaking loop")
 
     def _listening_thread(self):
         try:
-            while not self.is_closed() and not self._stopped.is_set():
+            while not self.is_closed():
+                seen = self._changed_version
                 client = self._client
                 if not client.is_listening():
-                    time.sleep(0.1)
+                    self._wait_changed(seen)
                     continue
                 session_id = client.get_session_id()
                 self._run_listening_loop(session_id)
         except Exception as e:
             self._client.logger.exception(e)
-            self._stopped.set()
+            self._stop()
 
     def _run_listening_loop(self, session_id: str):
         client = self._client
         client.logger.debug("start listening loop")
         with self._listener.listen(client.audio_buffer_append):
             while not self.is_closed():
+                seen = self._changed_version
                 if not client.is_listening():
                     client.logger.debug("stop listening loop")
                     break
-                time.sleep(0.1)
+                self._wait_changed(seen)
         client.logger.debug("end listening loop")
 
     def close(self):
         if self._closed:
             return
         self._closed = True
+        self._stopped.set()
+        # wake up all the waiting threads.
+        self._output.close()
+        self._notify_changed()
+        current = threading.current_thread()
         for t in self._threads:
-            t.join()
+            if t is not current:
+                t.join()
         self._client.server_ctx.update_local_conversation()
+        # closing the connection unblocks the receiving thread.
         self._client.close()
+        if self._receiving.is_alive() and self._receiving is not current:
+            self._receiving.join()
         del self.conversation
 
     def is_closed(self) -> bool:
@@ -227,6 +288,7 @@ class RealtimeAppImpl(RealtimeApp):
 
         if vad_mode is not None:
             self._client.set_vad_mode(vad_mode=vad_mode)
+        self._notify_changed()
 
     def state(self) -> Tuple[str, List[Operator]]:
         if self.is_closed():
@@ -247,6 +309,7 @@ class RealtimeAppImpl(RealtimeApp):
             return False
         if self._state.allow(operator):
             self._operators.append(operator)
+            self._notify_changed()
             return True
         return False
 
@@ -2,10 +2,9 @@ import base64
 from typing import Dict, Optional, List
 from ghostos.abcd import Conversation
 from ghostos.contracts.logger import LoggerItf
-from ghostos.contracts.assets import AudioAssets
+from ghostos.contracts.assets import AudioAssets, AudioSink
 from ghostos.core.messages import Message, MessageType
 from ghostos.core.runtime import Turn, Event as GhostOSEvent, EventTypes as GhostOSEventTypes
-from io import BytesIO
 from ghostos.framework.openai_realtime.configs import OpenAIRealtimeAppConf
 from ghostos.framework.openai_realtime.ws import OpenAIWSConnection
 from ghostos.framework.openai_realtime.event_data_objects import MessageItem, SessionObject, Tool
@@ -23,10 +22,13 @@ from ghostos.framework.openai_realtime.event_from_client import (
 from ghostos.framework.openai_realtime.state_of_server import ServerContext, SessionState
 from ghostos.framework.openai_realtime.state_of_client import Client
 from ghostos.framework.openai_realtime.output import OutputBuffer
-from threading import Lock
-import wave
+from ghostos_common.helpers import uuid
+from threading import Lock, Condition
+from queue import Queue, Empty
 
 RATE = 24000
+CLIENT_AUDIO_RECENT_SIZE = RATE * 2 * 10
+"""pcm bytes of the latest 10 seconds client audio"""
 
 
 class Context(ServerContext):
@@ -39,7 +41,7 @@ class Context(ServerContext):
             listening: bool,
             output: OutputBuffer,
             logger: Optional[LoggerItf] = None,
-
+            audio_format: str = "wav",
     ):
         self.conversation: Conversation = conversation
         self.connection = connection
@@ -57,9 +59,19 @@ class Context(ServerContext):
         self.output_buffer: OutputBuffer = output
         self.listening: bool = listening
         self.response_id: Optional[str] = None
-        self.response_audio_buffer: Dict[str, BytesIO] = {}
-
-        self.client_audio_buffer: BytesIO = BytesIO()
+        self.audio_format: str = audio_format
+        self.response_audio_sinks: Dict[str, AudioSink] = {}
+        """response audio of each item is streamed to the assets, instead of buffered in memory."""
+
+        self.client_audio_sink: Optional[AudioSink] = None
+        self.client_audio_sent: int = 0
+        """pcm bytes of the client audio sent in the session, the audio ms of the server events count from it"""
+        self.client_audio_sink_offset: int = 0
+        """pcm bytes of the client audio sent before the current sink"""
+        self.client_audio_recent: bytearray = bytearray()
+        """the latest client audio sent, the tail after the speech end is carried into the next item from it"""
+        self.client_audio_recent_offset: int = 0
+        """pcm bytes of the client audio sent before the recent audio"""
         self.client_audio_buffer_locker: Lock = Lock()
         self.update_history_locker: Lock = Lock()
         self._destroyed = False
@@ -68,6 +80,13 @@ class Context(ServerContext):
         if self._destroyed:
             return
         self._destroyed = True
+        for sink in self.response_audio_sinks.values():
+            sink.close()
+        self.response_audio_sinks = {}
+        with self.client_audio_buffer_locker:
+            if self.client_audio_sink is not None:
+                self.client_audio_sink.abort()
+                self.client_audio_sink = None
         self.connection = None
         self.conversation = None
         self._reset_buffer_messages()
@@ -127,14 +146,10 @@ class Context(ServerContext):
                         self.add_message_to_server(item)
 
         self._reset_history_messages()
-        # update audio buffer
-        for item_id in self.response_audio_buffer:
-            buffer = self.response_audio_buffer[item_id]
-            buffer.seek(0)
-            data = buffer.getvalue()
-            buffer.close()
-            self.save_audio_data(item_id, data)
-        self.response_audio_buffer = {}
+        # finish the response audio files
+        for sink in self.response_audio_sinks.values():
+            sink.close()
+        self.response_audio_sinks = {}
 
     def respond_message_chunk(self, response_id: str, chunk: Optional[Message]) -> bool:
         if chunk is None:
@@ -151,30 +166,22 @@ class Context(ServerContext):
     def save_audio_item(self, item: MessageItem) -> None:
         if not item.has_audio():
             return
-        audio_data = item.get_audio_bytes()
-        self.save_audio_data(item.id, audio_data)
-
-    def save_audio_data(self, item_id: str, audio_data: bytes) -> None:
-        if not audio_data:
-            return
-        buffer = BytesIO()
-        with wave.open(buffer, 'wb') as f:
-            f.setnchannels(1)
-            f.setsampwidth(2)
-            # todo: save rate by configs
-            f.setframerate(24000)
-            f.writeframes(audio_data)
-
-        saving = buffer.getvalue()
-
-        asserts = self.conversation.container().force_fetch(AudioAssets)
-        fileinfo = asserts.get_fileinfo(item_id)
-        if fileinfo is None:
-            fileinfo = asserts.new_fileinfo(
-                fileid=item_id,
-                filename=f"{item_id}.wav",
-            )
-        asserts.save(fileinfo, saving)
+        with self.new_audio_sink(item.id) as sink:
+            for data in item.iter_audio_bytes():
+                sink.write(data)
+
+    def new_audio_sink(self, fileid: str) -> AudioSink:
+        """
+        open an audio sink that streams pcm data to the audio assets.
+        the file info is saved when the sink is closed.
+        """
+        assets = self.conversation.container().force_fetch(AudioAssets)
+        fileinfo = assets.new_fileinfo(
+            fileid=fileid,
+            filename=f"{fileid}.{self.audio_format}",
+        )
+        # todo: save rate by configs
+        return assets.new_sink(fileinfo, rate=RATE)
 
     def update_history_message(self, message: Optional[Message]) -> None:
         if message is None:
@@ -224,10 +231,10 @@ class Context(ServerContext):
 
     def respond_audio_chunk(self, response_id: str, item_id: str, data: bytes) -> bool:
         if response_id == self.response_id:
-            if item_id not in self.response_audio_buffer:
-                self.response_audio_buffer[item_id] = BytesIO()
-            buffer = self.response_audio_buffer[item_id]
-            buffer.write(data)
+            if item_id not in self.response_audio_sinks:
+                self.response_audio_sinks[item_id] = self.new_audio_sink(item_id)
+            sink = self.response_audio_sinks[item_id]
+            sink.write(data)
             return self.output_buffer.add_audio_output(response_id, data)
 
     def add_message_to_server(self, message: Message, previous_item_id: Optional[str] = None) -> bool:
@@ -249,7 +256,17 @@ class Context(ServerContext):
     def audio_buffer_append(self, buffer: bytes) -> None:
         with self.client_audio_buffer_locker:
             content = base64.b64encode(buffer)
-            self.client_audio_buffer.write(buffer)
+            if self.client_audio_sink is None:
+                # the item id is unknown until the speech stopped.
+                self.client_audio_sink = self.new_audio_sink(uuid())
+                self.client_audio_sink_offset = self.client_audio_sent
+            self.client_audio_sink.write(buffer)
+            self.client_audio_sent += len(buffer)
+            self.client_audio_recent.extend(buffer)
+            dropping = len(self.client_audio_recent) - CLIENT_AUDIO_RECENT_SIZE
+            if dropping > 0:
+                del self.client_audio_recent[:dropping]
+                self.client_audio_recent_offset += dropping
         ce = InputAudioBufferAppend(
             audio=content
         )
@@ -257,8 +274,11 @@ class Context(ServerContext):
 
     def clear_client_audio_buffer(self) -> None:
         with self.client_audio_buffer_locker:
-            self.client_audio_buffer.close()
-            self.client_audio_buffer = BytesIO()
+            if self.client_audio_sink is not None:
+                self.client_audio_sink.abort()
+                self.client_audio_sink = None
+            self.client_audio_recent.clear()
+            self.client_audio_recent_offset = self.client_audio_sent
         if self.listening:
             ce = InputAudioBufferClear()
             self.send_client_event(ce)
@@ -274,15 +294,25 @@ class Context(ServerContext):
 
     def set_client_audio_buffer_stop(self, item_id: str, end_ms: int) -> None:
         with self.client_audio_buffer_locker:
-            data = self.client_audio_buffer.getvalue()
-            # cut = int((RATE / 1000) * end_ms)
-            # cut_data = data[:cut]
-            # if cut < len(data):
-            #     left_data = data[cut:]
-            #     self.client_audio_buffer = BytesIO(left_data)
-            self.save_audio_data(item_id, data)
-        self.client_audio_buffer.close()
-        self.client_audio_buffer = BytesIO()
+            sink = self.client_audio_sink
+            self.client_audio_sink = None
+            if sink is None:
+                return
+            # the speech end counts from the start of the session, the item is empty if it ends before the sink.
+            end = max(int(RATE / 1000 * end_ms) * 2, self.client_audio_sink_offset)
+            sink.truncate(end - self.client_audio_sink_offset)
+            sink.fileinfo.fileid = item_id
+            sink.fileinfo.filename = f"{item_id}.{self.audio_format}"
+            # an empty sink is discarded by close.
+            sink.close()
+
+            # the audio appended after the speech end belongs to the next item.
+            start = max(end, self.client_audio_recent_offset) - self.client_audio_recent_offset
+            tail = bytes(self.client_audio_recent[start:])
+            if tail:
+                self.client_audio_sink = self.new_audio_sink(uuid())
+                self.client_audio_sink_offset = self.client_audio_sent - len(tail)
+                self.client_audio_sink.write(tail)
 
 
 class AppClient(Client):
@@ -299,6 +329,10 @@ class AppClient(Client):
         self.conf: OpenAIRealtimeAppConf = conf
         self.conversation: Conversation = conversation
         self.logger = conversation.logger
+        self.server_events: Queue = Queue()
+        """server events received from the connection, handled by the session state one at a time"""
+        self._connection_ready: bool = False
+        self._connection_changed = Condition()
         self.connection: OpenAIWSConnection = self.connect()
         self.server_ctx: Context = Context(
             conversation=conversation,
@@ -306,10 +340,12 @@ class AppClient(Client):
             listening=self._vad_mode,
             logger=conversation.logger,
             output=output_buffer,
+            audio_format=conf.audio_save_format,
         )
         self.session_state: SessionState = self._create_session_state()
         self.synchronized: bool = False
         self._sync_history: Optional[List[str]] = None
+        self._set_connection_ready(True)
 
     def set_vad_mode(self, vad_mode: bool) -> None:
         if vad_mode == self._vad_mode:
@@ -333,10 +369,39 @@ class AppClient(Client):
         if self._closed:
             raise RuntimeError("App Client is closed")
 
+    def _set_connection_ready(self, ready: bool) -> None:
+        with self._connection_changed:
+            self._connection_ready = ready
+            self._connection_changed.notify_all()
+
+    def wait_connection(
+            self,
+            previous: Optional[OpenAIWSConnection] = None,
+            timeout: Optional[float] = None,
+    ) -> Optional[OpenAIWSConnection]:
+        """
+        block until the connection is ready, and is not the previous one.
+        the session created event of a new connection is received before it is ready,
+        so the reader of the connection never steals it.
+        :param previous: the connection that the caller already read until closed.
+        :param timeout: None means wait until the client is closed.
+        :return: None if the client is closed or timeout.
+        """
+        with self._connection_changed:
+            self._connection_changed.wait_for(
+                lambda: self._closed or (self._connection_ready and self.connection is not previous),
+                timeout,
+            )
+            if self._closed or not self._connection_ready or self.connection is previous:
+                return None
+            return self.connection
+
     def close(self) -> None:
         if self._closed:
             return
-        self._closed = True
+        with self._connection_changed:
+            self._closed = True
+            self._connection_changed.notify_all()
         if self.connection:
             self.connection.close()
         if self.session_state:
@@ -355,6 +420,7 @@ class AppClient(Client):
 
     def reconnect(self) -> None:
         self._validate_closed()
+        self._set_connection_ready(False)
         if self.connection is not None:
             connection = self.connection
             connection.close()
@@ -363,8 +429,11 @@ class AppClient(Client):
         self.session_state = None
 
         self.connection: OpenAIWSConnection = self.connect()
+        # drop the events of the previous connection.
+        self.server_events = Queue()
         self.session_state: SessionState = self._create_session_state()
         self.synchronized = False
+        self._set_connection_ready(True)
 
     def audio_buffer_append(self, buffer: bytes) -> None:
         if not self.is_listening():
@@ -486,12 +555,13 @@ class AppClient(Client):
         return self.server_ctx.output_buffer.is_speaking()
 
     def receive_server_event(self) -> bool:
-        data = self.connection.recv(timeout=0.1)
-        if data:
-            self.logger.debug("got received server event")
-            self.session_state.recv(data)
-            return True
-        return False
+        try:
+            data = self.server_events.get_nowait()
+        except Empty:
+            return False
+        self.logger.debug("got received server event")
+        self.session_state.recv(data)
+        return True
 
     def handle_ghostos_event(self, event: GhostOSEvent):
         # send message to server, let the realtime server handle the new message items.
@@ -55,6 +55,17 @@ class OpenAIRealtimeAppConf(YamlConfig, RealtimeAppConfig):
         description="basic session settings, if None, use openai default session",
     )
     session_created_timeout: int = Field(10, description="session created timeout")
+    ghostos_event_interval: float = Field(
+        default=1.0,
+        description="the longest interval in seconds to check the ghostos events of the conversation "
+                    "while the realtime app is idle. server events and operators wake the app immediately.",
+    )
+    audio_save_format: str = Field(
+        default="wav",
+        description="the format to save the conversation audio items, wav, flac or ogg. "
+                    "the compressed formats require the `soundfile` package",
+        json_schema_extra=dict(enum={"wav", "flac", "ogg"}),
+    )
 
     def get_session_obj(self, vad_mode: bool) -> SessionObject:
         """
@@ -3,7 +3,7 @@ from __future__ import annotations
 import base64
 
 from pydantic import BaseModel, Field
-from typing import Optional, List, Union, Dict
+from typing import Optional, List, Union, Dict, Iterable
 from typing_extensions import Literal
 from io import BytesIO
 from ghostos.core.messages import (
@@ -157,11 +157,17 @@ class MessageItem(BaseModel):
 
     def get_audio_bytes(self) -> bytes:
         buffer = BytesIO()
+        for data in self.iter_audio_bytes():
+            buffer.write(data)
+        return buffer.getvalue()
+
+    def iter_audio_bytes(self) -> Iterable[bytes]:
+        """
+        decode the audio contents one by one, without joining them in memory.
+        """
         for c in self.content:
             if c.audio:
-                data = base64.b64decode(c.audio)
-                buffer.write(data)
-        return buffer.getvalue()
+                yield base64.b64decode(c.audio)
 
     def to_message_head(self) -> Message:
 
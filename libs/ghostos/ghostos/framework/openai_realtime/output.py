@@ -1,7 +1,7 @@
-import time
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Iterable, Callable, Set
 from queue import Queue
+from threading import Condition
 from ghostos.contracts.logger import LoggerItf
 from ghostos.core.messages import Message, ReceiverBuffer, SequencePipe
 
@@ -107,6 +107,22 @@ class OutputBuffer(ABC):
         """
         pass
 
+    @abstractmethod
+    def wait_response(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        block until a response is started, the buffer is closed or timeout.
+        :param timeout: None means wait forever
+        :return: the current response id
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        stop the output and wake up all the waiting threads.
+        """
+        pass
+
 
 class DefaultOutputBuffer(OutputBuffer):
 
@@ -138,6 +154,27 @@ class DefaultOutputBuffer(OutputBuffer):
         self.unsent_message_ids: List[str] = []
         self.sent_message_ids: Set[str] = set()
 
+        self._changed = Condition()
+        """notified when the response or its chunks changed"""
+        self._closed: bool = False
+
+    def _notify_changed(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _is_closed(self) -> bool:
+        return self._closed or self.is_close_check()
+
+    def close(self) -> None:
+        self._closed = True
+        self.stop_output(None)
+        self._notify_changed()
+
+    def wait_response(self, timeout: Optional[float] = None) -> Optional[str]:
+        with self._changed:
+            self._changed.wait_for(lambda: self.response_id is not None or self._is_closed(), timeout)
+        return self.response_id
+
     def stop_output(self, response_id: Optional[str]):
         self.logger.debug("start output")
         if response_id is None or response_id == self.response_id:
@@ -146,6 +183,7 @@ class DefaultOutputBuffer(OutputBuffer):
             self.response_item_ids = None
             self.responding_item_id = None
             self.stop_speaking()
+            self._notify_changed()
 
     def end_output(self, response_id: str):
         # self.response_id = None
@@ -164,6 +202,7 @@ class DefaultOutputBuffer(OutputBuffer):
         self.response_item_ids = []
         self.responding_item_id = None
         self.start_speaking()
+        self._notify_changed()
 
     def start_speaking(self):
         self._is_speaking = True
@@ -212,6 +251,7 @@ class DefaultOutputBuffer(OutputBuffer):
                 outputted_message_ids.append(current_message_id)
             self.outputted_message_ids = outputted_message_ids
 
+        self._notify_changed()
         return True
 
     def add_response_chunk(self, response_id: str, chunk: Message) -> bool:
@@ -230,6 +270,7 @@ class DefaultOutputBuffer(OutputBuffer):
             self.response_item_ids.append(self.responding_item_id)
         chunks = self.response_chunks[self.responding_item_id]
         chunks.append(chunk)
+        self._notify_changed()
         return True
 
     def get_outputted_messages(self) -> List[Message]:
@@ -294,12 +335,10 @@ class DefaultOutputBuffer(OutputBuffer):
         if not output_item_id or output_item_id in self.sent_message_ids:
             return None
 
-        while not self.is_close_check():
+        while not self._is_closed():
             if response_id != self.response_id or self.response_chunks is None:
                 # stream canceled
                 break
-            if self.response_chunks is None:
-                break
             if output_item_id in self.outputted_messages:
                 break
 
@@ -309,7 +348,16 @@ class DefaultOutputBuffer(OutputBuffer):
                 first = chunks.pop(0)
                 yield first
             else:
-                time.sleep(0.1)
+                # wait for the next chunk instead of polling.
+                with self._changed:
+                    self._changed.wait_for(
+                        lambda: len(chunks) > 0
+                                or response_id != self.response_id
+                                or output_item_id in self.outputted_messages
+                                or self._is_closed(),
+                        # the close check of the app is not notified.
+                        timeout=1.0,
+                    )
 
         if output_item_id in self.outputted_messages:
             yield self.outputted_messages[output_item_id]
@@ -89,10 +89,12 @@ class OpenAIWSConnection:
             self.close()
 
     def recv(self, timeout: Union[float, None] = None, timeout_error: bool = False) -> Union[dict, None]:
-        if self._closed:
+        ws = self._ws
+        if self._closed or ws is None:
             return None
         try:
-            data = self._ws.recv(timeout=timeout)
+            # block until the server sends an event if timeout is None.
+            data = ws.recv(timeout=timeout)
             if not data:
                 self._logger.error(f"[OpenAIWSConnection] receive empty data: {data}")
                 return None
@@ -1,3 +1,4 @@
 from ghostos.contracts.storage import Storage, FileStorage
 from ghostos.framework.storage.filestorage import FileStorageProvider, FileStorageImpl
+from ghostos.framework.storage.sharded import ShardedFileStorage, sharded_storage
 from ghostos.framework.storage.memstorage import MemStorage
@@ -1,8 +1,9 @@
 import os
 import re
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Dict, List, Set
 from ghostos_container import Provider, Container, ABSTRACT
 from ghostos.contracts.storage import Storage, FileStorage
+from ghostos_common.helpers import uuid
 
 __all__ = ["FileStorageProvider", "FileStorageImpl"]
 
@@ -10,11 +11,16 @@ __all__ = ["FileStorageProvider", "FileStorageImpl"]
 class FileStorageImpl(FileStorage):
     """
     FileStorage implementation based on python filesystem.
-    Simplest implementation.
+    the files are written to a temp file and replaced atomically, so the readers never see half-written files.
     """
 
-    def __init__(self, dir_: str):
+    def __init__(self, dir_: str, fsync: bool = False):
+        """
+        :param dir_: the root directory
+        :param fsync: sync the written files to the disk before replacing, put_many syncs each directory once.
+        """
         self._dir: str = os.path.abspath(dir_)
+        self._fsync = fsync
 
     def abspath(self) -> str:
         return self._dir
@@ -24,6 +30,15 @@ class FileStorageImpl(FileStorage):
         with open(file_path, 'rb') as f:
             return f.read()
 
+    def get_many(self, file_paths: Iterable[str]) -> Dict[str, bytes]:
+        result = {}
+        for file_path in file_paths:
+            try:
+                result[file_path] = self.get(file_path)
+            except FileNotFoundError:
+                continue
+        return result
+
     def remove(self, file_path: str) -> None:
         file_path = self._join_file_path(file_path)
         os.remove(file_path)
@@ -35,48 +50,105 @@ class FileStorageImpl(FileStorage):
     def _join_file_path(self, path: str) -> str:
         file_path = os.path.join(self._dir, path)
         file_path = os.path.abspath(file_path)
-        if not file_path.startswith(self._dir):
+        if file_path != self._dir and not file_path.startswith(self._dir + os.path.sep):
             raise FileNotFoundError(f"file path {path} is not allowed")
         return file_path
 
     def put(self, file_path: str, content: bytes) -> None:
         file_path = self._join_file_path(file_path)
-        if not file_path.startswith(self._dir):
-            raise FileNotFoundError(f"file path {file_path} is not allowed")
+        self._write(file_path, content, self._fsync)
+        if self._fsync:
+            self._sync_dir(os.path.dirname(file_path))
+
+    def put_many(self, contents: Dict[str, bytes]) -> None:
+        dirs: Set[str] = set()
+        for file_path, content in contents.items():
+            file_path = self._join_file_path(file_path)
+            self._write(file_path, content, self._fsync)
+            dirs.add(os.path.dirname(file_path))
+        if self._fsync:
+            for file_dir in dirs:
+                self._sync_dir(file_dir)
+
+    @staticmethod
+    def _write(file_path: str, content: bytes, fsync: bool) -> None:
         file_dir = os.path.dirname(file_path)
-        if not os.path.exists(file_dir):
-            os.makedirs(file_dir)
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        tmp_path = os.path.join(file_dir, f".{os.path.basename(file_path)}.{uuid()}.tmp")
+        try:
+            f = open(tmp_path, 'wb')
+        except FileNotFoundError:
+            os.makedirs(file_dir, exist_ok=True)
+            f = open(tmp_path, 'wb')
+        try:
+            with f:
+                f.write(content)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _sync_dir(file_dir: str) -> None:
+        # the directory entry of the replaced file is durable only after the directory is synced.
+        try:
+            fd = os.open(file_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
     def sub_storage(self, relative_path: str) -> "FileStorage":
         if not relative_path:
             return self
         dir_path = self._join_file_path(relative_path)
-        return FileStorageImpl(dir_path)
+        return FileStorageImpl(dir_path, self._fsync)
 
     def dir(self, prefix_dir: str, recursive: bool, patten: Optional[str] = None) -> Iterable[str]:
         dir_path = self._join_file_path(prefix_dir)
-        for root, ds, fs in os.walk(dir_path):
-            # 遍历单层的文件名.
-            for file_name in fs:
-                if self._match_file_pattern(file_name, patten):
-                    relative_path = file_name.lstrip(dir_path)
-                    yield relative_path.lstrip(os.path.sep)
-
-            # 深入遍历目录.
-            if recursive and ds:
-                for _dir in ds:
-                    sub_dir_iterator = self.dir(_dir, recursive, patten)
-                    for file_name in sub_dir_iterator:
-                        yield file_name
+        pattern = re.compile(patten) if patten is not None else None
+        yield from self._scan(dir_path, "", recursive, pattern)
+
+    def _scan(self, dir_path: str, relative: str, recursive: bool, pattern: Optional[re.Pattern]) -> Iterable[str]:
+        """
+        stream the files of the directory by scandir, without listing the whole tree first.
+        """
+        sub_dirs: List[str] = []
+        try:
+            iterator = os.scandir(dir_path)
+        except FileNotFoundError:
+            return
+        with iterator:
+            for entry in iterator:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and self._is_scanned_dir(entry.name):
+                        sub_dirs.append(entry.name)
+                elif self._is_listed(entry.name, pattern):
+                    yield os.path.join(relative, entry.name) if relative else entry.name
+        for name in sub_dirs:
+            yield from self._scan(
+                os.path.join(dir_path, name),
+                os.path.join(relative, name) if relative else name,
+                recursive,
+                pattern,
+            )
+
+    def _is_scanned_dir(self, dirname: str) -> bool:
+        return True
 
     @staticmethod
-    def _match_file_pattern(filename: str, pattern: Optional[str]) -> bool:
-        if pattern is None:
-            return True
-        r = re.search(pattern, filename)
-        return r is not None
+    def _is_listed(filename: str, pattern: Optional[re.Pattern]) -> bool:
+        # the temp files of the writes in progress are not listed.
+        if filename.startswith(".") and filename.endswith(".tmp"):
+            return False
+        return pattern is None or pattern.search(filename) is not None
 
 
 class FileStorageProvider(Provider[FileStorage]):
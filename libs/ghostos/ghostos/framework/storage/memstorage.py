@@ -10,7 +10,7 @@ class MemStorage(FileStorage):
 
     def __init__(self, saved: Dict[str, bytes] = None, namespace: str = ""):
         self._namespace = namespace
-        self._saved: Dict[str, bytes] = saved if saved else {}
+        self._saved: Dict[str, bytes] = saved if saved is not None else {}
 
     def abspath(self) -> str:
         return "/test/mem/"
@@ -0,0 +1,102 @@
+import os
+import re
+import hashlib
+from typing import Optional, Iterable, Dict
+
+from ghostos.contracts.storage import Storage, FileStorage
+from ghostos.framework.storage.filestorage import FileStorageImpl
+
+__all__ = ["ShardedFileStorage", "sharded_storage"]
+
+
+class ShardedFileStorage(FileStorageImpl):
+    """
+    FileStorage that spreads the files of a directory into hash-sharded subdirectories,
+    `foo/bar.yml` is saved as `foo/.shards/ab/cd/bar.yml`, so no directory grows to millions of entries.
+    the paths of the interface are not changed, and the files saved before sharding are still readable,
+    they are moved into the shards when they are saved again.
+    """
+
+    shard_dirname = ".shards"
+
+    def __init__(self, dir_: str, depth: int = 2, fsync: bool = False):
+        """
+        :param dir_: the root directory
+        :param depth: levels of the shard directories, each level has 256 directories.
+        :param fsync: same as FileStorageImpl
+        """
+        super().__init__(dir_, fsync)
+        self._depth = depth
+
+    def _shard_path(self, file_path: str) -> str:
+        dirname, basename = os.path.split(file_path)
+        digest = hashlib.md5(basename.encode("utf-8")).hexdigest()
+        parts = [digest[i * 2:i * 2 + 2] for i in range(self._depth)]
+        return os.path.join(dirname, self.shard_dirname, *parts, basename)
+
+    def get(self, file_path: str) -> bytes:
+        try:
+            return super().get(self._shard_path(file_path))
+        except FileNotFoundError:
+            return super().get(file_path)
+
+    def exists(self, file_path: str) -> bool:
+        return super().exists(self._shard_path(file_path)) or super().exists(file_path)
+
+    def remove(self, file_path: str) -> None:
+        try:
+            super().remove(self._shard_path(file_path))
+        except FileNotFoundError:
+            super().remove(file_path)
+
+    def put(self, file_path: str, content: bytes) -> None:
+        super().put(self._shard_path(file_path), content)
+        self._remove_unsharded(file_path)
+
+    def put_many(self, contents: Dict[str, bytes]) -> None:
+        super().put_many({self._shard_path(file_path): content for file_path, content in contents.items()})
+        for file_path in contents:
+            self._remove_unsharded(file_path)
+
+    def _remove_unsharded(self, file_path: str) -> None:
+        try:
+            super().remove(file_path)
+        except (FileNotFoundError, IsADirectoryError):
+            pass
+
+    def sub_storage(self, relative_path: str) -> "FileStorage":
+        if not relative_path:
+            return self
+        dir_path = self._join_file_path(relative_path)
+        return ShardedFileStorage(dir_path, self._depth, self._fsync)
+
+    def _scan(self, dir_path: str, relative: str, recursive: bool, pattern: Optional[re.Pattern]) -> Iterable[str]:
+        # the sharded files are listed as the files of the directory.
+        shards_path = os.path.join(dir_path, self.shard_dirname)
+        yield from self._scan_shards(shards_path, relative, self._depth, pattern)
+        yield from super()._scan(dir_path, relative, recursive, pattern)
+
+    def _is_scanned_dir(self, dirname: str) -> bool:
+        return dirname != self.shard_dirname
+
+    def _scan_shards(self, shard_path: str, relative: str, depth: int, pattern: Optional[re.Pattern]) -> Iterable[str]:
+        try:
+            iterator = os.scandir(shard_path)
+        except FileNotFoundError:
+            return
+        with iterator:
+            for entry in iterator:
+                if depth > 0:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self._scan_shards(entry.path, relative, depth - 1, pattern)
+                elif entry.is_file(follow_symlinks=False) and self._is_listed(entry.name, pattern):
+                    yield os.path.join(relative, entry.name) if relative else entry.name
+
+
+def sharded_storage(storage: Storage, depth: int = 2) -> Storage:
+    """
+    shard the storage if it is a FileStorageImpl, other storages are returned as they are.
+    """
+    if isinstance(storage, FileStorageImpl) and not isinstance(storage, ShardedFileStorage):
+        return ShardedFileStorage(storage.abspath(), depth, storage._fsync)
+    return storage
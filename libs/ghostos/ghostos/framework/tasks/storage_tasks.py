@@ -5,6 +5,7 @@ from ghostos.core.runtime import TaskState, TaskBrief, GoTaskStruct, GoTasks
 from ghostos.contracts.workspace import Workspace
 from ghostos.contracts.logger import LoggerItf
 from ghostos.contracts.storage import Storage
+from ghostos.framework.storage import sharded_storage
 from ghostos_container import Provider, Container
 from ghostos.core.runtime.tasks import TaskLocker
 from ghostos_common.helpers import uuid, timestamp
@@ -83,12 +84,14 @@ class StorageGoTasksImpl(GoTasks):
         self._logger = logger
 
     def save_task(self, *tasks: GoTaskStruct) -> None:
+        contents = {}
         for task in tasks:
             filename = self._get_task_filename(task.task_id)
             data = task.model_dump(exclude_defaults=True)
             content = yaml.safe_dump(data)
             task.updated = timestamp()
-            self._storage.put(filename, content.encode('utf-8'))
+            contents[filename] = content.encode('utf-8')
+        self._storage.put_many(contents)
 
     @staticmethod
     def _get_task_filename(task_id: str) -> str:
@@ -161,6 +164,6 @@ class WorkspaceTasksProvider(Provider[GoTasks]):
     def factory(self, con: Container) -> Optional[GoTasks]:
         workspace = con.force_fetch(Workspace)
         runtime_storage = workspace.runtime()
-        tasks_storage = runtime_storage.sub_storage(self.namespace)
+        tasks_storage = sharded_storage(runtime_storage.sub_storage(self.namespace))
         logger = con.force_fetch(LoggerItf)
         return StorageGoTasksImpl(tasks_storage, logger)
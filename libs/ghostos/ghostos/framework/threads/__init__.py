@@ -1,2 +1,3 @@
 from ghostos.core.runtime import GoThreads, GoThreadInfo
 from ghostos.framework.threads.storage_threads import MsgThreadRepoByStorageProvider, MsgThreadsRepoByWorkSpaceProvider
+from ghostos.framework.threads.thread_recall import ThreadRecall, ThreadRecallPipe, ThreadRecallProvider
@@ -0,0 +1,136 @@
+import json
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Iterable
+
+from ghostos.contracts.storage import Storage
+
+__all__ = ['PyContextBlobs']
+
+
+class PyContextBlobs:
+    """
+    content-addressed store of the large fields of the pycontexts in the saved threads.
+    every turn of a MOSS thread carries the same module code and properties, so the field is saved once as a blob
+    keyed by its hash, and the turns in the thread file only keep the key.
+    the blobs are immutable and never removed, since they may be referenced by any thread.
+    """
+
+    fields = ("code", "execute_code")
+    """the pycontext text fields saved as blobs"""
+
+    json_fields = ("properties",)
+    """the pycontext fields saved as blobs of their json"""
+
+    ref_suffix = "_blob"
+    """the field `code` is saved as the key `code_blob` in the thread file"""
+
+    def __init__(self, storage: Storage, min_size: int = 256, cache_size: int = 128, saved_size: int = 4096):
+        """
+        :param storage: the storage of the blobs
+        :param min_size: the shorter texts are kept inline
+        :param cache_size: count of the blobs cached in memory for loading
+        :param saved_size: count of the keys remembered as saved, the others are checked in the storage
+        """
+        self._storage = storage
+        self._min_size = min_size
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._saved_size = saved_size
+        self._saved: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _filename(key: str) -> str:
+        return key + ".blob"
+
+    def put(self, content: str) -> str:
+        """
+        save the content if it is not saved yet.
+        :return: the key of the content
+        """
+        data = content.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if key in self._saved:
+                self._saved.move_to_end(key)
+                return key
+        filename = self._filename(key)
+        if not self._storage.exists(filename):
+            self._storage.put(filename, data)
+        with self._lock:
+            self._mark_saved(key)
+            self._remember(key, content)
+        return key
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            content = self._cache.get(key, None)
+            if content is not None:
+                self._cache.move_to_end(key)
+                return content
+        content = self._storage.get(self._filename(key)).decode("utf-8")
+        with self._lock:
+            self._mark_saved(key)
+            self._remember(key, content)
+        return content
+
+    def _mark_saved(self, key: str) -> None:
+        self._saved[key] = None
+        self._saved.move_to_end(key)
+        while len(self._saved) > self._saved_size:
+            self._saved.popitem(last=False)
+
+    def _remember(self, key: str, content: str) -> None:
+        self._cache[key] = content
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def dehydrate(self, pycontext: Optional[Dict]) -> None:
+        """
+        replace the large fields of the dumped pycontext with the keys of their blobs, in place.
+        """
+        if not pycontext:
+            return
+        for field in self.fields:
+            value = pycontext.get(field, None)
+            if isinstance(value, str) and len(value) >= self._min_size:
+                pycontext[field + self.ref_suffix] = self.put(value)
+                del pycontext[field]
+        for field in self.json_fields:
+            value = pycontext.get(field, None)
+            if not value:
+                continue
+            content = json.dumps(value, sort_keys=True, ensure_ascii=False)
+            if len(content) >= self._min_size:
+                pycontext[field + self.ref_suffix] = self.put(content)
+                del pycontext[field]
+
+    def rehydrate(self, pycontext: Optional[Dict]) -> None:
+        """
+        replace the keys of the blobs in the dumped pycontext with their contents, in place.
+        """
+        if not pycontext:
+            return
+        for field in self.fields:
+            ref = field + self.ref_suffix
+            key = pycontext.pop(ref, None)
+            if key is not None:
+                pycontext[field] = self.get(key)
+        for field in self.json_fields:
+            key = pycontext.pop(field + self.ref_suffix, None)
+            if key is not None:
+                pycontext[field] = json.loads(self.get(key))
+
+    @staticmethod
+    def iter_pycontexts(thread_data: Dict) -> Iterable[Dict]:
+        """
+        iterate the pycontexts of the turns in the dumped thread data.
+        """
+        turns = [thread_data.get("on_created", None), thread_data.get("current", None)]
+        turns.extend(thread_data.get("history", None) or [])
+        for turn in turns:
+            if turn and turn.get("pycontext", None):
+                yield turn["pycontext"]
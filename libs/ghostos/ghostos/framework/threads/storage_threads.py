@@ -2,7 +2,10 @@ from typing import Optional, Type
 from ghostos.core.runtime import GoThreadInfo, GoThreads, ThreadHistory
 from ghostos.contracts.workspace import Workspace
 from ghostos.contracts.storage import Storage
+from ghostos.framework.storage import sharded_storage
 from ghostos.contracts.logger import LoggerItf
+from ghostos.framework.threads.thread_recall import ThreadRecall
+from ghostos.framework.threads.pycontext_blobs import PyContextBlobs
 from ghostos_common.helpers import yaml_pretty_dump
 from ghostos_container import Provider, Container
 import yaml
@@ -17,11 +20,22 @@ class GoThreadsByStorage(GoThreads):
             self, *,
             storage: Storage,
             logger: LoggerItf,
-            allow_saving_file: bool = True
+            allow_saving_file: bool = True,
+            recall: Optional[ThreadRecall] = None,
+            blobs_dir: Optional[str] = "pycontext_blobs",
     ):
+        """
+        :param storage: the storage of the thread files
+        :param logger: the logger
+        :param allow_saving_file:
+        :param recall: index the saved threads that are recalled
+        :param blobs_dir: the pycontext code is saved once in the blobs directory of the storage, None means inline.
+        """
         self._storage = storage
         self._logger = logger
         self._allow_saving_file = allow_saving_file
+        self._recall = recall
+        self._blobs = PyContextBlobs(storage.sub_storage(blobs_dir)) if blobs_dir else None
 
     def get_thread(self, thread_id: str, create: bool = False) -> Optional[GoThreadInfo]:
         path = self._get_thread_filename(thread_id)
@@ -33,15 +47,28 @@ class GoThreadsByStorage(GoThreads):
             return None
         content = self._storage.get(path)
         data = yaml.safe_load(content)
+        if self._blobs is not None:
+            for pycontext in self._blobs.iter_pycontexts(data):
+                self._blobs.rehydrate(pycontext)
         thread = GoThreadInfo(**data)
         return thread
 
     def save_thread(self, thread: GoThreadInfo) -> None:
         data = thread.model_dump(exclude_defaults=True)
+        if self._blobs is not None:
+            for pycontext in self._blobs.iter_pycontexts(data):
+                self._blobs.dehydrate(pycontext)
         data_content = yaml_pretty_dump(data)
         path = self._get_thread_filename(thread.id)
         saving = data_content.encode('utf-8')
         self._storage.put(path, saving)
+        if self._recall is not None:
+            try:
+                # only the threads recalled by their ghosts are indexed, the others are indexed on the first recall.
+                self._recall.index_thread(thread, opened_only=True)
+            except Exception as e:
+                # recall is an optimization of the prompt, never fail the saving.
+                self._logger.error(f"failed to index thread {thread.id} for recall: {e}")
 
     @staticmethod
     def _get_thread_filename(thread_id: str) -> str:
@@ -68,7 +95,8 @@ class MsgThreadRepoByStorageProvider(Provider[GoThreads]):
         storage = con.force_fetch(Storage)
         threads_storage = storage.sub_storage(self._threads_dir)
         logger = con.force_fetch(LoggerItf)
-        return GoThreadsByStorage(storage=threads_storage, logger=logger)
+        recall = con.get(ThreadRecall)
+        return GoThreadsByStorage(storage=threads_storage, logger=logger, recall=recall)
 
 
 class MsgThreadsRepoByWorkSpaceProvider(Provider[GoThreads]):
@@ -85,5 +113,6 @@ class MsgThreadsRepoByWorkSpaceProvider(Provider[GoThreads]):
     def factory(self, con: Container) -> Optional[GoThreads]:
         workspace = con.force_fetch(Workspace)
         logger = con.force_fetch(LoggerItf)
-        threads_storage = workspace.runtime().sub_storage(self._namespace)
-        return GoThreadsByStorage(storage=threads_storage, logger=logger)
+        threads_storage = sharded_storage(workspace.runtime().sub_storage(self._namespace))
+        recall = con.get(ThreadRecall)
+        return GoThreadsByStorage(storage=threads_storage, logger=logger, recall=recall)
@@ -0,0 +1,244 @@
+from typing import Optional, List, Set, Type, Iterable
+from threading import Lock
+from collections import OrderedDict
+
+from ghostos.core.runtime import GoThreadInfo, Turn
+from ghostos.core.messages import Message, Role, copy_messages
+from ghostos.core.llms import Prompt, PromptPipe
+from ghostos.core.models.embedding import Embeddings, VectorIndex
+from ghostos_container import Provider, Container
+
+__all__ = ['ThreadRecall', 'ThreadRecallPipe', 'ThreadRecallProvider']
+
+
+class _ThreadIndex:
+    """
+    the opened vector index of a thread, with the ids of its indexed turns.
+    """
+
+    def __init__(self, index: VectorIndex):
+        self.index = index
+        self.indexed: Set[str] = set(index.keys())
+        self.lock = Lock()
+        self.released = False
+
+
+class ThreadRecall:
+    """
+    semantic recall over the history turns of threads.
+    each thread has its own vector index, the history turns are indexed once,
+    so recalling is one vector search no matter how long the thread is.
+    the indexes of the recently recalled threads are kept open, the least recently used are released.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str = "", max_text_size: int = 2000, max_threads: int = 64):
+        """
+        :param embeddings: the embeddings to embed and index the turns
+        :param model: the embedding driver name, default driver if empty
+        :param max_text_size: the turn text longer than this is truncated before embedding.
+        :param max_threads: max count of the opened thread indexes
+        """
+        self._embeddings = embeddings
+        self._model = model
+        self._max_text_size = max_text_size
+        self._max_threads = max_threads
+        self._threads: "OrderedDict[str, _ThreadIndex]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _index_name(thread_id: str) -> str:
+        return "thread-" + thread_id
+
+    def _get_thread_index(self, thread_id: str, open_index: bool = True) -> Optional[_ThreadIndex]:
+        with self._lock:
+            opened = self._threads.get(thread_id, None)
+            if opened is not None:
+                self._threads.move_to_end(thread_id)
+                return opened
+            if not open_index:
+                return None
+            opened = _ThreadIndex(self._embeddings.get_index(self._index_name(thread_id), self._model))
+            self._threads[thread_id] = opened
+            while len(self._threads) > self._max_threads:
+                evicted_id, evicted = self._threads.popitem(last=False)
+                # wait for the adding to the evicted index, then it is saved and dropped.
+                with evicted.lock:
+                    evicted.released = True
+                    self._embeddings.release_index(self._index_name(evicted_id), self._model)
+            return opened
+
+    def opened(self, thread_id: str) -> bool:
+        """
+        the index of the thread is opened by recalling.
+        """
+        with self._lock:
+            return thread_id in self._threads
+
+    def turn_text(self, turn: Turn) -> str:
+        contents = []
+        for message in turn.messages(truncate=False):
+            content = message.get_content()
+            if content:
+                contents.append(content)
+        return "\n".join(contents)[:self._max_text_size]
+
+    def index_thread(self, thread: GoThreadInfo, opened_only: bool = False) -> int:
+        """
+        index the history turns of the thread that are not indexed yet.
+        the turns are embedded out of the locks, so the slow embedding models never block the other threads.
+        :param thread: the thread to index
+        :param opened_only: only index the thread if its index is opened by recalling.
+        :return: count of the newly indexed turns
+        """
+        opened = self._get_thread_index(thread.id, open_index=not opened_only)
+        if opened is None:
+            return 0
+        keys = []
+        texts = []
+        with opened.lock:
+            for turn in thread.history:
+                if turn.turn_id in opened.indexed:
+                    continue
+                text = self.turn_text(turn)
+                if not text:
+                    # nothing to recall, mark it so it is not checked again.
+                    opened.indexed.add(turn.turn_id)
+                    continue
+                keys.append(turn.turn_id)
+                texts.append(text)
+        if not keys:
+            return 0
+        vectors = self._embeddings.get_embeddings(texts, self._model)
+        with opened.lock:
+            if opened.released:
+                # the turns are indexed when the thread is recalled again.
+                return 0
+            # the same turns may be indexed by a concurrent call meanwhile.
+            rows = [i for i, key in enumerate(keys) if key not in opened.indexed]
+            if not rows:
+                return 0
+            adding = [keys[i] for i in rows]
+            opened.index.add(adding, vectors[rows])
+            opened.indexed.update(adding)
+            return len(adding)
+
+    def recall(
+            self,
+            thread: GoThreadInfo,
+            query: str,
+            top_k: int,
+            *,
+            candidates: Optional[Iterable[Turn]] = None,
+            threshold: float = 0.0,
+    ) -> List[Turn]:
+        """
+        recall the most relevant history turns of the thread.
+        :param thread: the thread, its new history turns are indexed first.
+        :param query: the text to search the turns
+        :param top_k: the max number of the recalled turns
+        :param candidates: only recall from these turns, default all the history turns
+        :param threshold: the min similarity of the recalled turns
+        :return: the recalled turns in the original order of the thread.
+        """
+        if not query or top_k <= 0:
+            return []
+        self.index_thread(thread)
+        if candidates is None:
+            candidates = thread.history
+        turns = {turn.turn_id: turn for turn in candidates}
+        if not turns:
+            return []
+        index = self._get_thread_index(thread.id).index
+        # the turns out of the candidates may occupy the top results, search enough of them.
+        search_k = top_k + max(0, len(index) - len(turns))
+        query_vector = self._embeddings.get_embedding(query, self._model)
+        selected = set()
+        for key, _ in index.search(query_vector, search_k, threshold):
+            if key in turns:
+                selected.add(key)
+                if len(selected) >= top_k:
+                    break
+        return [turn for turn in candidates if turn.turn_id in selected]
+
+
+class ThreadRecallPipe(PromptPipe):
+    """
+    replace the prompt history with the recent turns and the old turns that are relevant to the current inputs,
+    so the size of the prompt keeps flat while the thread grows.
+    """
+
+    recall_notice = "the following messages are recalled from the earlier history of the conversation:"
+    recent_notice = "the following messages are the recent history of the conversation:"
+
+    def __init__(
+            self,
+            thread: GoThreadInfo,
+            recall: ThreadRecall,
+            *,
+            top_k: int = 5,
+            recent_turns: int = 10,
+            threshold: float = 0.0,
+            stages: Optional[List[str]] = None,
+    ):
+        """
+        :param thread: the thread that the prompt is made from
+        :param recall: the thread recall
+        :param top_k: max number of the recalled old turns
+        :param recent_turns: number of the latest turns that are always kept
+        :param threshold: min similarity of the recalled turns
+        :param stages: the allowed stages of the history messages, default is [""]
+        """
+        self._thread = thread
+        self._recall = recall
+        self._top_k = top_k
+        self._recent_turns = recent_turns
+        self._threshold = threshold
+        self._stages = stages if stages is not None else [""]
+
+    def _query(self, prompt: Prompt, recent: List[Turn]) -> str:
+        contents = [message.get_content() for message in prompt.inputs]
+        query = "\n".join(content for content in contents if content)
+        if not query and recent:
+            query = self._recall.turn_text(recent[-1])
+        return query
+
+    def update_prompt(self, prompt: Prompt) -> Prompt:
+        turns = [turn for turn in self._thread.history if turn.approved]
+        if len(turns) <= self._recent_turns + self._top_k:
+            return prompt
+        split = len(turns) - self._recent_turns
+        older, recent = turns[:split], turns[split:]
+        recalled = self._recall.recall(
+            self._thread,
+            self._query(prompt, recent),
+            self._top_k,
+            candidates=older,
+            threshold=self._threshold,
+        )
+
+        history: List[Message] = list(self._thread.on_created.messages(False))
+        if recalled:
+            history.append(Role.SYSTEM.new(content=self.recall_notice))
+            for turn in recalled:
+                history.extend(turn.messages(False))
+            history.append(Role.SYSTEM.new(content=self.recent_notice))
+        for turn in recent:
+            history.extend(turn.messages(False))
+        prompt.history = copy_messages(history, self._stages)
+        return prompt
+
+
+class ThreadRecallProvider(Provider[ThreadRecall]):
+
+    def __init__(self, model: str = ""):
+        self._model = model
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[ThreadRecall]:
+        return ThreadRecall
+
+    def factory(self, con: Container) -> Optional[ThreadRecall]:
+        embeddings = con.force_fetch(Embeddings)
+        return ThreadRecall(embeddings, self._model)
@@ -152,9 +152,9 @@ class CharacterDriver(GhostDriver[Character]):
     def truncate(self, session: Session) -> GoThreadInfo:
         thread = session.thread
         if 0 < self.ghost.history_turns < len(thread.history):
-            thread.history[-self.ghost.history_turns].summary = ""
+            thread.own_turn(-self.ghost.history_turns).summary = ""
         elif self.ghost.history_turns == 0:
-            thread.history[-1].summary = ""
+            thread.own_turn(-1).summary = ""
 
         thread.history = thread.history[-self.ghost.history_turns:]
         return thread
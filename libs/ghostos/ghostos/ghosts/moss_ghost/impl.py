@@ -1,5 +1,6 @@
 import inspect
-from typing import Union, Optional, Dict, List, Iterable, Tuple, ClassVar, Type, Any
+from contextlib import contextmanager
+from typing import Union, Optional, Dict, List, Iterable, Iterator, Tuple, ClassVar, Type, Any
 
 from typing_extensions import Self
 from types import ModuleType
@@ -10,7 +11,7 @@ from ghostos_common.identifier import Identifier
 from pydantic import Field
 
 from ghostos_common.helpers import import_from_path
-from ghostos_common.prompter import TextPOM, PromptObjectModel
+from ghostos_common.prompter import TextPOM, LazyPOM, PromptObjectModel
 from ghostos_common.entity import ModelEntity
 from ghostos.abcd import (
     GhostDriver, Operator, Agent, Session, Action, Thought, Ghost, ActionThought, ChainOfThoughts,
@@ -24,6 +25,7 @@ from ghostos.core.llms import (
     PromptPipe, AssistantNamePipe, run_prompt_pipeline, ModelConf,
 )
 from ghostos.core.model_funcs import TruncateThreadByLLM
+from ghostos.framework.threads import ThreadRecall, ThreadRecallPipe
 from ghostos_container import Provider
 from ghostos_common.helpers import md5, yaml_pretty_dump, parse_import_path_module_and_attr_name
 
@@ -52,6 +54,11 @@ class MossGhost(ModelEntity, Agent):
     model: Optional[ModelConf] = Field(default=None, description="The model to use, instead of the llm_api")
 
     safe_mode: bool = Field(default=False, description="if safe mode, anything unsafe shall be approve first")
+    recall_turns: int = Field(
+        default=0,
+        description="if > 0, only the recent turns and the most relevant old turns of the thread are sent to the llm",
+    )
+    recent_turns: int = Field(default=10, description="the number of the recent turns kept when recall_turns > 0")
     id: Optional[str] = Field(default=None, description="the id of the agent")
 
     def __identifier__(self) -> Identifier:
@@ -176,6 +183,17 @@ providing llm connections, body shell, tools, memory etc and specially the `MOSS
         :param runtime:
         :return:
         """
+        # recall the relevant old turns before any pipe changes the inputs.
+        if self.agent.recall_turns > 0:
+            recall = session.container.get(ThreadRecall)
+            if recall is not None:
+                yield ThreadRecallPipe(
+                    session.thread,
+                    recall,
+                    top_k=self.agent.recall_turns,
+                    recent_turns=self.agent.recent_turns,
+                )
+
         # clear agent self name from messages.
         context = session.get_context()
         if context is not None:
@@ -286,15 +304,16 @@ providing llm connections, body shell, tools, memory etc and specially the `MOSS
         return
 
     def get_agent_identity(self, title: str, id_: Identifier) -> PromptObjectModel:
-        value = id_.model_dump(exclude_defaults=True, exclude={"id"})
-        return TextPOM(
-            title=title,
-            content=f"""
+        def identity() -> str:
+            value = id_.model_dump(exclude_defaults=True, exclude={"id"})
+            return f"""
 ```yaml
 {yaml_pretty_dump(value)}
 ```
 """
-        )
+
+        # the identity is static for the ghost, the yaml is dumped once.
+        return LazyPOM(title, identity).with_cache_key(f"agent_identity:{title}:{id_.model_dump_json()}")
 
     def make_system_instruction(self, session: Session, runtime: MossRuntime) -> str:
         """
@@ -331,15 +350,14 @@ providing llm connections, body shell, tools, memory etc and specially the `MOSS
         return compiler
 
     def get_system_instruction(self, session: Session) -> str:
-        compiler = self.get_moss_compiler(session)
-        with compiler:
-            rtm = compiler.compile(self.agent.module)
-            with rtm:
-                return self.make_system_instruction(session, rtm)
+        if self._moss_runtime is not None:
+            # called during the event, use the checked out runtime.
+            return self.make_system_instruction(session, self._moss_runtime)
+        with self._checkout_moss_runtime(session) as rtm:
+            return self.make_system_instruction(session, rtm)
 
     def on_event(self, session: Session, event: Event) -> Union[Operator, None]:
-        rtm = self.get_moss_runtime(session)
-        with rtm:
+        with self._checkout_moss_runtime(session) as rtm:
             # prepare instructions.
             op, ok = self.on_custom_event_handler(session, rtm, event)
             if ok:
@@ -359,10 +377,21 @@ providing llm connections, body shell, tools, memory etc and specially the `MOSS
             return session.mindflow().wait()
 
     def get_current_prompt(self, session: Session) -> Prompt:
-        rtm = self.get_moss_runtime(session)
-        with rtm:
+        with self._checkout_moss_runtime(session) as rtm:
             return self._get_current_prompt(session, rtm)
 
+    @contextmanager
+    def _checkout_moss_runtime(self, session: Session) -> Iterator[MossRuntime]:
+        """
+        the runtime is closed at the end, and its compiled module returns to the MossRuntimePool.
+        """
+        rtm = self.get_moss_runtime(session)
+        try:
+            with rtm:
+                yield rtm
+        finally:
+            self._moss_runtime = None
+
     def _get_current_prompt(self, session: Session, rtm: MossRuntime) -> Prompt:
         # prepare thread
         thread = session.thread
@@ -385,6 +414,9 @@ providing llm connections, body shell, tools, memory etc and specially the `MOSS
         return ""
 
     def get_moss_runtime(self, session: Session) -> MossRuntime:
+        """
+        the runtime of the current event, compiled from the MossRuntimePool if it is bound.
+        """
         if self._moss_runtime is None:
             compiler = self.get_moss_compiler(session)
             with compiler:
@@ -0,0 +1,3 @@
+from ghostos.libraries.codex.abcd import ModuleInfo, PyCodexGenerator, PyCodexCatalog
+from ghostos.libraries.codex.catalog_impl import PyCodexCatalogProvider
+from ghostos.libraries.codex.generator_impl import PyCodexGeneratorProvider
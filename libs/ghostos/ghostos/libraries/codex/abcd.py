@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, Field
 
@@ -24,3 +24,37 @@ class PyCodexGenerator(ABC):
     @abstractmethod
     def from_yaml(self, content: str) -> Dict[str, ModuleInfo]:
         pass
+
+
+class PyCodexCatalog(ABC):
+    """
+    persistent catalog of the module infos, the modules are inspected from their source files,
+    and only the changed files are inspected again.
+    """
+
+    @abstractmethod
+    def refresh(self, root_module: str, ignore_error: bool = False) -> Dict[str, ModuleInfo]:
+        """
+        update the module infos of the root module and all its submodules, without importing them.
+        :return: the module infos of the root module, same as PyCodexGenerator.generate
+        """
+        pass
+
+    @abstractmethod
+    def get(self, modulename: str) -> Optional[ModuleInfo]:
+        pass
+
+    @abstractmethod
+    def search(self, prefix: str, limit: int = 0) -> List[ModuleInfo]:
+        """
+        the cataloged modules whose names start with the prefix, sorted by name.
+        :param limit: max count of the results, 0 is unlimited
+        """
+        pass
+
+    @abstractmethod
+    def find(self, name: str) -> List[ModuleInfo]:
+        """
+        the cataloged modules whose last name part is the name, such as `abcd` for `ghostos.libraries.codex.abcd`.
+        """
+        pass
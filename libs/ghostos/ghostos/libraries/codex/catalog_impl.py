@@ -0,0 +1,219 @@
+import os
+import json
+import hashlib
+import importlib.util
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Iterable, Tuple, Type
+
+from pydantic import BaseModel, Field
+from ghostos_container import Provider, Container
+from ghostos.contracts.storage import Storage
+from ghostos.contracts.workspace import Workspace
+from ghostos.libraries.codex.abcd import PyCodexCatalog, ModuleInfo
+from ghostos.libraries.codex.utils import generate_module_info
+
+__all__ = ['PyCodexCatalogImpl', 'PyCodexCatalogProvider']
+
+
+class _Record(BaseModel):
+    """
+    the module info of a source file, with the stat and the hash of the file when it was inspected.
+    """
+    file: str
+    mtime_ns: int
+    size: int
+    sha1: str
+    info: Optional[ModuleInfo] = Field(default=None, description="None if the source file is empty")
+
+
+class _CatalogData(BaseModel):
+    version: int = 1
+    modules: Dict[str, _Record] = Field(default_factory=dict)
+
+
+class PyCodexCatalogImpl(PyCodexCatalog):
+    """
+    the catalog saved as a json file in the storage.
+    the source files are found by the import specs, so the modules are never imported,
+    a file is inspected again only if its mtime or size is changed and its content hash is changed too.
+    the names are indexed in a sorted list for the prefix search, and by their last part for find.
+    """
+
+    version = 1
+
+    def __init__(self, storage: Storage, filename: str = "codex_catalog.json"):
+        """
+        :param storage: the storage of the catalog file
+        :param filename: the catalog file name in the storage
+        """
+        self._storage = storage
+        self._filename = filename
+        self._records: Optional[Dict[str, _Record]] = None
+        self._names: List[str] = []
+        self._short_names: Dict[str, List[str]] = {}
+        self._indexed = False
+        self._lock = Lock()
+        self.inspected = 0
+        """count of the source files inspected by the catalog"""
+
+    def _load(self) -> Dict[str, _Record]:
+        if self._records is not None:
+            return self._records
+        records = {}
+        if self._storage.exists(self._filename):
+            try:
+                data = _CatalogData(**json.loads(self._storage.get(self._filename)))
+                if data.version == self.version:
+                    records = data.modules
+            except ValueError:
+                # a broken catalog is rebuilt.
+                records = {}
+        self._records = records
+        return records
+
+    def _save(self) -> None:
+        data = _CatalogData(version=self.version, modules=self._records)
+        self._storage.put(self._filename, data.model_dump_json(exclude_defaults=True).encode("utf-8"))
+
+    def refresh(self, root_module: str, ignore_error: bool = False) -> Dict[str, ModuleInfo]:
+        spec = importlib.util.find_spec(root_module)
+        if spec is None:
+            raise ModuleNotFoundError(f"module {root_module} not found")
+        with self._lock:
+            records = self._load()
+            changed = False
+            found: Dict[str, _Record] = {}
+            for modulename, filename, is_pack in _iter_source_files(root_module, spec):
+                record = records.get(modulename, None)
+                try:
+                    updated = self._inspect(modulename, filename, is_pack, record)
+                except Exception as e:
+                    if not ignore_error:
+                        raise RuntimeError(f"refresh codex catalog failed on {modulename}") from e
+                    continue
+                if updated is None:
+                    continue
+                if updated is not record:
+                    changed = True
+                found[modulename] = updated
+
+            # the removed modules of the root are dropped.
+            prefix = root_module + "."
+            for modulename in list(records.keys()):
+                if (modulename == root_module or modulename.startswith(prefix)) and modulename not in found:
+                    del records[modulename]
+                    changed = True
+            records.update(found)
+            if changed:
+                self._indexed = False
+                self._save()
+            return {name: record.info for name, record in found.items() if record.info is not None}
+
+    def _inspect(self, modulename: str, filename: str, is_pack: bool, record: Optional[_Record]) -> Optional[_Record]:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        if (
+                record is not None and record.file == filename
+                and record.mtime_ns == stat.st_mtime_ns and record.size == stat.st_size
+        ):
+            return record
+        with open(filename, "rb") as f:
+            content = f.read()
+        sha1 = hashlib.sha1(content).hexdigest()
+        if record is not None and record.file == filename and record.sha1 == sha1:
+            # touched but not changed.
+            return _Record(file=filename, mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha1=sha1, info=record.info)
+        self.inspected += 1
+        source = content.decode("utf-8")
+        info = generate_module_info(modulename, filename, source, is_pack)
+        return _Record(file=filename, mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha1=sha1, info=info)
+
+    def _index(self) -> Dict[str, _Record]:
+        records = self._load()
+        if not self._indexed:
+            self._names = sorted(name for name, record in records.items() if record.info is not None)
+            short_names: Dict[str, List[str]] = {}
+            for name in self._names:
+                short_names.setdefault(name.rsplit(".", 1)[-1], []).append(name)
+            self._short_names = short_names
+            self._indexed = True
+        return records
+
+    def get(self, modulename: str) -> Optional[ModuleInfo]:
+        with self._lock:
+            record = self._load().get(modulename, None)
+            return record.info if record is not None else None
+
+    def search(self, prefix: str, limit: int = 0) -> List[ModuleInfo]:
+        with self._lock:
+            records = self._index()
+            result = []
+            for i in range(bisect_left(self._names, prefix), len(self._names)):
+                name = self._names[i]
+                if not name.startswith(prefix) or (limit and len(result) >= limit):
+                    break
+                result.append(records[name].info)
+            return result
+
+    def find(self, name: str) -> List[ModuleInfo]:
+        with self._lock:
+            records = self._index()
+            return [records[modulename].info for modulename in self._short_names.get(name, [])]
+
+
+def _iter_source_files(modulename: str, spec) -> Iterable[Tuple[str, str, bool]]:
+    """
+    iterate (module name, source file, is package) of the module and its submodules,
+    like pkgutil.iter_modules, but the namespace packages are walked too.
+    """
+    locations = spec.submodule_search_locations
+    if locations is None:
+        if spec.origin and spec.origin.endswith(".py"):
+            yield modulename, spec.origin, False
+        return
+    if spec.origin and spec.origin.endswith(".py"):
+        yield modulename, spec.origin, True
+    for location in locations:
+        yield from _iter_package_dir(modulename, location)
+
+
+def _iter_package_dir(package: str, dir_path: str) -> Iterable[Tuple[str, str, bool]]:
+    try:
+        entries = sorted(os.scandir(dir_path), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        name = entry.name
+        if entry.is_dir():
+            if not name.isidentifier() or name == "__pycache__":
+                continue
+            modulename = f"{package}.{name}"
+            init_file = os.path.join(entry.path, "__init__.py")
+            # the directories without __init__ are namespace packages, only their submodules are cataloged.
+            if os.path.isfile(init_file):
+                yield modulename, init_file, True
+            yield from _iter_package_dir(modulename, entry.path)
+        elif name.endswith(".py") and name != "__init__.py" and name[:-3].isidentifier():
+            yield f"{package}.{name[:-3]}", entry.path, False
+
+
+class PyCodexCatalogProvider(Provider[PyCodexCatalog]):
+    """
+    the codex catalog saved in the runtime cache of the workspace.
+    """
+
+    def __init__(self, filename: str = "codex_catalog.json"):
+        self._filename = filename
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[PyCodexCatalog]:
+        return PyCodexCatalog
+
+    def factory(self, con: Container) -> Optional[PyCodexCatalog]:
+        workspace = con.force_fetch(Workspace)
+        return PyCodexCatalogImpl(workspace.runtime_cache(), self._filename)
@@ -1,6 +1,7 @@
-from typing import Dict
+from typing import Dict, Optional, Type
 
-from ghostos.libraries.codex.abcd import PyCodexGenerator, ModuleInfo
+from ghostos_container import Provider, Container
+from ghostos.libraries.codex.abcd import PyCodexGenerator, PyCodexCatalog, ModuleInfo
 from ghostos.libraries.codex.utils import recursive_generate_module_infos
 from ghostos_common.helpers import yaml_pretty_dump
 from ghostos.contracts.modules import Modules
@@ -9,10 +10,17 @@ import yaml
 
 class PyCodexGeneratorImpl(PyCodexGenerator):
 
-    def __init__(self, modules: Modules):
+    def __init__(self, modules: Modules, catalog: Optional[PyCodexCatalog] = None):
+        """
+        :param modules: imports the modules to inspect
+        :param catalog: if given, the module infos are refreshed from the catalog without importing the modules.
+        """
         self._modules = modules
+        self._catalog = catalog
 
     def generate(self, root_module: str, ignore_error: bool = False) -> Dict[str, ModuleInfo]:
+        if self._catalog is not None:
+            return self._catalog.refresh(root_module, ignore_error)
         root = self._modules.import_module(root_module)
         result = {}
         for info in recursive_generate_module_infos(self._modules, root, True, ignore_error):
@@ -34,6 +42,23 @@ class PyCodexGeneratorImpl(PyCodexGenerator):
         return module_infos
 
 
+class PyCodexGeneratorProvider(Provider[PyCodexGenerator]):
+    """
+    the codex generator refreshed from the PyCodexCatalog if it is bound.
+    """
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[PyCodexGenerator]:
+        return PyCodexGenerator
+
+    def factory(self, con: Container) -> Optional[PyCodexGenerator]:
+        modules = con.force_fetch(Modules)
+        catalog = con.get(PyCodexCatalog)
+        return PyCodexGeneratorImpl(modules, catalog)
+
+
 if __name__ == "__main__":
     from ghostos.contracts.modules import DefaultModules
 
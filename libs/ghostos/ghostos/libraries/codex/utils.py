@@ -25,7 +25,7 @@ def recursive_generate_module_infos(
         ignore_error: bool = False,
 ) -> Iterable[ModuleInfo]:
     try:
-        info = generate_module_info(root, is_pack)
+        info = generate_module_info(root.__name__, root.__file__, inspect.getsource(root), is_pack)
         if info:
             yield info
     except OSError:
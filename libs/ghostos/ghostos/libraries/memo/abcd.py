@@ -1,6 +1,6 @@
 from typing import Dict, Optional
 from abc import ABC, abstractmethod
-from contextlib import redirect_stdout
+from ghostos_common.helpers import redirect_stdout_local
 from ghostos_common.prompter import POM
 from io import StringIO
 
@@ -69,7 +69,7 @@ class Memo(POM, ABC):
 
         def printer(**kwargs):
             _buffer = StringIO()
-            with redirect_stdout(_buffer):
+            with redirect_stdout_local(_buffer):
                 eval(_code)
             return _buffer.getvalue()
 
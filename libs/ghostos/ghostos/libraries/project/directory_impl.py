@@ -1,4 +1,4 @@
-from typing import Dict, ClassVar, List, Union
+from typing import Dict, ClassVar, List, Union, Tuple, Iterable
 
 from typing_extensions import Self
 import pathlib
@@ -8,12 +8,13 @@ from ghostos.libraries.project.abcd import Directory, File, PyDevCtx
 from ghostos.libraries.project.dev_context import PyDevCtxData
 from ghostos.contracts.configs import YamlConfig
 from ghostos.core.messages import MessageType, Role
-from ghostos_common.helpers import generate_directory_tree, yaml_pretty_dump, get_module_fullname_from_path
+from ghostos_common.helpers import get_directory_index, yaml_pretty_dump, get_module_fullname_from_path
 from ghostos_common.helpers.files import DescriptionsGetter
 from ghostos_moss import moss_runtime_ctx
 from pydantic import Field
 from contextlib import contextmanager
 import time
+import os
 
 
 class DirectoryData(YamlConfig):
@@ -78,9 +79,10 @@ class DirectoryFileDescriptionGetter(DescriptionsGetter):
     def __init__(self, root: pathlib.Path):
         self.root = root
         self._cached = {}
+        self._data: Dict[pathlib.Path, DirectoryData] = {}
 
     def get(self, path: pathlib.Path, default: Union[str, None] = None) -> Union[str, None]:
-        real_path = self.root.joinpath(path).absolute()
+        real_path = path if path.is_absolute() else self.root.joinpath(path).absolute()
         if real_path in self._cached:
             return self._cached[real_path]
         value = self._get(real_path, default)
@@ -89,11 +91,32 @@ class DirectoryFileDescriptionGetter(DescriptionsGetter):
 
     def _get(self, path: pathlib.Path, default: Union[str, None] = None) -> Union[str, None]:
         if path.is_dir():
-            return DirectoryData.get_from(path).get_description()
+            return self._get_data(path).get_description()
         elif path.is_file():
-            return DirectoryData.get_from(path.parent).get_description(path.name)
+            return self._get_data(path.parent).get_description(path.name)
         return default
 
+    def _get_data(self, path: pathlib.Path) -> DirectoryData:
+        # the files of the same directory share one read.
+        data = self._data.get(path, None)
+        if data is None:
+            data = DirectoryData.get_from(path)
+            self._data[path] = data
+        return data
+
+    @staticmethod
+    def cache_token(dirs: Iterable[pathlib.Path]) -> Tuple[int, ...]:
+        """
+        the mtimes of the data files of the directories, changed when their descriptions may be changed.
+        """
+        token = []
+        for path in dirs:
+            try:
+                token.append(os.stat(path.joinpath(DirectoryData.relative_path)).st_mtime_ns)
+            except (FileNotFoundError, NotADirectoryError):
+                token.append(0)
+        return tuple(token)
+
 
 class FileImpl(File):
     allow_ext: ClassVar[List[str]] = [
@@ -372,14 +395,23 @@ all the available dev contexts from name (or path) to description are:
 
     def lists(self, *, prefix: str = "", recursion: int = 0, files: bool = True, dirs: bool = True) -> str:
         getter = DirectoryFileDescriptionGetter(self.path)
-        return generate_directory_tree(
-            self.path,
+        # the index is shared by the instances of the same directory, so the tree is not walked at each turn.
+        index = get_directory_index(self.path, self._ignores)
+        target = index.root.joinpath(prefix)
+
+        def cache_token(listed) -> Tuple[int, ...]:
+            # the descriptions are read from the data files of the listed directories.
+            described = [target]
+            described.extend(path for path, _, is_dir in listed if is_dir)
+            return getter.cache_token(described)
+
+        return index.tree(
             prefix=prefix,
             recursion=recursion,
             descriptions=getter,
-            ignores=self._ignores,
             files=files,
             dirs=dirs,
+            cache_token=cache_token,
         )
 
     def subdir(self, path: str) -> Self:
@@ -403,6 +435,7 @@ all the available dev contexts from name (or path) to description are:
         if real_subdir.exists():
             return False
         real_subdir.mkdir()
+        self._expire_index(real_subdir.parent)
         data = DirectoryData.get_from(real_subdir)
         data.set_description(desc=desc)
         if dev_ctx is not None:
@@ -416,6 +449,7 @@ all the available dev contexts from name (or path) to description are:
         if real_sub_path.exists():
             return False
         real_sub_path.touch()
+        self._expire_index(real_sub_path.parent)
         data = DirectoryData.get_from(real_sub_path.parent)
         data.set_description(desc=desc, key=real_sub_path.name)
         if dev_ctx is not None:
@@ -423,6 +457,10 @@ all the available dev contexts from name (or path) to description are:
             data.set_dev_context(ctx, name=real_sub_path.name)
         return True
 
+    def _expire_index(self, changed_dir: pathlib.Path) -> None:
+        index = get_directory_index(self.path, self._ignores)
+        index.expire(str(changed_dir.absolute().relative_to(self.path.absolute())))
+
     def focus(self, file_path: Union[str, None]) -> Union[File, None]:
         if file_path is None:
             self.data.editing = None
@@ -445,9 +483,11 @@ all the available dev contexts from name (or path) to description are:
 
     def save_dev_contexts(self):
         self.data.save_to(self.path)
+        self._expire_index(self.path)
 
     def save_data(self) -> None:
         self.data.save_to(self.path)
+        self._expire_index(self.path)
 
 
 if __name__ == "__main__":
@@ -1,2 +1,3 @@
 from ghostos.libraries.terminal.abcd import Terminal, TerminalContext
 from ghostos.libraries.terminal.terminal_impl import TerminalProvider
+from ghostos.libraries.terminal.shell import PersistentShell, ShellPool, ShellPoolProvider
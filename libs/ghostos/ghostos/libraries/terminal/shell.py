@@ -0,0 +1,325 @@
+import os
+import time
+import codecs
+import shlex
+import signal
+import selectors
+import subprocess
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Dict, Callable, Hashable, Type
+
+from ghostos_common.helpers import BoundedStringIO, uuid
+from ghostos_container import Container, BootstrapProvider
+from ghostos.contracts.shutdown import Shutdown
+from ghostos.libraries.terminal.abcd import Terminal
+
+__all__ = ['PersistentShell', 'ShellPool', 'ShellPoolProvider', 'OnOutput']
+
+OnOutput = Callable[[str, str], None]
+"""called with (stream name, text) while the command is running, the stream name is `stdout` or `stderr`"""
+
+_CHUNK_SIZE = 65536
+
+
+class PersistentShell:
+    """
+    a bash process kept alive between the commands, so the commands pay no startup cost
+    and the working directory and the environment variables are kept.
+
+    the stdout of the shell is a pty, so the programs flush their output line by line,
+    the stderr is a pipe, so the two streams are still apart.
+    each command is evaluated in the shell and framed by the random sentinel markers written after it.
+    the shell runs in its own process group, a command exceeding its timeout is killed with the whole group,
+    then the shell is restarted in the last working directory, the environment variables are lost.
+    """
+
+    def __init__(
+            self,
+            cwd: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None,
+            shell: str = "/bin/bash",
+            max_output: int = 100_000,
+    ):
+        """
+        :param cwd: the working directory to start, default the current one.
+        :param env: the environment variables, default the current ones.
+        :param shell: the bash executable
+        :param max_output: max characters of each stream kept in the result, the middle is truncated.
+        """
+        import pty
+        self._pty = pty
+        self.cwd = os.path.abspath(cwd) if cwd else os.getcwd()
+        self._env = dict(env) if env is not None else dict(os.environ)
+        # the programs shall not wait for a pager or draw for a real terminal.
+        self._env.update({"PAGER": "cat", "GIT_PAGER": "cat", "TERM": "dumb"})
+        self._shell = shell
+        self._max_output = max_output
+        self._mark = f"__ghostos_{uuid().replace('-', '')}__"
+        self._process: Optional[subprocess.Popen] = None
+        self._stdout_fd = -1
+        self._stderr_fd = -1
+        self._lock = Lock()
+        self._closed = False
+        self.commands = 0
+        """count of the commands run by the shell"""
+
+    def _start(self) -> None:
+        import termios
+        master, slave = self._pty.openpty()
+        # keep `\n` as it is, the pty translates it to `\r\n` by default.
+        attrs = termios.tcgetattr(slave)
+        attrs[1] &= ~termios.ONLCR
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        stderr_r, stderr_w = os.pipe()
+        try:
+            self._process = subprocess.Popen(
+                [self._shell, "--noprofile", "--norc"],
+                stdin=subprocess.PIPE,
+                stdout=slave,
+                stderr=stderr_w,
+                cwd=self.cwd,
+                env=self._env,
+                start_new_session=True,
+            )
+        except BaseException:
+            os.close(master)
+            os.close(stderr_r)
+            raise
+        finally:
+            os.close(slave)
+            os.close(stderr_w)
+        self._stdout_fd = master
+        self._stderr_fd = stderr_r
+
+    def alive(self) -> bool:
+        """
+        the bash process is running. the shell not started yet or killed is started at the next command.
+        """
+        return self._process is not None and self._process.poll() is None
+
+    def closed(self) -> bool:
+        return self._closed
+
+    def run(self, command: str, timeout: float = 10.0, on_output: Optional[OnOutput] = None) -> Terminal.CommandResult:
+        """
+        run the command in the shell and wait for it.
+        :param command: the command lines, evaluated in the shell, so `cd` and `export` are kept.
+        :param timeout: seconds to wait, then the command is killed.
+        :param on_output: streaming the output while the command is running.
+        :exception TimeoutError: the command exceeds the timeout, and the shell is restarted.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Shell is closed")
+            if not self.alive():
+                self._stop()
+                self._start()
+            self.commands += 1
+            # the command reads no input from the shell, which is the stream of the commands.
+            script = (
+                f"eval {shlex.quote(command)} < /dev/null\n"
+                f"__ghostos_rc=$?; printf '\\n%s %d %s\\n' '{self._mark}' \"$__ghostos_rc\" \"$PWD\"; "
+                f"printf '\\n%s\\n' '{self._mark}' >&2\n"
+            )
+            self._process.stdin.write(script.encode("utf-8"))
+            self._process.stdin.flush()
+            return self._wait(timeout, on_output)
+
+    def _wait(self, timeout: float, on_output: Optional[OnOutput]) -> Terminal.CommandResult:
+        deadline = time.monotonic() + timeout
+        streams = {
+            self._stdout_fd: _Frame("stdout", f"\n{self._mark}", self._max_output, on_output),
+            self._stderr_fd: _Frame("stderr", f"\n{self._mark}", self._max_output, on_output),
+        }
+        with selectors.DefaultSelector() as selector:
+            for fd in streams:
+                selector.register(fd, selectors.EVENT_READ)
+            while not all(frame.done for frame in streams.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._kill()
+                    raise TimeoutError(f"Command timed out after {timeout} seconds")
+                for key, _ in selector.select(remaining):
+                    frame = streams[key.fd]
+                    try:
+                        data = os.read(key.fd, _CHUNK_SIZE)
+                    except OSError:
+                        # the pty raises EIO when the shell is gone.
+                        data = b""
+                    if not data:
+                        selector.unregister(key.fd)
+                        if not frame.done:
+                            exit_code = self._process.poll()
+                            self._kill()
+                            raise RuntimeError(f"Shell exited with code {exit_code}")
+                        continue
+                    frame.feed(data)
+                    if frame.done:
+                        selector.unregister(key.fd)
+
+        stdout, stderr = streams[self._stdout_fd], streams[self._stderr_fd]
+        # the rest of the stdout frame is ` <exit code> <pwd>\n`.
+        exit_code, _, cwd = stdout.rest.strip("\n").lstrip(" ").partition(" ")
+        self.cwd = cwd or self.cwd
+        return Terminal.CommandResult(int(exit_code), stdout.output(), stderr.output())
+
+    def _kill(self) -> None:
+        if self._process is not None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self._stop()
+
+    def _stop(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    self._process.stdin.close()
+                    self._process.wait(1.0)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._process.kill()
+                    self._process.wait()
+            elif self._process.stdin:
+                self._process.stdin.close()
+            self._process = None
+        for fd in (self._stdout_fd, self._stderr_fd):
+            if fd >= 0:
+                os.close(fd)
+        self._stdout_fd = self._stderr_fd = -1
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._stop()
+
+
+class _Frame:
+    """
+    the output of one stream of a command, until the line of the sentinel marker.
+    """
+
+    def __init__(self, name: str, marker: str, max_output: int, on_output: Optional[OnOutput]):
+        self.name = name
+        self.marker = marker
+        self.done = False
+        self.rest = ""
+        """the text after the marker in its line"""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._output = BoundedStringIO(max_output)
+        self._pending = ""
+        self._found = False
+        self._on_output = on_output
+
+    def feed(self, data: bytes) -> None:
+        text = self._decoder.decode(data)
+        if self._found:
+            self.rest += text
+            self.done = "\n" in self.rest
+            return
+        self._pending += text
+        idx = self._pending.find(self.marker)
+        if idx >= 0:
+            # the newline before the marker is written by the frame, not by the command.
+            self._emit(self._pending[:idx])
+            self.rest = self._pending[idx + len(self.marker):]
+            self._pending = ""
+            self._found = True
+            self.done = "\n" in self.rest
+            return
+        # the marker starts after a newline, so the text before the last newline is safe to emit.
+        last = self._pending.rfind("\n")
+        if last > 0:
+            self._emit(self._pending[:last])
+            self._pending = self._pending[last:]
+
+    def _emit(self, text: str) -> None:
+        if not text:
+            return
+        self._output.write(text)
+        if self._on_output is not None:
+            self._on_output(self.name, text)
+
+    def output(self) -> str:
+        return self._output.getvalue()
+
+
+class ShellPool:
+    """
+    the persistent shells kept by key, such as the task id, so the sessions of the same task share the state.
+    a shell is owned by one terminal between checkout and checkin, the least recently used idle shells are closed.
+    """
+
+    def __init__(self, max_size: int = 8, shell: str = "/bin/bash", max_output: int = 100_000):
+        """
+        :param max_size: max count of the idle shells
+        :param shell: the bash executable
+        :param max_output: same as PersistentShell
+        """
+        self._max_size = max_size
+        self._shell = shell
+        self._max_output = max_output
+        self._idle: "OrderedDict[Hashable, PersistentShell]" = OrderedDict()
+        self._lock = Lock()
+        self._closed = False
+
+    def checkout(self, key: Hashable, cwd: Optional[str] = None) -> PersistentShell:
+        """
+        take the idle shell of the key or make a new one.
+        :param cwd: the working directory of the new shell.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("shell pool is closed")
+            shell = self._idle.pop(key, None)
+        if shell is not None:
+            return shell
+        return PersistentShell(cwd=cwd, shell=self._shell, max_output=self._max_output)
+
+    def checkin(self, key: Hashable, shell: PersistentShell) -> None:
+        evicted = []
+        with self._lock:
+            if self._closed or shell.closed():
+                evicted.append(shell)
+            else:
+                previous = self._idle.pop(key, None)
+                if previous is not None:
+                    evicted.append(previous)
+                self._idle[key] = shell
+                while len(self._idle) > self._max_size:
+                    evicted.append(self._idle.popitem(last=False)[1])
+        for shell in evicted:
+            shell.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            shells = list(self._idle.values())
+            self._idle.clear()
+        for shell in shells:
+            shell.close()
+
+
+class ShellPoolProvider(BootstrapProvider[ShellPool]):
+    """
+    the shell pool of the application, closed at shutdown.
+    """
+
+    def __init__(self, max_size: int = 8):
+        self._max_size = max_size
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[ShellPool]:
+        return ShellPool
+
+    def factory(self, con: Container) -> Optional[ShellPool]:
+        return ShellPool(self._max_size)
+
+    def bootstrap(self, container: Container) -> None:
+        shutdown = container.get(Shutdown)
+        if shutdown is not None:
+            pool = container.force_fetch(ShellPool)
+            shutdown.register(pool.close)
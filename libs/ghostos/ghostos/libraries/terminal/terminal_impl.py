@@ -1,13 +1,16 @@
-from typing import Optional
+from typing import Optional, Callable, Hashable
 
 from ghostos_container import Container, Provider, INSTANCE
 from ghostos.libraries.terminal.abcd import Terminal, TerminalContext
+from ghostos.libraries.terminal.shell import PersistentShell, ShellPool
 from ghostos_common.prompter import POM
+from ghostos_common.helpers import BoundedStringIO, uuid
 from ghostos.contracts.logger import LoggerItf
+from ghostos.core.messages import Message, Stream
 import subprocess
 import shlex
 
-__all__ = ['TerminalExecutor', 'TerminalProvider', 'TerminalImpl']
+__all__ = ['TerminalExecutor', 'TerminalProvider', 'TerminalImpl', 'ShellTerminalImpl']
 
 
 class TerminalExecutor(Terminal):
@@ -101,17 +104,117 @@ basic information about the current terminal:
         return "Terminal Context"
 
 
+class ShellTerminalImpl(TerminalImpl):
+    """
+    terminal running the commands in a persistent shell, so the working directory and the variables are kept.
+    the output is streamed to the stream made by `stream_factory` while the command is running.
+    """
+
+    def __init__(
+            self,
+            logger: LoggerItf,
+            shell: PersistentShell,
+            *,
+            stream_factory: Optional[Callable[[], Stream]] = None,
+            release: Optional[Callable[[PersistentShell], None]] = None,
+            safe_mode: bool = True,
+    ):
+        """
+        :param shell: the shell owned by the terminal until close.
+        :param stream_factory: make the stream of the output for each command, such as the session messenger.
+        :param release: called with the shell at close, default closes the shell.
+        """
+        super().__init__(logger, safe_mode)
+        self._shell = shell
+        self._stream_factory = stream_factory
+        self._release = release
+
+    def exec(self, *commands: str, timeout: float = 10.0) -> Terminal.CommandResult:
+        if self._shell is None:
+            raise RuntimeError("Terminal is closed")
+        command = "\n".join(commands)
+        self.logger.info(f'Executing command: {command}')
+        stream = self._stream_factory() if self._stream_factory is not None else None
+        if stream is None:
+            result = self._shell.run(command, timeout)
+        else:
+            result = self._exec_streaming(stream, command, timeout)
+        if result.exit_code != 0:
+            raise RuntimeError(f"Command failed with exit code {result.exit_code}: {result.stderr}")
+        return result
+
+    def _exec_streaming(self, stream: Stream, command: str, timeout: float) -> Terminal.CommandResult:
+        msg_id = uuid()
+        streamed = BoundedStringIO()
+
+        def on_output(name: str, text: str) -> None:
+            streamed.write(text)
+            stream.send([Message.new_chunk(content=text, msg_id=msg_id)])
+
+        try:
+            return self._shell.run(command, timeout, on_output)
+        finally:
+            # the whole output is returned to the caller, the streamed message is for the client side only.
+            stream.send([Message.new_tail(content=streamed.getvalue(), msg_id=msg_id)])
+            flush = getattr(stream, "flush", None)
+            if flush is not None:
+                flush()
+
+    def close(self) -> None:
+        shell = self._shell
+        if shell is None:
+            return
+        self._shell = None
+        if self._release is not None:
+            self._release(shell)
+        else:
+            shell.close()
+
+
 class TerminalProvider(Provider[Terminal]):
+    """
+    the persistent terminal is one shell per container, such as a session.
+    the shells are kept by the ShellPool for the next sessions of the same task if the pool is bound.
+    """
 
-    def __init__(self, safe_mode: bool = True):
+    def __init__(self, safe_mode: bool = True, persistent: bool = True):
+        """
+        :param safe_mode: the safe mode of the terminal.
+        :param persistent: use a persistent shell if pty is supported, otherwise a new process for each call.
+        """
         self._safe_mode = safe_mode
+        self._persistent = persistent
 
     def singleton(self) -> bool:
-        return False
+        return self._persistent
 
     def factory(self, con: Container) -> Optional[INSTANCE]:
         logger = con.force_fetch(LoggerItf)
-        return TerminalImpl(logger, safe_mode=self._safe_mode)
+        if not self._persistent:
+            return TerminalImpl(logger, safe_mode=self._safe_mode)
+        from ghostos.abcd import Session
+        session = con.get(Session)
+        key: Hashable = session.task.task_id if session is not None else uuid()
+        pool = con.get(ShellPool)
+        release = None
+        try:
+            if pool is not None:
+                shell = pool.checkout(key)
+                release = lambda s: pool.checkin(key, s)
+            else:
+                shell = PersistentShell()
+        except ImportError:
+            # pty is not supported on the platform.
+            return TerminalImpl(logger, safe_mode=self._safe_mode)
+        terminal = ShellTerminalImpl(
+            logger,
+            shell,
+            stream_factory=session.messenger if session is not None else None,
+            release=release,
+            safe_mode=self._safe_mode,
+        )
+        con.add_shutdown(terminal.close)
+        return terminal
 
 
 if __name__ == '__main__':
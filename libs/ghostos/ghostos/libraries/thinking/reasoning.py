@@ -1,9 +1,29 @@
-from typing import Union
+from typing import Union, List
 
 from ghostos.abcd import Operator, Session
 from ghostos.libraries.thinking.abcd import Reasoning
-from ghostos.core.llms import LLMs
-from ghostos.core.messages import Role, MessageStage
+from ghostos.contracts.pool import Pool
+from ghostos.contracts.logger import LoggerItf
+from ghostos.core.llms import LLMs, LLMApi, Prompt
+from ghostos.core.messages import Role, MessageStage, Message
+from ghostos.core.runtime import EventBus, EventTypes, TaskState
+
+
+def _reasoning_prompt(session: Session, instruction: str) -> Prompt:
+    thread = session.get_truncated_thread()
+    fork = thread.fork()
+    system_instruction = session.get_system_instructions()
+    systems = []
+    if system_instruction:
+        systems.append(Role.new_system(content=system_instruction))
+    prompt = fork.to_prompt(
+        system=systems,
+        stages=None,
+        truncate=True,
+    )
+    if instruction:
+        prompt.added.append(Role.new_system(content=instruction))
+    return prompt
 
 
 class SyncReasoningOperator(Operator):
@@ -13,19 +33,9 @@ class SyncReasoningOperator(Operator):
         self.llm_api = llm_api
 
     def run(self, session: Session) -> Union[Operator, None]:
-        thread = session.get_truncated_thread()
-        fork = thread.fork()
+        prompt = _reasoning_prompt(session, self.instruction)
         llms = session.container.force_fetch(LLMs)
         llm_api = llms.get_api(self.llm_api)
-        instruction = session.get_system_instructions()
-        systems = []
-        if instruction:
-            systems.append(Role.new_system(content=instruction))
-        prompt = fork.to_prompt(
-            system=systems,
-            stages=None,
-            truncate=True,
-        )
         messenger = session.messenger(stage=MessageStage.REASONING)
         items = llm_api.deliver_chat_completion(prompt, not messenger.completes_only())
         messenger.send(items)
@@ -38,6 +48,75 @@ class SyncReasoningOperator(Operator):
         pass
 
 
+class AsyncReasoningOperator(Operator):
+    """
+    run the reasoning completion in the pool and end the current turn at once.
+    the reasoning messages come back to the task as a rotate event, so the task thinks again with them;
+    if the task is dead when the event arrives, the event is saved without running.
+    """
+
+    def __init__(self, instruction: str, llm_api: str = ""):
+        self.instruction = instruction
+        self.llm_api = llm_api
+
+    def run(self, session: Session) -> Union[Operator, None]:
+        prompt = _reasoning_prompt(session, self.instruction)
+        llms = session.container.force_fetch(LLMs)
+        llm_api = llms.get_api(self.llm_api)
+        eventbus = session.container.force_fetch(EventBus)
+        pool = session.container.force_fetch(Pool)
+        task = session.task
+        # the job runs after the session is destroyed, so it only keeps what it needs.
+        job = _ReasoningJob(task.task_id, task.name, prompt, llm_api, eventbus, session.logger)
+        pool.submit(job.run)
+        task.state = TaskState.WAITING.value
+        return None
+
+    def destroy(self):
+        pass
+
+
+class _ReasoningJob:
+
+    def __init__(
+            self,
+            task_id: str,
+            task_name: str,
+            prompt: Prompt,
+            llm_api: LLMApi,
+            eventbus: EventBus,
+            logger: LoggerItf,
+    ):
+        self.task_id = task_id
+        self.task_name = task_name
+        self.prompt = prompt
+        self.llm_api = llm_api
+        self.eventbus = eventbus
+        self.logger = logger
+
+    def run(self) -> None:
+        try:
+            # no one listens to the stream of the finished turn, the complete messages are sent by the event.
+            items = self.llm_api.deliver_chat_completion(self.prompt, False, stage=MessageStage.REASONING.value)
+            messages: List[Message] = [item for item in items if item.is_complete()]
+            event = EventTypes.ROTATE.new(
+                task_id=self.task_id,
+                messages=messages,
+                from_task_id=self.task_id,
+                from_task_name=self.task_name,
+                reason="receive the result of the asynchronous reasoning",
+            )
+        except Exception as e:
+            self.logger.exception(e)
+            event = EventTypes.ERROR.new(
+                task_id=self.task_id,
+                messages=[Role.new_system(content=f"asynchronous reasoning failed: {e}")],
+                from_task_id=self.task_id,
+                from_task_name=self.task_name,
+            )
+        self.eventbus.send_event(event, True)
+
+
 class ReasoningImpl(Reasoning):
 
     def __init__(self, session: Session):
@@ -47,4 +126,4 @@ class ReasoningImpl(Reasoning):
         return SyncReasoningOperator(instruction)
 
     def async_reasoning(self, instruction: str = "") -> Operator:
-        pass
+        return AsyncReasoningOperator(instruction)
@@ -10,3 +10,52 @@ def run(moss: Moss):
 
     value = MossAction.unmarshal_code(bad_case)
     assert not value.startswith("```")
+
+
+def test_moss_context_cache_key():
+    from ghostos.abcd import get_moss_context_pom
+    from ghostos_moss import moss_container, MossCompiler, Moss, PyContext
+
+    class OtherMoss(Moss):
+        pass
+
+    container = moss_container()
+
+    def cache_key(moss_type=Moss, **injections) -> str:
+        compiler = container.force_fetch(MossCompiler)
+        compiler.join_context(PyContext(code="def plus(a: int, b: int) -> int:\n    return a + b\n"))
+        compiler.with_default_moss_type(moss_type)
+        compiler.injects(**injections)
+        with compiler.compile("__moss_context__") as runtime:
+            pom = get_moss_context_pom("context", runtime)
+            return pom.__children__[0].__cache_key__
+
+    key = cache_key()
+    assert key == cache_key()
+    assert key != cache_key(OtherMoss)
+    assert cache_key(foo=1) == cache_key(foo=2)
+    assert cache_key(foo=1) != cache_key(foo="1")
+
+
+def test_moss_context_cache_hit_is_cheaper():
+    import time
+    from ghostos.abcd import get_moss_context_pom
+    from ghostos_common.prompter import clear_prompt_cache
+    from ghostos_moss import moss_container, MossCompiler, PyContext
+    from ghostos_moss.examples import baseline
+
+    container = moss_container()
+    compiler = container.force_fetch(MossCompiler)
+    compiler.join_context(PyContext(module=baseline.__name__))
+    with compiler.compile(None) as runtime:
+        def render() -> float:
+            start = time.perf_counter()
+            get_moss_context_pom("context", runtime).get_prompt(runtime.container())
+            return time.perf_counter() - start
+
+        uncached = []
+        for _ in range(3):
+            clear_prompt_cache()
+            uncached.append(render())
+        cached = min(render() for _ in range(3))
+        assert cached < min(uncached)
@@ -0,0 +1,57 @@
+from typing import Iterable, List
+
+from ghostos.core.aifunc import AIFunc, AIFuncResult, ExecStep
+from ghostos.core.aifunc.driver import DefaultAIFuncDriverImpl
+from ghostos.core.llms import Prompt
+from ghostos.core.messages import Message
+
+
+class Tool(AIFunc):
+    foo: str = "foo"
+
+
+class ToolResult(AIFuncResult):
+    err: str = ""
+
+
+class FakeStreamingApi:
+
+    def __init__(self, deltas: List[str]):
+        self.deltas = deltas
+        self.consumed = 0
+
+    def deliver_chat_completion(self, prompt: Prompt, stream: bool) -> Iterable[Message]:
+        head = Message.new_chunk(content=self.deltas[0]).as_head()
+        self.consumed += 1
+        yield head
+        content = self.deltas[0]
+        for delta in self.deltas[1:]:
+            self.consumed += 1
+            content += delta
+            yield Message.new_chunk(content=delta, msg_id=head.msg_id)
+        tail = head.as_tail()
+        tail.content = content
+        yield tail
+
+
+def test_aifunc_driver_generate_stops_at_code_mark():
+    driver = DefaultAIFuncDriverImpl(Tool())
+    api = FakeStreamingApi(["<co", "de>\ndef main(moss, fn):\n", "    return None, True\n</", "code>", " more", " text"])
+    step = ExecStep(frame_id="frame", func="Tool", depth=0)
+    generated = driver.generate(api, Prompt(), step, None)
+    assert len(generated) == 1
+    assert generated[0].is_complete()
+    assert generated[0].content.endswith("</code>")
+    # the rest of the generation is not consumed.
+    assert api.consumed == 4
+    code = driver.parse_moss_code_in_message(generated[0])
+    assert code.startswith("def main(moss, fn):")
+
+
+def test_aifunc_driver_generate_without_code():
+    driver = DefaultAIFuncDriverImpl(Tool())
+    api = FakeStreamingApi(["hello", " world"])
+    step = ExecStep(frame_id="frame", func="Tool", depth=0)
+    generated = driver.generate(api, Prompt(), step, None)
+    assert len(generated) == 1
+    assert generated[0].content == "hello world"
@@ -0,0 +1,26 @@
+from ghostos.core.model_funcs.truncate_threads import TruncateThreadByLLM
+from ghostos.core.runtime import GoThreadInfo, EventTypes
+from ghostos.core.messages import Role
+
+
+def new_thread(turns: int) -> GoThreadInfo:
+    thread = GoThreadInfo.new(None)
+    for i in range(turns):
+        thread.new_turn(EventTypes.INPUT.new("task", [Role.USER.new(content=f"hello {i}")]))
+        thread.append(Role.ASSISTANT.new(content=f"world {i}"))
+    thread.store()
+    return thread
+
+
+def test_truncate_fork_keeps_other_fork_unchanged(monkeypatch):
+    thread = new_thread(6)
+    fork = thread.fork()
+    monkeypatch.setattr(TruncateThreadByLLM, "_generate_from_prompt", lambda self, prompt: "summary")
+
+    truncated = TruncateThreadByLLM(thread=fork, truncate_at_turns=4, reduce_to_turns=2).run()
+    assert truncated is fork
+    assert fork.history[1].summary == "summary"
+    assert all(turn.summary is None for turn in thread.history)
+    assert fork.history[1] is not thread.history[1]
+    # the turns not truncated are still shared.
+    assert fork.history[2] is thread.history[2]
@@ -0,0 +1,79 @@
+from ghostos.core.runtime import GoThreadInfo, EventTypes
+from ghostos.core.messages import Role
+
+
+def new_thread(turns: int) -> GoThreadInfo:
+    thread = GoThreadInfo.new(None)
+    for i in range(turns):
+        thread.new_turn(EventTypes.INPUT.new("task", [Role.USER.new(content=f"hello {i}")]))
+        thread.append(Role.ASSISTANT.new(content=f"world {i}"))
+    thread.store()
+    return thread
+
+
+def test_fork_shares_history_turns():
+    thread = new_thread(5)
+    fork = thread.fork()
+    assert fork.id != thread.id
+    assert fork.parent_id == thread.id
+    assert all(a is b for a, b in zip(fork.history, thread.history))
+    assert fork.history is not thread.history
+
+    # appending to a fork does not change the other.
+    fork.new_turn(None)
+    fork.append(Role.ASSISTANT.new(content="fork"))
+    fork.store()
+    assert len(fork.history) == 6
+    assert len(thread.history) == 5
+
+
+def test_fork_copy_on_write():
+    thread = new_thread(3)
+    fork = thread.fork()
+    last = fork.last_turn()
+    assert last is not thread.history[-1]
+    last.summary = "changed"
+    assert thread.history[-1].summary is None
+
+    turn = fork.own_turn(0)
+    assert fork.own_turn(0) is turn
+    turn.approved = False
+    assert thread.history[0].approved
+
+    # the parent also copies the shared turn before modifying.
+    thread.own_turn(1).summary = "parent"
+    assert fork.history[1].summary is None
+    assert thread.model_dump()["history"][1]["summary"] == "parent"
+
+
+def test_fork_update_message_copy_on_write():
+    thread = new_thread(2)
+    copied = thread.thread_copy()
+    message = thread.history[0].added[0].get_copy()
+    message.content = "updated"
+    assert copied.update_message(message)
+    assert copied.history[0].added[0].content == "updated"
+    assert thread.history[0].added[0].content == "world 0"
+
+
+def test_updated_copy_copies_current():
+    thread = new_thread(2)
+    thread.new_turn(None)
+    thread.append(Role.ASSISTANT.new(content="current"))
+    copied = thread.get_updated_copy()
+    assert copied.current is None
+    assert len(copied.history) == 3
+    assert thread.current is not None
+    copied.history[-1].added.append(Role.ASSISTANT.new(content="more"))
+    assert len(thread.current.added) == 1
+
+
+def test_thread_copy_keeps_updated_fields():
+    thread = new_thread(3)
+    thread.new_turn(None)
+    current = thread.current.model_copy(deep=True)
+    copied = thread.thread_copy(update=dict(history=[], extra={"a": 1}, current=current))
+    assert copied.history == []
+    assert copied.extra == {"a": 1}
+    assert copied.current is current
+    assert len(thread.history) == 3
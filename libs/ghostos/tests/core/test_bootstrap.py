@@ -4,3 +4,9 @@ from ghostos.bootstrap import expect_workspace_dir
 def test_expect_app_dir():
     dirname, ok = expect_workspace_dir()
     assert isinstance(ok, bool)
+
+
+def test_default_application_providers():
+    from ghostos.bootstrap import default_application_providers, BootstrapConfig
+    providers = default_application_providers(BootstrapConfig())
+    assert all(provider.contract() is not None for provider in providers)
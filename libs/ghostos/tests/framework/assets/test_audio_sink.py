@@ -0,0 +1,127 @@
+import pytest
+import os
+import wave
+from io import BytesIO
+from tempfile import TemporaryDirectory
+
+from ghostos.framework.assets import StorageAudioAssets
+from ghostos.framework.storage import FileStorageImpl, MemStorage
+
+
+def test_wav_file_sink_streams_to_disk():
+    with TemporaryDirectory() as tmpdir:
+        assets = StorageAudioAssets(FileStorageImpl(tmpdir), tmpdir)
+        fileinfo = assets.new_fileinfo(fileid="item", filename="item.wav")
+        sink = assets.new_sink(fileinfo, rate=24000)
+        for i in range(10):
+            sink.write(bytes([i]) * 480)
+            # the frames are written to the partial file, not held in memory.
+            assert os.path.exists(os.path.join(tmpdir, "item.wav.part"))
+        assert sink.size() == 4800
+        assert assets.get_fileinfo("item") is None
+
+        saved = sink.close()
+        assert saved is not None
+        assert sink.closed()
+        assert not os.path.exists(os.path.join(tmpdir, "item.wav.part"))
+        assert assets.has_binary("item")
+
+        with wave.open(os.path.join(tmpdir, "item.wav"), 'rb') as f:
+            assert f.getframerate() == 24000
+            assert f.getnframes() == 2400
+            assert f.readframes(240) == bytes([0]) * 480
+
+
+def test_audio_sink_abort_and_empty():
+    with TemporaryDirectory() as tmpdir:
+        assets = StorageAudioAssets(FileStorageImpl(tmpdir), tmpdir)
+        sink = assets.new_sink(assets.new_fileinfo(fileid="empty", filename="empty.wav"))
+        assert sink.close() is None
+        assert assets.get_fileinfo("empty") is None
+
+        sink = assets.new_sink(assets.new_fileinfo(fileid="abort", filename="abort.wav"))
+        sink.write(b'\x00' * 100)
+        sink.abort()
+        assert assets.get_fileinfo("abort") is None
+        assert os.listdir(tmpdir) == []
+
+
+def test_buffered_wav_sink_with_mem_storage():
+    storage = MemStorage()
+    assets = StorageAudioAssets(storage)
+    fileinfo = assets.new_fileinfo(fileid="mem", filename="mem.wav")
+    with assets.new_sink(fileinfo) as sink:
+        sink.write(b'\x01\x00' * 100)
+    info, data = assets.get_file_and_binary_by_id("mem")
+    assert info.filename == "mem.wav"
+    with wave.open(BytesIO(data), 'rb') as f:
+        assert f.getnframes() == 100
+
+
+def test_flac_sink_streams_compressed():
+    soundfile = pytest.importorskip("soundfile")
+    with TemporaryDirectory() as tmpdir:
+        assets = StorageAudioAssets(FileStorageImpl(tmpdir), tmpdir)
+        fileinfo = assets.new_fileinfo(fileid="item", filename="item.flac")
+        with assets.new_sink(fileinfo, rate=24000) as sink:
+            # odd sized deltas split the frames.
+            for i in range(10):
+                sink.write(b'\x01' * 481)
+            sink.write(b'\x01' * 10)
+        data, rate = soundfile.read(os.path.join(tmpdir, "item.flac"), dtype="int16")
+        assert rate == 24000
+        assert len(data) == 2410
+
+
+def test_wav_sink_truncate_and_rename():
+    with TemporaryDirectory() as tmpdir:
+        assets = StorageAudioAssets(FileStorageImpl(tmpdir), tmpdir)
+        sink = assets.new_sink(assets.new_fileinfo(fileid="tmp", filename="tmp.wav"))
+        sink.write(b'\x01\x00' * 100)
+        sink.write(b'\x02\x00' * 100)
+        # the size is aligned to the frames.
+        assert sink.truncate(201) == 200
+        assert sink.truncate(1000) == 200
+        sink.fileinfo.fileid = "item"
+        sink.fileinfo.filename = "item.wav"
+        sink.close()
+        assert sorted(os.listdir(tmpdir)) == ["item.wav", "item.yml"]
+        info, data = assets.get_file_and_binary_by_id("item")
+        with wave.open(BytesIO(data), 'rb') as f:
+            assert f.getnframes() == 100
+            assert f.readframes(100) == b'\x01\x00' * 100
+
+    storage = MemStorage()
+    assets = StorageAudioAssets(storage)
+    with assets.new_sink(assets.new_fileinfo(fileid="mem", filename="mem.wav")) as sink:
+        sink.write(b'\x01\x00' * 100)
+        sink.truncate(20)
+    _, data = assets.get_file_and_binary_by_id("mem")
+    with wave.open(BytesIO(data), 'rb') as f:
+        assert f.getnframes() == 10
+
+
+def test_flac_sink_truncate_pending_frames():
+    soundfile = pytest.importorskip("soundfile")
+    with TemporaryDirectory() as tmpdir:
+        assets = StorageAudioAssets(FileStorageImpl(tmpdir), tmpdir)
+        fileinfo = assets.new_fileinfo(fileid="item", filename="item.flac")
+        with assets.new_sink(fileinfo, rate=1000) as sink:
+            # 3 seconds written, the latest 2 seconds are pending.
+            sink.write(b'\x01\x00' * 3000)
+            assert sink.truncate(4000) == 4000
+            # the encoded frames are kept.
+            assert sink.truncate(1000) == 2000
+        data, rate = soundfile.read(os.path.join(tmpdir, "item.flac"), dtype="int16")
+        assert len(data) == 1000
+
+
+def test_audio_sink_hooks_are_abstract():
+    from ghostos.framework.assets.storage_audio_assets import _BaseAudioSink
+
+    class HalfSink(_BaseAudioSink):
+        def _write(self, data: bytes) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        HalfSink(None, lambda info: None)
@@ -0,0 +1,28 @@
+"""
+benchmark the real-time factor of the streaming resampler on a single core.
+real-time factor = processing time / audio duration, so 1 / rtf streams can be resampled by one core.
+
+run: python libs/ghostos/tests/framework/audio/benchmark_resampler.py
+"""
+
+import time
+import numpy as np
+from ghostos.framework.audio.resampler import PCM16Resampler
+
+
+def benchmark(input_rate: int, output_rate: int, seconds: int = 60, interval: float = 0.5) -> float:
+    audio = (np.random.randn(input_rate * seconds) * 3000).astype(np.int16)
+    chunk_size = int(input_rate * interval)
+    chunks = [audio[i:i + chunk_size].tobytes() for i in range(0, len(audio), chunk_size)]
+    resampler = PCM16Resampler(input_rate, output_rate)
+    start = time.perf_counter()
+    for chunk in chunks:
+        resampler.process(chunk)
+    resampler.flush()
+    return (time.perf_counter() - start) / seconds
+
+
+if __name__ == '__main__':
+    for _input_rate, _output_rate in [(48000, 24000), (24000, 48000), (44100, 24000), (24000, 44100)]:
+        rtf = benchmark(_input_rate, _output_rate)
+        print(f"{_input_rate} => {_output_rate}: real-time factor {rtf:.5f}, {int(1 / rtf)} streams per core")
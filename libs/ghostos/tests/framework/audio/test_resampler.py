@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from ghostos.framework.audio.resampler import PCM16Resampler, resample_pcm16
+
+
+def _sine(rate: int, seconds: float, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (np.sin(2 * np.pi * freq * t) * 10000).astype(np.int16)
+
+
+@pytest.mark.parametrize("input_rate,output_rate", [(48000, 24000), (24000, 48000), (44100, 24000)])
+def test_resampler_keeps_signal(input_rate: int, output_rate: int):
+    resampler = PCM16Resampler(input_rate, output_rate)
+    resampled = resampler.process(_sine(input_rate, 1).tobytes())
+    assert isinstance(resampled, bytes)
+    output = np.frombuffer(resampled, dtype=np.int16)
+    assert len(output) == output_rate
+
+    # compare with the ideal sine, shifted by the filter delay.
+    delay = (resampler.up * resampler.taps - 1) / 2 / resampler.up / input_rate
+    t = np.arange(len(output)) / output_rate - delay
+    expect = np.sin(2 * np.pi * 440 * t) * 10000
+    assert np.abs(output[200:] - expect[200:]).max() < 50
+
+
+def test_resampler_streaming_equals_whole_buffer():
+    data = _sine(44100, 0.5).tobytes()
+    whole = PCM16Resampler(44100, 24000).process(data)
+
+    resampler = PCM16Resampler(44100, 24000)
+    streamed = b''
+    # odd chunk sizes split the samples.
+    for i in range(0, len(data), 1023):
+        streamed += resampler.process(data[i:i + 1023])
+    assert streamed == whole
+
+
+def test_resample_same_rate():
+    data = _sine(24000, 0.1).tobytes()
+    assert resample_pcm16(data, 24000, 24000) == data
+    assert len(resample_pcm16(data, 24000, 48000)) > len(data) * 2
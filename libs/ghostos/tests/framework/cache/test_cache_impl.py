@@ -0,0 +1,95 @@
+import time
+import pytest
+from ghostos.contracts.cache import Cache
+from ghostos.framework.cache import MemoryCacheImpl, SQLiteCacheImpl
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path) -> Cache:
+    if request.param == "memory":
+        yield MemoryCacheImpl(max_size=100, shards=4)
+    else:
+        c = SQLiteCacheImpl(str(tmp_path / "cache.db"))
+        yield c
+        c.shutdown()
+
+
+def test_cache_set_get_remove(cache):
+    assert cache.get("foo") is None
+    assert cache.set("foo", "bar")
+    assert cache.get("foo") == "bar"
+    assert cache.remove("foo", "none") == 1
+    assert cache.get("foo") is None
+    metrics = cache.metrics()
+    assert metrics.hits == 1
+    assert metrics.misses == 2
+
+
+def test_cache_expire(cache):
+    cache.set("foo", "bar", exp=10)
+    assert cache.get("foo") == "bar"
+    assert cache.expire("foo", -1)
+    assert cache.get("foo") == "bar"
+    # expire at a past time.
+    cache.set("foo", "bar", exp=1)
+    time.sleep(1.1)
+    assert cache.get("foo") is None
+    assert not cache.expire("foo", 10)
+
+
+def test_cache_members(cache):
+    assert cache.get_member("hash", "a") is None
+    cache.set_member("hash", "a", "1")
+    cache.set_member("hash", "b", "2")
+    assert cache.get_member("hash", "a") == "1"
+    assert cache.get_member("hash", "b") == "2"
+    assert cache.get("hash") is None
+    assert cache.remove_member("hash", "a", "c") == 1
+    assert cache.get_member("hash", "a") is None
+    cache.set("hash", "string")
+    assert cache.get_member("hash", "b") is None
+    assert cache.remove("hash") == 1
+
+
+def test_cache_lock(cache):
+    assert cache.lock("foo")
+    assert not cache.lock("foo")
+    assert cache.unlock("foo")
+    assert not cache.unlock("foo")
+    # the lock is independent of the value.
+    cache.set("foo", "bar")
+    assert cache.lock("foo", overdue=1)
+    assert cache.get("foo") == "bar"
+    assert not cache.lock("foo", overdue=1)
+    time.sleep(1.1)
+    # the overdue lease is taken over.
+    assert cache.lock("foo", overdue=1)
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCacheImpl(max_size=3, shards=1)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    assert cache.get("a") == "a"
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert len(cache) == 3
+    assert cache.metrics().evictions == 1
+
+
+def test_sqlite_cache_shared_and_evicted(tmp_path):
+    filepath = str(tmp_path / "cache.db")
+    first = SQLiteCacheImpl(filepath, max_size=2, evict_interval=1)
+    second = SQLiteCacheImpl(filepath)
+    first.set("a", "1")
+    assert second.get("a") == "1"
+    assert second.lock("lock")
+    assert not first.lock("lock")
+    first.set("b", "2")
+    first.set("c", "3")
+    assert second.get("a") is None
+    assert second.get("c") == "3"
+    assert first.metrics().evictions == 1
+    first.shutdown()
+    second.shutdown()
@@ -0,0 +1,70 @@
+import os
+import time
+from ghostos.contracts.configs import YamlConfig
+from ghostos.framework.configs import MemoryConfigs
+from ghostos.framework.configs.storageimpl import StorageConfigs
+from ghostos.framework.storage import FileStorageImpl, MemStorage
+
+
+class FooConf(YamlConfig):
+    relative_path = "foo.yml"
+    foo: str = "abc"
+
+
+def test_storage_configs_cached_by_mtime(tmp_path, monkeypatch):
+    configs = StorageConfigs(FileStorageImpl(str(tmp_path)), "")
+    configs.save(FooConf(foo="a"))
+    unmarshalled = []
+    unmarshal = FooConf.unmarshal
+    monkeypatch.setattr(FooConf, "unmarshal", classmethod(lambda cls, c: unmarshalled.append(c) or unmarshal(c)))
+    got = configs.get(FooConf)
+    assert got.foo == "a"
+    # the modification of a got config is not shared.
+    got.foo = "modified"
+    assert configs.get(FooConf).foo == "a"
+    assert len(unmarshalled) == 1
+
+    # changed by another process.
+    filename = str(tmp_path / "foo.yml")
+    with open(filename, "wb") as f:
+        f.write(FooConf(foo="b").marshal())
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert configs.get(FooConf).foo == "b"
+
+
+def test_storage_configs_without_file_not_cached():
+    configs = StorageConfigs(MemStorage(), "")
+    configs.save(FooConf(foo="a"))
+    got = configs.get(FooConf)
+    assert got.foo == "a"
+    assert configs.get(FooConf) is not got
+
+
+def test_configs_on_change_by_save():
+    configs = MemoryConfigs()
+    changed = []
+    configs.on_change(FooConf.relative_path, changed.append)
+    configs.save(FooConf(foo="a"))
+    got = configs.get(FooConf)
+    assert configs.get(FooConf) is not got
+    assert configs.get(FooConf) == got
+    configs.save(FooConf(foo="b"))
+    assert changed == ["foo.yml", "foo.yml"]
+    assert configs.get(FooConf).foo == "b"
+    assert configs.check_changes() == []
+
+
+def test_storage_configs_watch_changes(tmp_path):
+    configs = StorageConfigs(FileStorageImpl(str(tmp_path)), "", watch_interval=0.05)
+    configs.save(FooConf(foo="a"))
+    changed = []
+    configs.on_change(FooConf.relative_path, changed.append)
+    with open(str(tmp_path / "foo.yml"), "wb") as f:
+        f.write(FooConf(foo="changed").marshal())
+    for _ in range(40):
+        if changed:
+            break
+        time.sleep(0.05)
+    configs.close()
+    assert changed == ["foo.yml"]
@@ -0,0 +1,92 @@
+import numpy as np
+
+from ghostos.framework.embeddings import (
+    EmbeddingsImpl, HashingEmbeddingDriver, NumpyVectorIndex,
+)
+
+
+def test_hashing_driver_similarity():
+    embeddings = EmbeddingsImpl(HashingEmbeddingDriver(dimensions=256))
+    a = embeddings.get_embedding("hello world")
+    b = embeddings.get_embedding("hello world")
+    assert np.allclose(a, b)
+
+    result = embeddings.search(
+        "play some music",
+        ["play the music", "what is the weather today", "write a python function"],
+        top_k=2,
+        threshold=0.0,
+    )
+    assert len(result) <= 2
+    assert result[0][0] == "play the music"
+
+
+def test_vector_index_add_search_remove():
+    index = NumpyVectorIndex(8)
+    vectors = np.eye(8, dtype=np.float32)
+    index.add([f"key{i}" for i in range(8)], vectors)
+    assert len(index) == 8
+
+    result = index.search(vectors[3], top_k=3)
+    assert result[0][0] == "key3"
+    assert abs(result[0][1] - 1.0) < 1e-5
+
+    assert index.remove(["key3", "not_exists"]) == 1
+    assert len(index) == 7
+    assert index.get("key3") is None
+    assert index.search(vectors[3], top_k=1, threshold=0.5) == []
+    # the moved row is still searchable.
+    assert index.search(vectors[7], top_k=1)[0][0] == "key7"
+
+
+def test_vector_index_search_while_removing(monkeypatch):
+    from ghostos.framework.embeddings import vector_index
+
+    index = NumpyVectorIndex(8)
+    vectors = np.eye(8, dtype=np.float32)
+    index.add([f"key{i}" for i in range(8)], vectors)
+
+    class _RemovingNumpy:
+        # remove rows after the scores are taken, before the candidates are mapped to the keys.
+        def __getattr__(self, item):
+            return getattr(np, item)
+
+        @staticmethod
+        def argsort(*args, **kwargs):
+            index.remove(["key0", "key1", "key2"])
+            return np.argsort(*args, **kwargs)
+
+    monkeypatch.setattr(vector_index, "np", _RemovingNumpy())
+    result = index.search(vectors[7], top_k=8)
+    assert result[0] == ("key7", result[0][1])
+    assert len(result) == 8
+
+
+def test_quantized_vector_index_search():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, 32)).astype(np.float32)
+    index = NumpyVectorIndex(32, quantize=True)
+    index.block_size = 16
+    index.add([str(i) for i in range(100)], vectors)
+    results = index.search_batch(vectors[:5], top_k=1)
+    assert [r[0][0] for r in results] == ["0", "1", "2", "3", "4"]
+
+
+def test_vector_index_save_and_load(tmp_path):
+    directory = str(tmp_path / "index")
+    index = NumpyVectorIndex(4, directory=directory)
+    index.add(["a", "b"], np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float32))
+    index.save()
+
+    loaded = NumpyVectorIndex(4, directory=directory)
+    assert list(loaded.keys()) == ["a", "b"]
+    assert loaded.search(np.array([0, 1, 0, 0]), top_k=1)[0][0] == "b"
+    loaded.add(["c"], np.array([[0, 0, 1, 0]], dtype=np.float32))
+    assert loaded.search(np.array([0, 0, 1, 0]), top_k=1)[0][0] == "c"
+
+
+def test_get_unregistered_driver():
+    import pytest
+    embeddings = EmbeddingsImpl(HashingEmbeddingDriver(dimensions=8))
+    with pytest.raises(KeyError):
+        embeddings.get_driver("not_exists")
@@ -0,0 +1,128 @@
+import sqlite3
+
+import pytest
+
+from ghostos.framework.eventbuses.sqliteimpl import SQLiteEventBusImpl
+from ghostos.core.runtime.events import EventTypes
+
+
+@pytest.fixture(autouse=True, params=["returning", "select"])
+def sqlite_version(request, monkeypatch):
+    if request.param == "select":
+        # sqlite before 3.35 has no RETURNING.
+        monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 31, 1))
+    return request.param
+
+
+def test_sqlite_impl_send_pop_event(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    e = EventTypes.INPUT.new("foo", [])
+    bus.send_event(e, notify=True)
+    task_id = bus.pop_task_notification()
+    assert task_id == e.task_id
+    popped = bus.pop_task_event(task_id=task_id)
+    assert popped.event_id == e.event_id
+    assert bus.pop_task_event(task_id=task_id) is None
+    assert bus.pop_task_notification() is None
+    bus.shutdown()
+
+
+def test_sqlite_impl_cancel_first(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    e = EventTypes.INPUT.new("foo", [])
+    bus.send_event(e, notify=False)
+    cancel = EventTypes.CANCEL.new("foo", [])
+    bus.send_event(cancel, notify=False)
+    assert bus.pop_task_event("foo").event_id == cancel.event_id
+    assert bus.pop_task_event("foo").event_id == e.event_id
+    bus.shutdown()
+
+
+def test_sqlite_impl_shared_between_instances(tmp_path):
+    filepath = str(tmp_path / "eventbus.db")
+    sender = SQLiteEventBusImpl(filepath)
+    receiver = SQLiteEventBusImpl(filepath)
+    e = EventTypes.INPUT.new("foo", [])
+    sender.send_event(e, notify=True)
+    assert receiver.pop_task_notification() == "foo"
+    assert receiver.pop_task_event("foo").event_id == e.event_id
+    sender.shutdown()
+    receiver.shutdown()
+
+
+def test_sqlite_impl_shards_partition_notifications(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    task_ids = [f"task-{i}" for i in range(20)]
+    for task_id in task_ids:
+        bus.notify_task(task_id)
+    shards = [bus.with_shard(i, 3) for i in range(3)]
+    popped = []
+    for shard in shards:
+        own = []
+        while (task_id := shard.pop_task_notification()) is not None:
+            own.append(task_id)
+        popped.append(own)
+        shard.shutdown()
+    assert sorted(sum(popped, [])) == sorted(task_ids)
+    assert all(len(own) < len(task_ids) for own in popped)
+    bus.shutdown()
+
+
+def test_sqlite_impl_batch_pop(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    events = [EventTypes.INPUT.new("foo", []) for _ in range(5)]
+    bus.send_events(events, notify=True)
+    assert bus.pop_task_notifications(10) == ["foo"]
+    popped = bus.pop_task_events("foo", 3)
+    assert [e.event_id for e in popped] == [e.event_id for e in events[:3]]
+    popped = bus.pop_task_events("foo", 3)
+    assert [e.event_id for e in popped] == [e.event_id for e in events[3:]]
+    bus.shutdown()
+
+
+def test_sqlite_impl_redeliver_unacked(tmp_path):
+    bus = SQLiteEventBusImpl(
+        str(tmp_path / "eventbus.db"),
+        visibility_timeout=0.0,
+        max_deliveries=2,
+        redelivery_interval=0.0,
+    )
+    acked = EventTypes.INPUT.new("foo", [])
+    lost = EventTypes.INPUT.new("foo", [])
+    bus.send_events([acked, lost], notify=True)
+    assert bus.pop_task_notification() == "foo"
+    assert len(bus.pop_task_events("foo", 2)) == 2
+    bus.ack_event(acked)
+
+    # the unacked event is visible again and the task is notified again.
+    assert bus.pop_task_notification() == "foo"
+    redelivered = bus.pop_task_events("foo", 2)
+    assert [e.event_id for e in redelivered] == [lost.event_id]
+
+    # delivered max times, dropped.
+    assert bus.pop_task_notification() is None
+    assert bus.pop_task_event("foo") is None
+    bus.shutdown()
+
+
+def test_sqlite_impl_delete_on_pop(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"), visibility_timeout=None, redelivery_interval=0.0)
+    e = EventTypes.INPUT.new("foo", [])
+    bus.send_event(e, notify=False)
+    assert bus.pop_task_event("foo").event_id == e.event_id
+    assert bus.pop_task_notification() is None
+    assert bus.pop_task_event("foo") is None
+    bus.shutdown()
+
+
+def test_sqlite_impl_transaction_rollback(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    try:
+        with bus.transaction():
+            bus.send_event(EventTypes.INPUT.new("foo", []), notify=True)
+            raise ValueError("rollback")
+    except ValueError:
+        pass
+    assert bus.pop_task_notification() is None
+    assert bus.pop_task_event("foo") is None
+    bus.shutdown()
@@ -0,0 +1,194 @@
+import time
+from typing import Optional, Union, List
+from unittest.mock import MagicMock
+
+from ghostos.abcd import Session, Action, Operator
+from ghostos.contracts.pool import DefaultPool
+from ghostos.contracts.logger import get_console_logger
+from ghostos.core.messages import FunctionCaller, Message, MessageType
+from ghostos.framework.messengers import DefaultMessenger
+from ghostos.framework.ghostos.session_impl import CallersRunner
+from ghostos.core.llms import Prompt, LLMFunc
+from ghostos_container import Container
+
+
+class FakeOperator(Operator):
+
+    def __init__(self, name: str):
+        self.name = name
+        self.destroyed = False
+
+    def run(self, session: Session) -> Union[Operator, None]:
+        return None
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class SleepAction(Action):
+
+    def __init__(self, name: str, seconds: float, parallel: bool = True):
+        self._name = name
+        self._seconds = seconds
+        self._parallel = parallel
+        self.sessions = []
+        self.operators = []
+
+    def name(self) -> str:
+        return self._name
+
+    def as_function(self) -> Optional[LLMFunc]:
+        return None
+
+    def update_prompt(self, prompt: Prompt) -> Prompt:
+        return prompt
+
+    def run(self, session: Session, caller: FunctionCaller) -> Union[Operator, None]:
+        self.sessions.append(session)
+        time.sleep(self._seconds)
+        session.respond([caller.new_output(caller.arguments)])
+        op = FakeOperator(caller.arguments)
+        self.operators.append(op)
+        return op
+
+    def parallel_safe(self) -> bool:
+        return self._parallel
+
+
+def new_session() -> MagicMock:
+    session = MagicMock(spec=Session)
+    session.container = Container()
+    session.logger = get_console_logger()
+    session.outputs = []
+
+    def respond(messages, stage: str = "", save: bool = True, on_caller=None):
+        session.outputs.extend(message.content for message in messages)
+        return [], []
+
+    session.respond.side_effect = respond
+    return session
+
+
+def new_runner(session, actions: List[Action], timeout: float = 0.0) -> CallersRunner:
+    return CallersRunner(session, {a.name(): a for a in actions}, DefaultPool(10), timeout)
+
+
+def new_caller(name: str, arguments: str) -> FunctionCaller:
+    return FunctionCaller(call_id=arguments, name=name, arguments=arguments)
+
+
+def test_parallel_callers_wall_time():
+    session = new_session()
+    runner = new_runner(session, [SleepAction("sleep", 0.2)])
+    callers = [new_caller("sleep", str(i)) for i in range(5)]
+    start = time.time()
+    op = runner.run(callers)
+    spent = time.time() - start
+    # close to the slowest caller, not the sum of them.
+    assert spent < 0.6
+    assert session.outputs == ["0", "1", "2", "3", "4"]
+    assert op.name == "0"
+
+
+def test_parallel_callers_ordered_with_sequential():
+    session = new_session()
+    runner = new_runner(session, [
+        SleepAction("slow", 0.2),
+        SleepAction("fast", 0.0),
+        SleepAction("seq", 0.0, parallel=False),
+    ])
+    callers = [
+        new_caller("slow", "a"),
+        new_caller("fast", "b"),
+        new_caller("missing", "c"),
+        new_caller("seq", "d"),
+    ]
+    op = runner.run(callers)
+    assert op.name == "a"
+    # the sequential caller after the operator is not run.
+    assert session.outputs == ["a", "b"]
+
+
+def test_parallel_callers_destroy_discarded_operators():
+    session = new_session()
+    action = SleepAction("sleep", 0.0)
+    op = new_runner(session, [action]).run([new_caller("sleep", str(i)) for i in range(3)])
+    assert op.name == "0"
+    assert not op.destroyed
+    discarded = [o for o in action.operators if o is not op]
+    assert len(discarded) == 2
+    assert all(o.destroyed for o in discarded)
+
+
+def test_parallel_callers_run_with_session():
+    session = new_session()
+    action = SleepAction("sleep", 0.0)
+    new_runner(session, [action]).run([new_caller("sleep", "a"), new_caller("sleep", "b")])
+    assert len(action.sessions) == 2
+    for running in action.sessions:
+        assert isinstance(running, Session)
+        assert running is not session
+        assert running.container is session.container
+        assert running.logger is session.logger
+
+
+def test_parallel_caller_timeout():
+    session = new_session()
+    slow = SleepAction("slow", 0.5)
+    runner = new_runner(session, [slow, SleepAction("fast", 0.0)], timeout=0.1)
+    op = runner.run([new_caller("slow", "a"), new_caller("fast", "b")])
+    assert op.name == "b"
+    assert len(session.outputs) == 2
+    assert "timeout" in session.outputs[0]
+    assert session.outputs[1] == "b"
+    # the operator of the abandoned caller is destroyed when it returns.
+    time.sleep(0.6)
+    assert len(slow.operators) == 1
+    assert slow.operators[0].destroyed
+
+
+def replay_stream(delay: float):
+    # a slow tool call completes first, then the text keeps streaming before a fast call.
+    yield Message.new_tail(type_=MessageType.FUNCTION_CALL.value, name="slow", call_id="a", content="a")
+    msg_id = "text"
+    for i in range(3):
+        time.sleep(delay)
+        yield Message.new_chunk(content=str(i), msg_id=msg_id)
+    yield Message.new_tail(content="012", msg_id=msg_id)
+    yield Message.new_tail(type_=MessageType.FUNCTION_CALL.value, name="fast", call_id="b", content="b")
+
+
+def respond_and_run(runner: CallersRunner, dispatch: bool):
+    messenger = DefaultMessenger(None, on_caller=runner.dispatch if dispatch else None)
+    messenger.send(replay_stream(0.1))
+    messages, callers = messenger.flush()
+    return messages, runner.run(callers)
+
+
+def test_dispatch_callers_during_streaming():
+    actions = [SleepAction("slow", 0.3), SleepAction("fast", 0.0)]
+
+    start = time.time()
+    respond_and_run(new_runner(new_session(), actions), False)
+    serial = time.time() - start
+
+    session = new_session()
+    start = time.time()
+    messages, op = respond_and_run(new_runner(session, actions), True)
+    dispatched = time.time() - start
+
+    assert len(messages) == 3
+    assert op.name == "a"
+    assert session.outputs == ["a", "b"]
+    # the slow caller runs while the text is streaming.
+    assert dispatched < serial - 0.15
+
+
+def test_dispatched_callers_of_failed_stream():
+    session = new_session()
+    runner = new_runner(session, [SleepAction("slow", 0.1)])
+    runner.dispatch(new_caller("slow", "a"))
+    # the stream failed, the dispatched caller is discarded, its outputs are not responded.
+    runner.discard()
+    time.sleep(0.2)
+    assert session.outputs == []
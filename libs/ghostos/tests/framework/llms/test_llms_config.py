@@ -79,3 +79,30 @@ def test_llms():
 
     assert api2.get_service().name == "moonshot"
     assert api2.get_model().model == "moonshot-v1-32k"
+
+
+def test_llms_update_keeps_old_config_on_error():
+    container: Container = _prepare_container()
+    container.register(ConfigBasedLLMsProvider())
+    llms = container.force_fetch(LLMs)
+    assert llms.get_api("gpt-4") is not None
+
+    bad = LLMsConfig(
+        services=[ServiceConf(name="other", base_url="http://other.com", token="token")],
+        default="missing",
+        models={"other": ModelConf(model="other", service="other")},
+    )
+    try:
+        llms.update(bad)
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expect error")
+    # the old config is kept.
+    assert llms.get_api("gpt-4") is not None
+    assert llms.get_service("other") is None
+
+    bad.default = "other"
+    llms.update(bad)
+    assert llms.get_api("").get_model().model == "other"
+    assert llms.get_service("moonshot") is None
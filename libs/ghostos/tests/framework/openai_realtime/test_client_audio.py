@@ -0,0 +1,64 @@
+import wave
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from ghostos.abcd import Conversation
+from ghostos.contracts.assets import AudioAssets
+from ghostos.contracts.logger import get_console_logger
+from ghostos.core.runtime import GoThreadInfo
+from ghostos.framework.assets import StorageAudioAssets
+from ghostos.framework.openai_realtime.client import Context, RATE
+from ghostos.framework.storage import MemStorage
+from ghostos_container import Container
+
+
+def new_context():
+    assets = StorageAudioAssets(MemStorage())
+    container = Container()
+    container.set(AudioAssets, assets)
+    conversation = MagicMock(spec=Conversation)
+    conversation.get_thread.return_value = GoThreadInfo.new(None)
+    conversation.container.return_value = container
+    ctx = Context(
+        conversation=conversation,
+        connection=MagicMock(),
+        listening=True,
+        output=MagicMock(),
+        logger=get_console_logger(),
+    )
+    return ctx, assets
+
+
+def read_frames(assets, item_id: str) -> bytes:
+    data = assets.get_binary(f"{item_id}.wav")
+    with wave.open(BytesIO(data), "rb") as f:
+        return f.readframes(f.getnframes())
+
+
+def ms_bytes(ms: int) -> int:
+    return int(RATE / 1000 * ms) * 2
+
+
+def test_client_audio_tail_carried_to_next_item():
+    ctx, assets = new_context()
+    ctx.audio_buffer_append(b"\x01" * ms_bytes(100))
+    ctx.audio_buffer_append(b"\x02" * ms_bytes(100))
+    ctx.set_client_audio_buffer_stop("first", 100)
+    assert read_frames(assets, "first") == b"\x01" * ms_bytes(100)
+
+    # the audio after the speech end starts the next item.
+    ctx.audio_buffer_append(b"\x03" * ms_bytes(50))
+    ctx.set_client_audio_buffer_stop("second", 250)
+    assert read_frames(assets, "second") == b"\x02" * ms_bytes(100) + b"\x03" * ms_bytes(50)
+
+
+def test_client_audio_end_before_sink_is_empty_item():
+    ctx, assets = new_context()
+    ctx.audio_buffer_append(b"\x01" * ms_bytes(100))
+    ctx.set_client_audio_buffer_stop("first", 100)
+    ctx.audio_buffer_append(b"\x02" * ms_bytes(100))
+    # the speech ended before the audio of the sink.
+    ctx.set_client_audio_buffer_stop("empty", 50)
+    assert assets.get_binary("empty.wav") is None
+    ctx.set_client_audio_buffer_stop("second", 200)
+    assert read_frames(assets, "second") == b"\x02" * ms_bytes(100)
@@ -0,0 +1,55 @@
+import time
+from threading import Thread
+from ghostos.framework.openai_realtime.output import DefaultOutputBuffer
+from ghostos.framework.logger import FakeLogger
+from ghostos.core.messages import Message
+
+
+def test_output_buffer_wait_response():
+    buffer = DefaultOutputBuffer(lambda: False, FakeLogger())
+    assert buffer.wait_response(timeout=0.01) is None
+
+    started = []
+
+    def wait():
+        started.append(buffer.wait_response())
+
+    t = Thread(target=wait)
+    t.start()
+    time.sleep(0.05)
+    buffer.start_output("response")
+    t.join(timeout=1)
+    assert started == ["response"]
+
+    # audio deltas are put to the speaking queue directly.
+    assert buffer.add_audio_output("response", b'123')
+    q = buffer.speaking_queue("response")
+    assert q.get_nowait() == b'123'
+
+    # closing the buffer ends the speaking and wakes up the waiting threads.
+    buffer.close()
+    assert q.get_nowait() is None
+    assert buffer.wait_response() is None
+
+
+def test_output_buffer_chunks_without_polling():
+    buffer = DefaultOutputBuffer(lambda: False, FakeLogger())
+    buffer.start_output("response")
+    head = Message.new_head(content="", msg_id="item")
+    buffer.add_response_chunk("response", Message.new_chunk(content="hello", msg_id="item"))
+
+    def respond():
+        time.sleep(0.05)
+        buffer.add_response_chunk("response", Message.new_chunk(content=" world", msg_id="item"))
+        time.sleep(0.05)
+        complete = head.get_copy()
+        complete.content = "hello world"
+        buffer.add_message(complete.as_tail(copy=True), None)
+
+    t = Thread(target=respond)
+    t.start()
+    received = buffer.output_received()
+    assert received is not None
+    tail = received.tail()
+    t.join()
+    assert tail.content == "hello world"
@@ -0,0 +1,43 @@
+import os
+from ghostos.framework.storage import FileStorageImpl, ShardedFileStorage, sharded_storage
+
+
+def test_file_storage_put_get_dir(tmp_path):
+    storage = FileStorageImpl(str(tmp_path), fsync=True)
+    storage.put("a.yml", b"a")
+    storage.put_many({"sub/b.yml": b"b", "sub/deep/c.txt": b"c"})
+    assert storage.get("sub/b.yml") == b"b"
+    assert storage.get_many(["a.yml", "none.yml", "sub/deep/c.txt"]) == {"a.yml": b"a", "sub/deep/c.txt": b"c"}
+    # no temp file is left.
+    assert sorted(os.listdir(str(tmp_path))) == ["a.yml", "sub"]
+
+    assert sorted(storage.dir("", False)) == ["a.yml"]
+    assert sorted(storage.dir("", True)) == ["a.yml", "sub/b.yml", "sub/deep/c.txt"]
+    assert sorted(storage.dir("sub", True, r"\.yml$")) == ["b.yml"]
+    assert list(storage.dir("none", True)) == []
+
+
+def test_sharded_file_storage(tmp_path):
+    # saved before sharding.
+    FileStorageImpl(str(tmp_path)).put("old.yml", b"old")
+    storage = sharded_storage(FileStorageImpl(str(tmp_path)))
+    assert isinstance(storage, ShardedFileStorage)
+    assert storage.get("old.yml") == b"old"
+
+    storage.put_many({f"{i}.yml": str(i).encode() for i in range(20)})
+    storage.put("sub/x.yml", b"x")
+    assert storage.exists("3.yml")
+    assert storage.get("3.yml") == b"3"
+    assert not os.path.exists(str(tmp_path / "3.yml"))
+    assert storage.sub_storage("sub").get("x.yml") == b"x"
+
+    names = sorted(storage.dir("", False))
+    assert names == sorted([f"{i}.yml" for i in range(20)] + ["old.yml"])
+    assert "sub/x.yml" in set(storage.dir("", True))
+
+    # the old file is moved into the shards when saved again.
+    storage.put("old.yml", b"new")
+    assert not os.path.exists(str(tmp_path / "old.yml"))
+    assert storage.get("old.yml") == b"new"
+    storage.remove("old.yml")
+    assert not storage.exists("old.yml")
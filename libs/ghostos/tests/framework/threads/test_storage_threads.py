@@ -33,3 +33,46 @@ def test_threads_baseline():
     assert fork.id != got.id
     assert fork.root_id == got.id
     assert fork.parent_id == got.id
+
+
+def test_threads_pycontext_blobs():
+    storage = MemStorage()
+    container = _prepare_container()
+    container.set(Storage, storage)
+    threads = container.force_fetch(GoThreads)
+
+    code = "\n".join(f"def foo_{i}():\n    return {i}\n" for i in range(50))
+    thread = GoThreadInfo()
+    for i in range(10):
+        pycontext = PyContext(code=code, execute_code="print(1)")
+        pycontext.set_prop("note", "note " * 100)
+        thread.new_turn(None, pycontext=pycontext)
+        thread.append(Message.new_tail(content=f"hello {i}"))
+    threads.save_thread(thread)
+
+    content = storage.get(f"runtime/threads/{thread.id}.thread.yml").decode()
+    assert "foo_1" not in content
+    assert "note note" not in content
+    assert "print(1)" in content
+    blobs = [key for key in storage.dir("", True) if key.endswith(".blob")]
+    assert len(blobs) == 2
+
+    got = threads.get_thread(thread.id)
+    # the created timestamps equal to their defaults are not saved, so the turns are compared by the fields.
+    assert len(got.history) == len(thread.history)
+    for got_turn, turn in zip([got.current, *got.history], [thread.current, *thread.history]):
+        assert got_turn.pycontext == turn.pycontext
+        assert got_turn.added == turn.added
+    assert got.current.pycontext.code == code
+    assert got.current.pycontext.properties == thread.current.pycontext.properties
+
+
+def test_pycontext_blobs_saved_keys_bounded():
+    from ghostos.framework.threads.pycontext_blobs import PyContextBlobs
+    storage = MemStorage()
+    blobs = PyContextBlobs(storage, saved_size=2)
+    keys = [blobs.put(f"content {i}") for i in range(5)]
+    assert len(blobs._saved) == 2
+    # the forgotten keys are checked in the storage again.
+    assert blobs.put("content 0") == keys[0]
+    assert blobs.get(keys[1]) == "content 1"
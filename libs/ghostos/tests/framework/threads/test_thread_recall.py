@@ -0,0 +1,110 @@
+from ghostos.framework.threads import ThreadRecall, ThreadRecallPipe
+from ghostos.framework.embeddings import EmbeddingsImpl, HashingEmbeddingDriver
+from ghostos.core.runtime import GoThreadInfo, EventTypes
+from ghostos.core.messages import Role
+
+
+def _new_thread(contents) -> GoThreadInfo:
+    thread = GoThreadInfo()
+    for content in contents:
+        thread.new_turn(None)
+        thread.append(Role.USER.new(content=content))
+    thread.store()
+    return thread
+
+
+def test_thread_recall_index_and_recall():
+    recall = ThreadRecall(EmbeddingsImpl(HashingEmbeddingDriver()))
+    thread = _new_thread([
+        "my cat is named tom",
+        "the weather is sunny today",
+        "i like to write python code",
+    ])
+    assert recall.index_thread(thread) == 3
+    # indexed turns are skipped.
+    assert recall.index_thread(thread) == 0
+
+    turns = recall.recall(thread, "what is the name of my cat", top_k=1)
+    assert len(turns) == 1
+    assert turns[0].turn_id == thread.history[0].turn_id
+
+
+def test_thread_recall_pipe():
+    recall = ThreadRecall(EmbeddingsImpl(HashingEmbeddingDriver()))
+    contents = ["my cat is named tom"] + [f"talk about the topic number {i}" for i in range(20)]
+    thread = _new_thread(contents)
+    event = EventTypes.INPUT.new("task_id", [Role.USER.new(content="what is the name of my cat?")])
+    thread.new_turn(event)
+
+    prompt = thread.to_prompt([], truncate=True)
+    pipe = ThreadRecallPipe(thread, recall, top_k=1, recent_turns=3)
+    prompt = pipe.update_prompt(prompt)
+    contents = [message.content for message in prompt.history]
+    assert "my cat is named tom" in contents
+    assert contents[-3:] == ["talk about the topic number 17", "talk about the topic number 18",
+                             "talk about the topic number 19"]
+    assert "talk about the topic number 5" not in contents
+
+
+def test_thread_recall_indexes_saved_threads_only_if_recalled():
+    from ghostos.framework.threads.storage_threads import GoThreadsByStorage
+    from ghostos.framework.storage import MemStorage
+    from ghostos.framework.logger import FakeLogger
+
+    recall = ThreadRecall(EmbeddingsImpl(HashingEmbeddingDriver()))
+    threads = GoThreadsByStorage(storage=MemStorage(), logger=FakeLogger(), recall=recall)
+    thread = _new_thread(["my cat is named tom", "the weather is sunny today"])
+    threads.save_thread(thread)
+    assert not recall.opened(thread.id)
+
+    assert len(recall.recall(thread, "cat", top_k=1)) == 1
+    assert recall.opened(thread.id)
+    thread.new_turn(None)
+    thread.append(Role.USER.new(content="i like to write python code"))
+    thread.store()
+    threads.save_thread(thread)
+    # the new turn is indexed by saving.
+    assert recall.index_thread(thread) == 0
+
+
+def test_thread_recall_releases_least_recent_indexes():
+    recall = ThreadRecall(EmbeddingsImpl(HashingEmbeddingDriver()), max_threads=2)
+    threads = [_new_thread([f"thread number {i}"]) for i in range(3)]
+    for thread in threads:
+        recall.recall(thread, "thread", top_k=1)
+    assert not recall.opened(threads[0].id)
+    assert recall.opened(threads[1].id)
+    assert recall.opened(threads[2].id)
+    # the released memory index is indexed again when it is recalled.
+    assert recall.index_thread(threads[0]) == 1
+
+
+def test_thread_recall_embeds_out_of_the_lock():
+    import threading
+
+    class BlockingDriver(HashingEmbeddingDriver):
+        def __init__(self):
+            super().__init__()
+            self.entered = threading.Event()
+            self.release = threading.Event()
+
+        def embed(self, texts):
+            if "slow" in texts[0]:
+                self.entered.set()
+                self.release.wait(5)
+            return super().embed(texts)
+
+    driver = BlockingDriver()
+    recall = ThreadRecall(EmbeddingsImpl(driver))
+    slow = _new_thread(["slow thread"])
+    fast = _new_thread(["fast thread"])
+    worker = threading.Thread(target=recall.index_thread, args=(slow,))
+    worker.start()
+    try:
+        assert driver.entered.wait(5)
+        # the other threads are indexed while the slow embedding is running.
+        assert recall.index_thread(fast) == 1
+    finally:
+        driver.release.set()
+        worker.join(5)
+    assert recall.index_thread(slow) == 0
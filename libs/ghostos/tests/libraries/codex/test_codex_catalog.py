@@ -0,0 +1,77 @@
+import os
+import sys
+import pathlib
+
+import pytest
+
+from ghostos.framework.storage import MemStorage
+from ghostos.libraries.codex.catalog_impl import PyCodexCatalogImpl
+
+
+@pytest.fixture
+def package(tmp_path: pathlib.Path):
+    root = tmp_path.joinpath("codex_pkg")
+    root.joinpath("sub").mkdir(parents=True)
+    root.joinpath("ns").mkdir()
+    root.joinpath("ns", "qux.py").write_text("QUX = 1\n")
+    root.joinpath("__init__.py").write_text("")
+    root.joinpath("foo.py").write_text("def foo(a: int) -> int:\n    return a\n")
+    root.joinpath("sub", "__init__.py").write_text("class Bar:\n    x = 1\n")
+    root.joinpath("sub", "foo.py").write_text("def sub_foo():\n    return 2\n")
+    sys.path.insert(0, str(tmp_path))
+    yield root
+    sys.path.remove(str(tmp_path))
+
+
+def test_codex_catalog_refresh_and_lookups(package: pathlib.Path):
+    storage = MemStorage()
+    catalog = PyCodexCatalogImpl(storage)
+    infos = catalog.refresh("codex_pkg")
+    # the empty __init__ has no info, the namespace package is walked.
+    assert set(infos.keys()) == {"codex_pkg.foo", "codex_pkg.ns.qux", "codex_pkg.sub", "codex_pkg.sub.foo"}
+    assert infos["codex_pkg.sub"].package
+    assert "def foo(a: int)" in infos["codex_pkg.foo"].interface
+    assert "codex_pkg" not in sys.modules
+    assert catalog.inspected == 5
+
+    assert [i.name for i in catalog.search("codex_pkg.sub")] == ["codex_pkg.sub", "codex_pkg.sub.foo"]
+    assert [i.name for i in catalog.search("codex_pkg.", limit=1)] == ["codex_pkg.foo"]
+    assert [i.name for i in catalog.find("foo")] == ["codex_pkg.foo", "codex_pkg.sub.foo"]
+    assert catalog.get("codex_pkg.sub.foo").file == str(package.joinpath("sub", "foo.py"))
+
+    # the next catalog of the storage inspects only the changed files.
+    foo = package.joinpath("foo.py")
+    stat = os.stat(foo)
+    os.utime(foo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    package.joinpath("sub", "foo.py").write_text("def sub_foo(b):\n    return b\n")
+    package.joinpath("baz.py").write_text("BAZ = 1\n")
+    other = PyCodexCatalogImpl(storage)
+    infos = other.refresh("codex_pkg")
+    assert other.inspected == 2
+    assert "def sub_foo(b)" in infos["codex_pkg.sub.foo"].interface
+    assert other.get("codex_pkg.baz") is not None
+
+    # the removed modules are dropped.
+    package.joinpath("baz.py").unlink()
+    other.refresh("codex_pkg")
+    assert other.get("codex_pkg.baz") is None
+    assert other.find("baz") == []
+
+
+def test_codex_generator_provider_uses_catalog(package: pathlib.Path):
+    from ghostos_container import Container
+    from ghostos.contracts.modules import Modules, DefaultModules
+    from ghostos.libraries.codex import PyCodexCatalog, PyCodexGenerator, PyCodexGeneratorProvider
+
+    container = Container()
+    container.set(Modules, DefaultModules())
+    catalog = PyCodexCatalogImpl(MemStorage())
+    container.set(PyCodexCatalog, catalog)
+    container.register(PyCodexGeneratorProvider())
+
+    generator = container.force_fetch(PyCodexGenerator)
+    infos = generator.generate("codex_pkg")
+    assert "codex_pkg.foo" in infos
+    # refreshed by the catalog, without importing the modules.
+    assert catalog.get("codex_pkg.foo") is not None
+    assert "codex_pkg.foo" not in sys.modules
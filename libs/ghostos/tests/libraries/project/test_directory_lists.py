@@ -0,0 +1,24 @@
+import pathlib
+
+from ghostos.libraries.project.directory_impl import DirectoryImpl
+
+
+def test_directory_lists_refreshed(tmp_path: pathlib.Path):
+    tmp_path.joinpath("a").mkdir()
+    tmp_path.joinpath("a", "x.py").write_text("")
+    tmp_path.joinpath("b.txt").write_text("")
+    d = DirectoryImpl(tmp_path)
+    listed = d.lists(recursion=1)
+    assert "📁 a" in listed
+    assert "    📄 x.py" in listed
+    assert d.lists(recursion=1) == listed
+
+    # the changes of this process are listed at once.
+    assert d.touch("c.txt", "the c file")
+    assert "📄 c.txt" in d.lists(recursion=1)
+
+    # the saved descriptions are rendered by the next instance.
+    d.describe("b.txt", "the b file")
+    d.save_data()
+    other = DirectoryImpl(tmp_path)
+    assert "📄 b.txt : `the b file`" in other.lists(recursion=1)
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from ghostos.libraries.terminal import PersistentShell, ShellPool
+from ghostos.libraries.terminal.terminal_impl import ShellTerminalImpl
+from ghostos.core.messages import new_basic_connection
+from ghostos.contracts.logger import FakeLogger
+
+
+@pytest.fixture
+def shell(tmp_path):
+    s = PersistentShell(cwd=str(tmp_path))
+    yield s
+    s.close()
+
+
+def test_shell_keeps_state(shell, tmp_path):
+    r = shell.run("mkdir foo && cd foo && export GHOSTOS_FOO=bar")
+    assert r.exit_code == 0
+    r = shell.run("pwd; echo $GHOSTOS_FOO")
+    assert r.stdout == f"{tmp_path / 'foo'}\nbar\n"
+    assert shell.cwd == str(tmp_path / "foo")
+    assert shell.commands == 2
+
+
+def test_shell_streams_and_exit_code(shell):
+    r = shell.run("echo out; echo err >&2; printf 'no newline'; exit_code=3; (exit $exit_code)")
+    assert r.exit_code == 3
+    assert r.stdout == "out\nno newline"
+    assert r.stderr == "err\n"
+
+    got = []
+    r = shell.run("for i in 1 2 3; do echo $i; done", on_output=lambda name, text: got.append((name, text)))
+    assert r.stdout == "1\n2\n3\n"
+    assert "".join(text for name, text in got if name == "stdout") == r.stdout
+
+
+def test_shell_does_not_read_commands(shell):
+    # the commands reading stdin get nothing, instead of the frame of the shell.
+    r = shell.run("cat")
+    assert r.exit_code == 0
+    assert r.stdout == ""
+    r = shell.run("echo 'unterminated")
+    assert r.exit_code != 0
+    assert shell.run("echo ok").stdout == "ok\n"
+
+
+def test_shell_timeout_kills_and_restarts(shell, tmp_path):
+    shell.run("cd /")
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        shell.run("sleep 10 | cat", timeout=0.3)
+    assert time.time() - start < 3
+    assert not shell.alive()
+    assert not shell.closed()
+    # restarted in the last working directory.
+    assert shell.run("pwd").stdout == "/\n"
+
+
+def test_shell_output_truncated(tmp_path):
+    s = PersistentShell(cwd=str(tmp_path), max_output=100)
+    try:
+        r = s.run("seq 1 10000")
+        assert len(r.stdout) < 200
+        assert r.stdout.startswith("1\n2\n")
+        assert r.stdout.endswith("10000\n")
+    finally:
+        s.close()
+
+
+def test_shell_pool_reuse(tmp_path):
+    pool = ShellPool(max_size=1)
+    a = pool.checkout("a", cwd=str(tmp_path))
+    a.run("export GHOSTOS_FOO=a")
+    pool.checkin("a", a)
+    assert pool.checkout("a") is a
+    pool.checkin("a", a)
+    b = pool.checkout("b")
+    pool.checkin("b", b)
+    # the least recently used shell is closed.
+    assert a.closed()
+    assert not a.alive()
+    pool.close()
+    assert b.closed()
+
+
+def test_shell_terminal_streams_messages(shell):
+    stream, receiver = new_basic_connection(timeout=5, complete_only=False)
+    terminal = ShellTerminalImpl(FakeLogger(), shell, stream_factory=lambda: stream)
+    with stream:
+        r = terminal.exec("echo hello", "echo world")
+    assert r.stdout == "hello\nworld\n"
+    with receiver:
+        messages = receiver.wait()
+    assert messages[-1].content == "hello\nworld\n"
+    with pytest.raises(RuntimeError):
+        terminal.exec("false")
+    terminal.close()
+    with pytest.raises(RuntimeError):
+        terminal.exec("echo closed")
@@ -0,0 +1,81 @@
+import time
+from typing import Iterable
+from unittest.mock import MagicMock
+
+from ghostos.abcd import Session
+from ghostos.contracts.pool import Pool, DefaultPool
+from ghostos.contracts.logger import get_console_logger
+from ghostos.core.llms import LLMs, LLMApi, Prompt
+from ghostos.core.messages import Role, Message, MessageStage
+from ghostos.core.runtime import EventBus, EventTypes, GoThreadInfo, TaskState
+from ghostos.framework.eventbuses.memimpl import MemEventBusImpl
+from ghostos.libraries.thinking.reasoning import ReasoningImpl
+from ghostos_container import Container
+
+
+def new_delayed_api(delay: float) -> MagicMock:
+    api = MagicMock(spec=LLMApi)
+
+    def deliver_chat_completion(prompt: Prompt, stream: bool, stage: str = "") -> Iterable[Message]:
+        time.sleep(delay)
+        yield Role.ASSISTANT.new(content="the deeper thought", stage=stage)
+
+    api.deliver_chat_completion.side_effect = deliver_chat_completion
+    return api
+
+
+class FakeLLMs:
+
+    def __init__(self, api: LLMApi):
+        self.api = api
+
+    def get_api(self, api_name: str = ""):
+        return self.api
+
+
+class FakeTask:
+    task_id = "task"
+    name = "task"
+    state = TaskState.RUNNING.value
+
+
+def new_session(api: LLMApi) -> MagicMock:
+    session = MagicMock(spec=Session)
+    session.container = Container()
+    session.container.set(Pool, DefaultPool(2))
+    session.container.set(EventBus, MemEventBusImpl())
+    session.container.set(LLMs, FakeLLMs(api))
+    session.logger = get_console_logger()
+    session.task = FakeTask()
+    event = EventTypes.INPUT.new(task_id="task", messages=[Role.USER.new(content="hello")])
+    session.get_truncated_thread.return_value = GoThreadInfo.new(event)
+    session.get_system_instructions.return_value = "you are a helpful assistant"
+    return session
+
+
+def test_async_reasoning_not_block_the_turn():
+    api = new_delayed_api(0.3)
+    session = new_session(api)
+    op = ReasoningImpl(session).async_reasoning("think deeper")
+
+    start = time.time()
+    assert op.run(session) is None
+    assert time.time() - start < 0.2
+    assert session.task.state == TaskState.WAITING.value
+
+    eventbus = session.container.force_fetch(EventBus)
+    assert eventbus.pop_task_event("task") is None
+    # the reasoning result arrives as an event of the task.
+    assert eventbus.pop_task_notification() is None
+    deadline = time.time() + 5
+    task_id = None
+    while task_id is None and time.time() < deadline:
+        task_id = eventbus.pop_task_notification()
+        time.sleep(0.01)
+    assert task_id == "task"
+    event = eventbus.pop_task_event("task")
+    assert event.type == EventTypes.ROTATE.value
+    assert event.messages[0].content == "the deeper thought"
+    assert event.messages[0].stage == MessageStage.REASONING.value
+    prompt = api.deliver_chat_completion.call_args[0][0]
+    assert prompt.added[-1].content == "think deeper"
@@ -7,7 +7,9 @@ from ghostos_moss.abcd import (
 )
 from ghostos_moss.modules import Modules, ImportWrapper, DefaultModules, DefaultModulesProvider
 from ghostos_moss.moss_impl import DefaultMOSSProvider
-from ghostos_moss.testsuite import MossTestSuite
+from ghostos_moss.testsuite import MossTestSuite, MossTestResult, MossTestReport
+from ghostos_moss.process_pool import MossProcessPool, MossExecutionError, MossExecutionTimeout
+from ghostos_moss.runtime_pool import MossRuntimePool, MossRuntimePoolProvider
 from ghostos_moss.pycontext import PyContext
 from ghostos_moss.exports import Exporter
 from ghostos_moss.magics import __is_subclass__, __is_instance__, MagicPrompter
@@ -27,7 +29,13 @@ __all__ = [
     'PyContext',
     # testing
     'DefaultMOSSProvider',
-    'MossTestSuite',
+    'MossTestSuite', 'MossTestResult', 'MossTestReport',
+
+    # process pool execution
+    'MossProcessPool', 'MossExecutionError', 'MossExecutionTimeout',
+
+    # reuse of the compiled modules
+    'MossRuntimePool', 'MossRuntimePoolProvider',
 
     'Modules', 'DefaultModules', 'DefaultModulesProvider',
 
@@ -24,6 +24,15 @@ if __name__ == '__test__':
         return plus(1, 2)
 
 
+    def test_print(moss: Moss) -> None:
+        print("hello")
+
+
+    def test_sleep(moss: Moss) -> None:
+        import time
+        time.sleep(10)
+
+
     __moss_test_cases__ = ['test_1', 'test_2', 'test_3']
     """用这个魔术变量, 可以让 MossTestSuit 批量调用三个方法测试. """
 
@@ -1,8 +1,7 @@
 import importlib
 import inspect
 from types import ModuleType, FunctionType
-from typing import Optional, Any, Dict, get_type_hints, Type, List, Callable, ClassVar, Union
-import io
+from typing import Optional, Any, Dict, get_type_hints, Type, List, Callable, ClassVar, Union, Tuple
 from typing_extensions import Self
 
 from ghostos_container import Container, Provider
@@ -13,17 +12,18 @@ from ghostos_moss.abcd import (
     Injection,
 )
 from ghostos_moss.modules import Modules, ImportWrapper, DefaultModules
+from ghostos_moss.runtime_pool import MossRuntimePool
 from ghostos_moss.prompts import reflect_code_prompt
 from ghostos_moss.pycontext import PyContext
 from ghostos_moss.exports import Exporter
 from ghostos_moss.magics import replace_magic_prompter
 from ghostos_moss.self_updater import SelfUpdaterProvider
 from ghostos_common.helpers import (
-    generate_module_and_attr_name, code_syntax_check, get_code_interface_str,
-    import_from_path,
+    generate_module_and_attr_name, get_module_syntax_checker, get_code_interface_str, md5,
+    import_from_path, BoundedStringIO, redirect_stdout_local,
 )
 from ghostos_moss.utils import is_typing, is_subclass
-from contextlib import contextmanager, redirect_stdout
+from contextlib import contextmanager
 
 IMPORT_FUTURE = "from __future__ import annotations"
 
@@ -50,11 +50,16 @@ class MossCompilerImpl(MossCompiler):
         self._container = Container(parent=container, name="moss")
         self._pycontext = pycontext if pycontext else PyContext()
         modules = container.get(Modules)
+        # the stateless default modules created for each compiler are the same one for the pool.
+        self._modules_key = id(modules) if modules is not None else DefaultModules.__name__
         if modules is None:
             modules = DefaultModules()
             self._container.set(Modules, modules)
         self._modules: Modules = modules
         self._default_moss_type = Moss
+        # the compiled modules are reused from the pool if it is bound.
+        self._pool: Optional[MossRuntimePool] = container.get(MossRuntimePool)
+        self._pooled = False
 
         # prepare values.
         self._predefined_locals: Dict[str, Any] = {
@@ -128,6 +133,13 @@ class MossCompilerImpl(MossCompiler):
             modulename = origin_modulename if origin_modulename else "__moss__"
 
         code = self.pycontext_code()
+        pool_key = self._pool_key(modulename, filename, code) if self._pool is not None else None
+        if pool_key is not None:
+            module = self._pool.checkout(pool_key)
+            if module is not None:
+                self._pooled = True
+                return module
+
         # 创建临时模块.
         module = MossTempModuleType(modulename)
         MossTempModuleType.__instance_count__ += 1
@@ -141,8 +153,35 @@ class MossCompilerImpl(MossCompiler):
         if origin is not None:
             updating = self._filter_origin(origin)
             module.__dict__.update(updating)
+        if pool_key is not None:
+            self._pool.add(pool_key, module)
+            self._pooled = True
         return module
 
+    def _pool_key(self, modulename: str, filename: str, code: str) -> Optional[Tuple]:
+        """
+        :return: None if the module can not be pooled.
+        """
+        # the predefined locals are in the compiled namespace, the import wrapper is the same for the same modules.
+        # the types are kept by the key, so they are never recycled; the other values are not pooled.
+        local_values = []
+        for name, value in self._predefined_locals.items():
+            if isinstance(value, ImportWrapper):
+                local_values.append((name, self._modules_key))
+            elif isinstance(value, type):
+                local_values.append((name, value))
+            else:
+                return None
+        local_values.sort(key=lambda item: item[0])
+        return (
+            modulename,
+            filename,
+            md5(code),
+            generate_module_and_attr_name(self._default_moss_type),
+            tuple(local_values),
+            tuple(sorted(self._injections.keys())),
+        )
+
     @staticmethod
     def _filter_origin(origin: ModuleType) -> Dict[str, Any]:
         result = {}
@@ -172,6 +211,7 @@ class MossCompilerImpl(MossCompiler):
             injections=self._injections,
             attr_prompts=attr_prompts,
             ignored_modules=self._ignored_modules,
+            release=self._pool.checkin if self._pooled else None,
         )
 
     def pycontext_code(self) -> str:
@@ -258,6 +298,8 @@ def new_moss_stub(cls: Type[Moss], container: Container, pycontext: PyContext, p
 
 
 class MossRuntimeImpl(MossRuntime, MossPrompter):
+    std_output_max_size: int = 100_000
+    """max characters of the std output kept by a runtime, the middle of a longer output is truncated."""
 
     def __init__(
             self, *,
@@ -268,15 +310,20 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
             injections: Dict[str, Any],
             attr_prompts: Dict[str, str],
             ignored_modules: List[str],
+            release: Optional[Callable[[ModuleType], None]] = None,
     ):
+        """
+        :param release: called with the compiled module when the runtime is closed, returns it to the pool.
+        """
         self._container = container
+        self._release = release
         self._modules: Modules = container.force_fetch(Modules)
         self._compiled = compiled
         self._source_code = source_code
         self._pycontext = pycontext
         self._container.set(PyContext, self._pycontext)
         self._injections = injections
-        self._runtime_std_output = ""
+        self._runtime_std_output = BoundedStringIO(self.std_output_max_size)
         # 初始化之后不应该为 None 的值.
         self._built: bool = False
         self._moss_prompt: Optional[str] = None
@@ -355,9 +402,9 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
         return self
 
     def lint_exec_code(self, code: str) -> Optional[str]:
-        source_code = self._source_code
-        new_code = source_code + "\n\n" + code.strip()
-        return code_syntax_check(new_code)
+        # the parsed module is cached and shared by the runtimes of the same source.
+        checker = get_module_syntax_checker(self._source_code)
+        return checker.check(code.strip())
 
     def module(self) -> ModuleType:
         return self._compiled
@@ -372,21 +419,18 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
         return self._pycontext
 
     def dump_std_output(self) -> str:
-        return self._runtime_std_output
+        return self._runtime_std_output.getvalue()
 
     def pprint(self, *args: Any, **kwargs: Any) -> None:
         from pprint import pprint
-        out = io.StringIO()
-        with redirect_stdout(out):
+        with redirect_stdout_local(self._runtime_std_output):
             pprint(*args, **kwargs)
-        self._runtime_std_output += str(out.getvalue())
 
     @contextmanager
     def redirect_stdout(self):
-        buffer = io.StringIO()
-        with redirect_stdout(buffer):
+        # only the output of the current context is captured, other runtimes can run concurrently.
+        with redirect_stdout_local(self._runtime_std_output):
             yield
-            self._runtime_std_output += str(buffer.getvalue())
 
     def get_source_code(
             self,
@@ -593,6 +637,10 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
             if isinstance(val, Injection):
                 val.on_destroy()
         self._container.shutdown()
+        if self._release is not None:
+            release = self._release
+            self._release = None
+            release(self._compiled)
 
     def __del__(self):
         if not self._closed:
@@ -0,0 +1,349 @@
+import os
+import time
+import pickle
+import traceback
+import multiprocessing
+from multiprocessing.connection import Connection
+from threading import Condition
+from typing import Optional, List, Dict, Any, Tuple
+
+from ghostos_moss.abcd import Execution
+from ghostos_moss.pycontext import PyContext
+
+__all__ = [
+    'MossProcessPool',
+    'MossExecutionError', 'MossExecutionTimeout',
+]
+
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class MossExecutionError(RuntimeError):
+    """
+    the execution failed in the worker process.
+    the exception of the worker may not be picklable, so its type, message and traceback are reported as text.
+    """
+
+    def __init__(self, message: str, remote_traceback: str = ""):
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+class MossExecutionTimeout(MossExecutionError):
+    """
+    the execution exceeded the time limit, and the worker process is killed.
+    """
+    pass
+
+
+def _set_limits(cpu_time: Optional[int], memory_limit: Optional[int]) -> List[Tuple[int, Tuple[int, int]]]:
+    """
+    set soft resource limits of the worker process for one call.
+    :return: the previous limits to restore.
+    """
+    if cpu_time is None and memory_limit is None:
+        return []
+    try:
+        import resource
+    except ImportError:
+        # resource limits are not supported on this platform, only the time limit works.
+        return []
+    restores = []
+    if cpu_time is not None:
+        previous = resource.getrlimit(resource.RLIMIT_CPU)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # RLIMIT_CPU counts the whole process, so the budget is added to the used time.
+        soft = int(usage.ru_utime + usage.ru_stime) + cpu_time
+        if previous[1] != resource.RLIM_INFINITY:
+            soft = min(soft, previous[1])
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, previous[1]))
+        restores.append((resource.RLIMIT_CPU, previous))
+    if memory_limit is not None:
+        previous = resource.getrlimit(resource.RLIMIT_AS)
+        soft = memory_limit
+        if previous[1] != resource.RLIM_INFINITY:
+            soft = min(soft, previous[1])
+        resource.setrlimit(resource.RLIMIT_AS, (soft, previous[1]))
+        restores.append((resource.RLIMIT_AS, previous))
+    return restores
+
+
+def _restore_limits(restores: List[Tuple[int, Tuple[int, int]]]) -> None:
+    if not restores:
+        return
+    import resource
+    for kind, limits in restores:
+        resource.setrlimit(kind, limits)
+
+
+def _worker_main(
+        conn: Connection,
+        preload: List[str],
+        container_maker: Optional[str],
+        reuse_modules: bool,
+) -> None:
+    """
+    the loop of the worker process. receive pickled tasks and send pickled results until the connection is closed.
+    """
+    from importlib import import_module
+    from ghostos_common.helpers import import_from_path
+    from ghostos_moss import moss_container, MossCompiler, MossRuntimePool
+
+    # import the modules before any task, so the calls are warm.
+    for modulename in preload:
+        import_module(modulename)
+    make_container = import_from_path(container_maker) if container_maker else moss_container
+    container = make_container()
+    if reuse_modules and not container.bound(MossRuntimePool):
+        container.set(MossRuntimePool, MossRuntimePool())
+
+    while True:
+        try:
+            task = pickle.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+        try:
+            restores = _set_limits(task["cpu_time"], task["memory_limit"])
+            try:
+                started = time.perf_counter()
+                compiler = container.force_fetch(MossCompiler)
+                compiler.join_context(PyContext(**task["pycontext"]))
+                runtime = compiler.compile(task["modulename"])
+                compiled = time.perf_counter()
+                try:
+                    executed = runtime.execute(
+                        target=task["target"],
+                        code=task["code"],
+                        local_args=task["local_args"],
+                        local_kwargs=task["local_kwargs"],
+                        args=task["args"],
+                        kwargs=task["kwargs"],
+                    )
+                finally:
+                    runtime.close()
+                timings = {"compile": compiled - started, "exec": time.perf_counter() - compiled}
+            finally:
+                _restore_limits(restores)
+            try:
+                returns = pickle.dumps(executed.returns, protocol=_PICKLE_PROTOCOL)
+            except Exception as e:
+                raise TypeError(f"returns of the target `{task['target']}` is not picklable: {e}")
+            result = {
+                "returns": returns,
+                "std_output": executed.std_output,
+                "pycontext": executed.pycontext.model_dump(exclude_defaults=True),
+                "timings": timings,
+            }
+        except BaseException as e:
+            result = {
+                "error": f"{type(e).__name__}: {e}",
+                "traceback": traceback.format_exc(),
+            }
+        conn.send_bytes(pickle.dumps(result, protocol=_PICKLE_PROTOCOL))
+
+
+class _Worker:
+
+    def __init__(self, ctx, preload: List[str], container_maker: Optional[str], reuse_modules: bool):
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, preload, container_maker, reuse_modules),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        # closing the connection ends the loop of the worker.
+        self.conn.close()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class MossProcessPool:
+    """
+    execute MOSS code in a pool of warm worker processes.
+
+    the workers are started in advance and import the `preload` modules once,
+    each call ships the pycontext in and the Execution out in pickled bytes.
+    CPU-bound code runs on multiple cores without holding the GIL of the caller,
+    and a worker that exceeds its limits is killed and replaced without affecting the caller process.
+
+    the worker builds its own container by `container_maker`,
+    so the injections of the moss module must be resolvable without the objects of the caller process.
+    """
+
+    def __init__(
+            self,
+            workers: int = 0,
+            *,
+            preload: Optional[List[str]] = None,
+            container_maker: Optional[str] = None,
+            timeout: Optional[float] = None,
+            cpu_time: Optional[int] = None,
+            memory_limit: Optional[int] = None,
+            max_tasks_per_worker: int = 0,
+            reuse_modules: bool = False,
+            start_method: str = "spawn",
+    ):
+        """
+        :param workers: number of the worker processes, 0 means the cpu count.
+        :param preload: modules imported by each worker at start.
+        :param container_maker: import path of a `Callable[[], Container]` for the workers, default moss_container.
+        :param timeout: default wall time limit in seconds of each call.
+        :param cpu_time: default cpu time limit in seconds of each call.
+        :param memory_limit: default address space limit in bytes of each call.
+        :param max_tasks_per_worker: replace the worker after it runs the number of calls, 0 means never.
+        :param reuse_modules: each worker reuses its compiled modules by a MossRuntimePool.
+        :param start_method: the multiprocessing start method.
+        """
+        self._ctx = multiprocessing.get_context(start_method)
+        self._size = workers if workers > 0 else (os.cpu_count() or 1)
+        self._preload = list(preload) if preload else []
+        self._container_maker = container_maker
+        self._timeout = timeout
+        self._cpu_time = cpu_time
+        self._memory_limit = memory_limit
+        self._max_tasks = max_tasks_per_worker
+        self._reuse_modules = reuse_modules
+        self._idle: List[_Worker] = []
+        self._all: List[_Worker] = []
+        self._cond = Condition()
+        self._closed = False
+        for _ in range(self._size):
+            self._spawn()
+
+    def _spawn(self) -> None:
+        worker = _Worker(self._ctx, self._preload, self._container_maker, self._reuse_modules)
+        self._all.append(worker)
+        self._idle.append(worker)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while not self._idle and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("moss process pool is closed")
+            return self._idle.pop()
+
+    def _release(self, worker: _Worker, broken: bool) -> None:
+        with self._cond:
+            if self._closed:
+                worker.kill()
+                return
+            if broken or (self._max_tasks > 0 and worker.tasks >= self._max_tasks):
+                self._all.remove(worker)
+                if broken:
+                    worker.kill()
+                else:
+                    worker.stop()
+                self._spawn()
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def execute(
+            self,
+            pycontext: PyContext,
+            *,
+            target: str,
+            code: Optional[str] = None,
+            modulename: Optional[str] = None,
+            local_args: Optional[List[str]] = None,
+            local_kwargs: Optional[Dict[str, str]] = None,
+            args: Optional[List[Any]] = None,
+            kwargs: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None,
+            cpu_time: Optional[int] = None,
+            memory_limit: Optional[int] = None,
+            timings: Optional[Dict[str, float]] = None,
+    ) -> Execution:
+        """
+        compile the pycontext in a worker and execute the code, same as MossRuntime.execute.
+        :param pycontext: the pycontext to compile
+        :param target: same as MossRuntime.execute
+        :param code: same as MossRuntime.execute
+        :param modulename: the modulename of the compiled runtime, default the pycontext module.
+        :param local_args: same as MossRuntime.execute
+        :param local_kwargs: same as MossRuntime.execute
+        :param args: picklable args of the target
+        :param kwargs: picklable kwargs of the target
+        :param timeout: wall time limit in seconds, default the pool's
+        :param cpu_time: cpu time limit in seconds, default the pool's
+        :param memory_limit: address space limit in bytes, default the pool's
+        :param timings: filled with the `compile` and `exec` seconds of the worker if given.
+        :exception MossExecutionError: the execution failed or the worker died.
+        :exception MossExecutionTimeout: the execution exceeded the time limit.
+        """
+        timeout = timeout if timeout is not None else self._timeout
+        task = pickle.dumps({
+            "pycontext": pycontext.model_dump(exclude_defaults=True),
+            "modulename": modulename,
+            "target": target,
+            "code": code,
+            "local_args": local_args,
+            "local_kwargs": local_kwargs,
+            "args": args,
+            "kwargs": kwargs,
+            "cpu_time": cpu_time if cpu_time is not None else self._cpu_time,
+            "memory_limit": memory_limit if memory_limit is not None else self._memory_limit,
+        }, protocol=_PICKLE_PROTOCOL)
+
+        worker = self._acquire()
+        broken = True
+        try:
+            worker.tasks += 1
+            try:
+                worker.conn.send_bytes(task)
+                if not worker.conn.poll(timeout):
+                    raise MossExecutionTimeout(f"moss execution of `{target}` exceeded {timeout} seconds")
+                result = pickle.loads(worker.conn.recv_bytes())
+            except (EOFError, OSError):
+                worker.process.join(1.0)
+                raise MossExecutionError(
+                    f"moss worker died during the execution of `{target}`, exit code {worker.process.exitcode}",
+                )
+            broken = False
+        finally:
+            self._release(worker, broken)
+
+        if "error" in result:
+            raise MossExecutionError(result["error"], result["traceback"])
+        if timings is not None:
+            timings.update(result["timings"])
+        return Execution(
+            pickle.loads(result["returns"]),
+            result["std_output"],
+            PyContext(**result["pycontext"]),
+        )
+
+    def size(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._cond.notify_all()
+        # busy workers are killed when they are released.
+        for worker in idle:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,137 @@
+import inspect
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from weakref import WeakKeyDictionary
+from types import ModuleType
+from typing import Optional, Dict, List, Tuple, Hashable, Any, Type
+
+from ghostos_container import Provider, Container
+
+__all__ = ['MossRuntimePool', 'MossRuntimePoolProvider']
+
+
+class MossRuntimePool:
+    """
+    pool of the compiled modules of the moss runtimes.
+    compiling a runtime imports and executes the whole module source, the pool keeps the compiled module
+    with a snapshot of its namespace, so the next runtime of the same key only restores the snapshot.
+    the moss instance and its injections are still built for each runtime, since they are bound to the container.
+    the builtin containers (list, dict, set) of the module and of the classes defined in it are restored by copies,
+    other module level objects mutated by the executed code are not restored.
+    so the pool is opt-in, bind it only for the modules whose executed code does not mutate other objects.
+    """
+
+    def __init__(self, max_idle: int = 4, max_keys: int = 64):
+        """
+        :param max_idle: max count of the idle modules of one key
+        :param max_keys: max count of the keys, the least recently used are dropped
+        """
+        self._max_idle = max_idle
+        self._max_keys = max_keys
+        self._idle: "OrderedDict[Hashable, List[ModuleType]]" = OrderedDict()
+        # the modules never checked in are dropped with their snapshots.
+        self._snapshots: "WeakKeyDictionary[ModuleType, _Snapshot]" = WeakKeyDictionary()
+        self._lock = Lock()
+        self.compiled = 0
+        """count of the modules compiled for the pool"""
+        self.reused = 0
+        """count of the modules checked out from the pool"""
+
+    def checkout(self, key: Hashable) -> Optional[ModuleType]:
+        """
+        take an idle module of the key, the caller owns it until checkin.
+        :return: None if there is no idle module, then the caller compiles a new one and adds it.
+        """
+        with self._lock:
+            idle = self._idle.get(key, None)
+            if not idle:
+                return None
+            self._idle.move_to_end(key)
+            self.reused += 1
+            return idle.pop()
+
+    def add(self, key: Hashable, module: ModuleType) -> None:
+        """
+        add a new compiled module to the pool, its namespace is the snapshot restored at each checkin.
+        the module is owned by the caller until checkin.
+        """
+        snapshot = _Snapshot(key, module)
+        with self._lock:
+            self._snapshots[module] = snapshot
+            self.compiled += 1
+
+    def checkin(self, module: ModuleType) -> None:
+        """
+        restore the module to its snapshot and make it idle.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(module, None)
+        if snapshot is None:
+            return
+        snapshot.restore(module)
+        with self._lock:
+            idle = self._idle.setdefault(snapshot.key, [])
+            self._idle.move_to_end(snapshot.key)
+            if len(idle) < self._max_idle:
+                idle.append(module)
+            else:
+                del self._snapshots[module]
+            while len(self._idle) > self._max_keys:
+                self._idle.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._snapshots.clear()
+
+
+_Containers = (list, dict, set)
+
+
+class _Snapshot:
+    """
+    the namespace of a compiled module, with the copies of its mutable containers.
+    """
+
+    def __init__(self, key: Hashable, module: ModuleType):
+        self.key = key
+        self.namespace = dict(module.__dict__)
+        self.values: Dict[str, Any] = {}
+        self.class_values: List[Tuple[type, str, Any]] = []
+        for name, value in self.namespace.items():
+            if name.startswith("__"):
+                # __builtins__ and the other magic names are shared.
+                continue
+            if isinstance(value, _Containers):
+                self.values[name] = deepcopy(value)
+            elif inspect.isclass(value) and value.__module__ == module.__name__:
+                for attr, attr_value in list(vars(value).items()):
+                    if isinstance(attr_value, _Containers):
+                        self.class_values.append((value, attr, deepcopy(attr_value)))
+
+    def restore(self, module: ModuleType) -> None:
+        # restore in place, the functions of the module keep the namespace as their globals.
+        namespace = module.__dict__
+        namespace.clear()
+        namespace.update(self.namespace)
+        for name, value in self.values.items():
+            namespace[name] = deepcopy(value)
+        for cls, attr, value in self.class_values:
+            setattr(cls, attr, deepcopy(value))
+
+
+class MossRuntimePoolProvider(Provider[MossRuntimePool]):
+
+    def __init__(self, max_idle: int = 4, max_keys: int = 64):
+        self._max_idle = max_idle
+        self._max_keys = max_keys
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[MossRuntimePool]:
+        return MossRuntimePool
+
+    def factory(self, con: Container) -> Optional[MossRuntimePool]:
+        return MossRuntimePool(self._max_idle, self._max_keys)
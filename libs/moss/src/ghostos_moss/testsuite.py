@@ -1,9 +1,57 @@
-from typing import List, Dict, Optional, Callable
+import os
+import time
+from typing import List, Dict, Optional, Callable, Tuple, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pydantic import BaseModel, Field
 from ghostos_moss.abcd import MossCompiler, Execution
 from ghostos_moss.pycontext import PyContext
+from ghostos_moss.runtime_pool import MossRuntimePool
+from ghostos_moss.process_pool import MossProcessPool, MossExecutionTimeout
 from ghostos_container import Container
-from queue import Queue
-from threading import Thread
+from queue import Queue, Empty
+from threading import Thread, Event
+
+__all__ = ['MossTestSuite', 'MossTestResult', 'MossTestReport']
+
+
+class MossTestResult(BaseModel):
+    """
+    result of one test function of a moss module.
+    """
+    name: str = Field(description="the name of the test function")
+    passed: bool = Field(default=False)
+    timeout: bool = Field(default=False, description="the test exceeded its time limit")
+    returns: str = Field(default="", description="repr of the returned value")
+    std_output: str = Field(default="", description="the output of the test only")
+    error: str = Field(default="")
+    compile_time: float = Field(default=0.0, description="seconds to compile the runtime of the test")
+    exec_time: float = Field(default=0.0, description="seconds to execute the test function")
+    execution: Optional[Execution] = Field(default=None, exclude=True)
+
+
+class MossTestReport(BaseModel):
+    """
+    aggregated results of the test functions of a moss module, in the order of completion.
+    """
+    modulename: str
+    mode: str = Field(description="`process` or `thread`")
+    workers: int
+    compile_time: float = Field(description="seconds to compile the module once before the tests")
+    wall_time: float = Field(default=0.0)
+    total_compile_time: float = Field(default=0.0)
+    total_exec_time: float = Field(default=0.0)
+    passed: int = Field(default=0)
+    failed: int = Field(default=0)
+    results: List[MossTestResult] = Field(default_factory=list)
+
+    def add(self, result: MossTestResult) -> None:
+        self.results.append(result)
+        self.total_compile_time += result.compile_time
+        self.total_exec_time += result.exec_time
+        if result.passed:
+            self.passed += 1
+        else:
+            self.failed += 1
 
 
 class MossTestSuite:
@@ -95,39 +143,226 @@ class MossTestSuite:
         :param modulename: 目标 module 的名字.
         :param funcs: 需要运行的 funcs.
         :param test_module_name: 测试时创建的临时 module_name.
-        :return: 从队列中逐个取出.
+        :exception RuntimeError: 任何一个测试失败, 在所有测试结束后抛出.
+        """
+        failed: List[MossTestResult] = []
+
+        def on_result(result: MossTestResult) -> None:
+            if result.passed:
+                callback(result.name, result.execution)
+            else:
+                failed.append(result)
+
+        self.run_tests(
+            modulename=modulename,
+            targets=funcs,
+            test_modulename=test_module_name,
+            processes=False,
+            callback=on_result,
+        )
+        if failed:
+            errors = "; ".join(f"{r.name}: {r.error}" for r in failed)
+            raise RuntimeError(f"moss tests of {modulename} failed: {errors}")
+
+    def run_tests(
+            self, *,
+            modulename: str,
+            targets: Optional[List[str]] = None,
+            test_modulename: str = "__test__",
+            workers: int = 0,
+            timeout: Optional[float] = None,
+            processes: bool = True,
+            container_maker: Optional[str] = None,
+            callback: Optional[Callable[[MossTestResult], None]] = None,
+    ) -> MossTestReport:
+        """
+        compile the module once, then run the test functions by a bounded pool of workers.
+        each test runs in its own runtime, so its output is captured alone.
+        the test functions are called with the `moss` argument.
+
+        :param modulename: the target moss module
+        :param targets: the test functions, default the names in `__moss_test_cases__`
+        :param test_modulename: the modulename that MossCompiler shall build.
+        :param workers: max count of the tests running at the same time, 0 means the cpu count.
+        :param timeout: wall time limit in seconds of each test.
+        :param processes: run the tests in worker processes, fall back to threads if the processes can not start.
+            the workers build their own container by `container_maker`, so use threads for the injections
+            that only the container of this suite provides.
+        :param container_maker: same as MossProcessPool
+        :param callback: called with each result in the order of completion
+        :return: the report of all the tests
         """
-        queue = Queue()
-
-        def runner(fn: str, q: Queue) -> None:
-            """
-            测试用 queue 来阻塞返回结果.
-            :param fn: 要测试的方法名.
-            :param q: 队列
-            :param c: condition
-            :param
-            """
-            r = self.run(
-                modulename=modulename,
-                test_module_name=test_module_name,
-                target=fn,
-                args=['moss'],
-            )
-            q.put((fn, r))
-
-        threads = []
-        for func in funcs:
-            t = Thread(target=runner, args=(func, queue))
-            t.start()
-            threads.append(t)
-
-        i = 0
-        while i < len(threads):
-            result = queue.get(block=True)  # 获取数据
-            name, moss_result = result
-            callback(name, moss_result)
-            i += 1
-
-        queue.task_done()
-        for t in threads:
-            t.join()
+        container = Container(parent=self._container, name="moss_test_suite")
+        if not container.bound(MossRuntimePool):
+            # the modules of the tests are checked out of the pool instead of compiled again.
+            container.set(MossRuntimePool, MossRuntimePool(max_idle=workers if workers > 0 else (os.cpu_count() or 1)))
+        pycontext = PyContext(module=modulename)
+
+        started = time.perf_counter()
+        compiler = container.force_fetch(MossCompiler)
+        compiler.join_context(pycontext)
+        with compiler.compile(test_modulename) as runtime:
+            if not targets:
+                targets = runtime.module().__dict__.get(self.MAGIC_TEST_CASES_ATTR_NAME)
+                if not isinstance(targets, List):
+                    raise AttributeError(f"Module {modulename} has no {self.MAGIC_TEST_CASES_ATTR_NAME} attribute")
+        if not targets:
+            raise AttributeError(f"test cases are empty")
+        compile_time = time.perf_counter() - started
+
+        size = min(workers if workers > 0 else (os.cpu_count() or 1), len(targets))
+        pool = None
+        if processes:
+            try:
+                pool = MossProcessPool(
+                    size,
+                    preload=[modulename],
+                    container_maker=container_maker,
+                    timeout=timeout,
+                    reuse_modules=True,
+                )
+            except (OSError, ImportError, NotImplementedError):
+                pool = None
+        report = MossTestReport(
+            modulename=modulename,
+            mode="process" if pool is not None else "thread",
+            workers=size,
+            compile_time=compile_time,
+        )
+        if pool is not None:
+            with pool:
+                results = self._run_in_processes(pool, pycontext, test_modulename, targets, size)
+                self._collect(report, results, callback)
+        else:
+            results = self._run_in_threads(container, pycontext, test_modulename, targets, size, timeout)
+            self._collect(report, results, callback)
+        report.wall_time = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def _collect(
+            report: MossTestReport,
+            results: Iterable[MossTestResult],
+            callback: Optional[Callable[[MossTestResult], None]],
+    ) -> None:
+        for result in results:
+            report.add(result)
+            if callback is not None:
+                callback(result)
+
+    @staticmethod
+    def _run_in_processes(
+            pool: MossProcessPool,
+            pycontext: PyContext,
+            test_modulename: str,
+            targets: List[str],
+            size: int,
+    ) -> Iterable[MossTestResult]:
+
+        def run(target: str) -> MossTestResult:
+            timings = {}
+            try:
+                executed = pool.execute(
+                    pycontext,
+                    target=target,
+                    modulename=test_modulename,
+                    local_args=['moss'],
+                    timings=timings,
+                )
+            except MossExecutionTimeout as e:
+                return MossTestResult(name=target, timeout=True, error=str(e))
+            except Exception as e:
+                return MossTestResult(name=target, error=str(e))
+            return _passed(target, executed, timings["compile"], timings["exec"])
+
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(run, target) for target in targets]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def _run_in_threads(
+            container: Container,
+            pycontext: PyContext,
+            test_modulename: str,
+            targets: List[str],
+            size: int,
+            timeout: Optional[float],
+    ) -> Iterable[MossTestResult]:
+        tasks: Queue = Queue()
+        outputs: Queue = Queue()
+        for index, target in enumerate(targets):
+            tasks.put((index, target))
+
+        def run(target: str) -> MossTestResult:
+            try:
+                begin = time.perf_counter()
+                compiler = container.force_fetch(MossCompiler)
+                compiler.join_context(pycontext)
+                runtime = compiler.compile(test_modulename)
+                compiled = time.perf_counter()
+                with runtime:
+                    executed = runtime.execute(target=target, local_args=['moss'])
+                return _passed(target, executed, compiled - begin, time.perf_counter() - compiled)
+            except Exception as e:
+                return MossTestResult(name=target, error=f"{type(e).__name__}: {e}")
+
+        def worker(abandoned: Event) -> None:
+            while not abandoned.is_set():
+                try:
+                    index, target = tasks.get_nowait()
+                except Empty:
+                    return
+                outputs.put(("start", index, abandoned))
+                outputs.put(("done", index, run(target)))
+
+        def spawn() -> None:
+            Thread(target=worker, args=(Event(),), daemon=True).start()
+
+        for _ in range(size):
+            spawn()
+
+        # the indexes of the running tests, with their deadlines and the flags of their workers.
+        running: Dict[int, Tuple[float, Event]] = {}
+        finished = 0
+        while finished < len(targets):
+            wait = None
+            if timeout is not None and running:
+                wait = max(0.0, min(deadline for deadline, _ in running.values()) - time.perf_counter())
+            try:
+                kind, index, value = outputs.get(timeout=wait)
+            except Empty:
+                now = time.perf_counter()
+                for index, (deadline, abandoned) in list(running.items()):
+                    if deadline <= now:
+                        # the thread can not be killed, it is abandoned and replaced to keep the pool size.
+                        abandoned.set()
+                        del running[index]
+                        target = targets[index]
+                        finished += 1
+                        spawn()
+                        yield MossTestResult(
+                            name=target,
+                            timeout=True,
+                            error=f"moss test `{target}` exceeded {timeout} seconds",
+                        )
+                continue
+            if kind == "start":
+                deadline = time.perf_counter() + timeout if timeout is not None else 0.0
+                running[index] = (deadline, value)
+            elif index in running:
+                del running[index]
+                finished += 1
+                yield value
+
+
+def _passed(name: str, executed: Execution, compile_time: float, exec_time: float) -> MossTestResult:
+    return MossTestResult(
+        name=name,
+        passed=True,
+        returns=repr(executed.returns),
+        std_output=executed.std_output,
+        compile_time=compile_time,
+        exec_time=exec_time,
+        execution=executed,
+    )
@@ -168,3 +168,30 @@ def test_moss_gc():
     assert MossRuntime.instance_count == 0
     assert MossStub.instance_count <= moss_stub_count
     assert Container.instance_count < (10 + container_count)
+
+
+def test_runtime_redirect_stdout_concurrently():
+    import threading
+    container = moss_container()
+    runtimes = []
+    for i in range(3):
+        compiler = container.force_fetch(MossCompiler)
+        compiler.join_context(PyContext(module=baseline.__name__))
+        runtimes.append(compiler.compile(None))
+
+    barrier = threading.Barrier(len(runtimes))
+
+    def run(idx: int, rtm: MossRuntime):
+        with rtm.redirect_stdout():
+            barrier.wait()
+            for _ in range(20):
+                print(f"runtime{idx}")
+
+    threads = [threading.Thread(target=run, args=(i, rtm)) for i, rtm in enumerate(runtimes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i, rtm in enumerate(runtimes):
+        assert rtm.dump_std_output() == f"runtime{i}\n" * 20
+        rtm.close()
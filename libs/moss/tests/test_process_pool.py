@@ -0,0 +1,41 @@
+import pytest
+
+from ghostos_moss import MossProcessPool, MossExecutionError, MossExecutionTimeout, PyContext
+from ghostos_moss.examples import suite_example
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with MossProcessPool(2, preload=[suite_example.__name__]) as p:
+        yield p
+
+
+def test_process_pool_execute(pool):
+    pycontext = PyContext(module=suite_example.__name__)
+    code = """
+def main(moss) -> int:
+    print("hello")
+    return plus(1, 2)
+"""
+    executed = pool.execute(pycontext, target="main", code=code, local_args=["moss"])
+    assert executed.returns == 3
+    assert executed.std_output == "hello\n"
+    assert executed.pycontext.executed
+    assert executed.pycontext.execute_code == code
+
+
+def test_process_pool_error(pool):
+    pycontext = PyContext(module=suite_example.__name__)
+    with pytest.raises(MossExecutionError) as e:
+        pool.execute(pycontext, target="main", code="def main():\n    raise ValueError('boom')")
+    assert "ValueError: boom" in str(e.value)
+    assert "boom" in e.value.remote_traceback
+
+
+def test_process_pool_timeout(pool):
+    pycontext = PyContext(module=suite_example.__name__)
+    with pytest.raises(MossExecutionTimeout):
+        pool.execute(pycontext, target="main", code="def main():\n    while True:\n        pass", timeout=0.5)
+    # the killed worker is replaced.
+    executed = pool.execute(pycontext, target="plus", args=[2, 3])
+    assert executed.returns == 5
@@ -0,0 +1,103 @@
+import time
+
+from ghostos_moss import moss_container, MossCompiler, MossRuntimePool, MossRuntimePoolProvider, PyContext
+from ghostos_moss.examples import suite_example
+
+
+def compile_runtime(container, **injections):
+    compiler = container.force_fetch(MossCompiler)
+    compiler.join_context(PyContext(module=suite_example.__name__))
+    if injections:
+        compiler.injects(**injections)
+    return compiler.compile(None)
+
+
+def test_runtime_pool_reuse_module():
+    container = moss_container()
+    container.register(MossRuntimePoolProvider())
+    pool = container.force_fetch(MossRuntimePool)
+
+    with compile_runtime(container, foo=1) as runtime:
+        module = runtime.module()
+        executed = runtime.execute(target="main", code="value = 1\ndef main(moss):\n    return plus(value, moss.foo)",
+                                   local_args=["moss"])
+        assert executed.returns == 2
+        assert "value" in module.__dict__
+
+    # the module is restored and reused, the moss is built again.
+    with compile_runtime(container, foo=2) as runtime:
+        assert runtime.module() is module
+        assert "value" not in module.__dict__
+        assert runtime.moss().foo == 2
+        executed = runtime.execute(target="plus", args=[1, 2])
+        assert executed.returns == 3
+    assert pool.compiled == 1
+    assert pool.reused == 1
+
+    # different injections compile another module.
+    with compile_runtime(container, bar=1) as runtime:
+        assert runtime.module() is not module
+    assert pool.compiled == 2
+
+
+def test_runtime_pool_concurrent_checkout():
+    container = moss_container()
+    container.register(MossRuntimePoolProvider())
+    pool = container.force_fetch(MossRuntimePool)
+    first = compile_runtime(container)
+    second = compile_runtime(container)
+    assert first.module() is not second.module()
+    first.close()
+    second.close()
+    assert pool.compiled == 2
+    with compile_runtime(container) as runtime:
+        assert runtime.module() in (first.module(), second.module())
+    assert pool.compiled == 2
+
+
+def test_runtime_pool_event_storm():
+    events = 30
+
+    def storm(container):
+        start = time.time()
+        for i in range(events):
+            with compile_runtime(container) as runtime:
+                runtime.execute(target="plus", args=[i, 1])
+        return time.time() - start
+
+    without_pool = storm(moss_container())
+    container = moss_container()
+    container.register(MossRuntimePoolProvider())
+    with_pool = storm(container)
+    assert container.force_fetch(MossRuntimePool).compiled == 1
+    assert with_pool < without_pool
+
+
+def test_runtime_pool_with_locals():
+    container = moss_container()
+    container.register(MossRuntimePoolProvider())
+    pool = container.force_fetch(MossRuntimePool)
+
+    def compile_with_locals(**kwargs):
+        compiler = container.force_fetch(MossCompiler)
+        compiler.join_context(PyContext(module=suite_example.__name__))
+        compiler.with_locals(**kwargs)
+        return compiler.compile(None)
+
+    # the types are pooled by themselves.
+    with compile_with_locals(Foo=int) as runtime:
+        module = runtime.module()
+    with compile_with_locals(Foo=int) as runtime:
+        assert runtime.module() is module
+    with compile_with_locals(Foo=str) as runtime:
+        assert runtime.module() is not module
+    assert pool.compiled == 2
+
+    # the other values are never pooled.
+    with compile_with_locals(foo=[1]) as runtime:
+        module = runtime.module()
+        assert module.__dict__["foo"] == [1]
+    with compile_with_locals(foo=[2]) as runtime:
+        assert runtime.module() is not module
+        assert runtime.module().__dict__["foo"] == [2]
+    assert pool.compiled == 2
@@ -0,0 +1,80 @@
+from ghostos_moss import moss_test_suite, MossTestResult
+from ghostos_moss.examples import suite_example
+
+
+def test_run_tests_in_threads():
+    suite = moss_test_suite()
+    got = []
+    report = suite.run_tests(
+        modulename=suite_example.__name__,
+        targets=["test_1", "test_2", "test_print"] * 4,
+        workers=3,
+        processes=False,
+        callback=got.append,
+    )
+    assert report.mode == "thread"
+    assert report.passed == 12
+    assert report.failed == 0
+    assert len(got) == 12
+    for result in report.results:
+        assert result.compile_time > 0
+        # the output of each test is captured alone.
+        if result.name == "test_print":
+            assert result.std_output == "hello\n"
+        else:
+            assert result.std_output == ""
+    dumped = report.model_dump()
+    assert "execution" not in dumped["results"][0]
+
+
+def test_run_tests_default_targets():
+    suite = moss_test_suite()
+    report = suite.run_tests(modulename=suite_example.__name__, processes=False)
+    returns = {result.name: result.returns for result in report.results}
+    assert returns == {"test_1": "1", "test_2": "2", "test_3": "3"}
+
+
+def test_run_tests_thread_timeout():
+    suite = moss_test_suite()
+    report = suite.run_tests(
+        modulename=suite_example.__name__,
+        targets=["test_sleep", "test_1", "test_2"],
+        workers=1,
+        timeout=0.3,
+        processes=False,
+    )
+    results = {result.name: result for result in report.results}
+    assert results["test_sleep"].timeout
+    # the stuck worker is replaced, the other tests still run.
+    assert results["test_1"].passed
+    assert results["test_2"].passed
+    assert report.wall_time < 5
+
+
+def test_run_tests_in_processes():
+    suite = moss_test_suite()
+    report = suite.run_tests(
+        modulename=suite_example.__name__,
+        targets=["test_1", "test_print", "test_sleep"],
+        workers=2,
+        timeout=2,
+    )
+    assert report.mode == "process"
+    results = {result.name: result for result in report.results}
+    assert results["test_1"].returns == "1"
+    assert results["test_1"].compile_time > 0
+    assert results["test_print"].std_output == "hello\n"
+    assert results["test_sleep"].timeout
+    assert report.failed == 1
+
+
+def test_parallel_run_moss_func():
+    suite = moss_test_suite()
+    got = {}
+    suite.parallel_run_moss_func(
+        modulename=suite_example.__name__,
+        funcs=["test_1", "test_3"],
+        callback=lambda name, executed: got.__setitem__(name, executed.returns),
+    )
+    assert got == {"test_1": 1, "test_3": 3}
+    assert isinstance(MossTestResult(name="foo").model_dump(), dict)